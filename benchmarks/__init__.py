@@ -0,0 +1,5 @@
+"""Benchmark suite for parsing and exporting at scale.
+
+Run it from the repository root with python -m benchmarks; see --help and
+runner.py for what is measured and workloads.py for the generated inputs.
+"""
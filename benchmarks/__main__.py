@@ -0,0 +1,122 @@
+"""Command line runner of the benchmark suite.
+
+    python -m benchmarks --sizes 1KB,1MB --profiles prose,tables \\
+        --output results.json --baseline baseline.json --tolerance 0.1
+
+Prints one line per case and, with --baseline, the regressions found; exits
+with status 1 when there are any.
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from .runner import (  # noqa: E402
+    DEFAULT_SIZES, OPERATIONS, SIZES, compare, load_results, parse_size, run_suite,
+    save_results,
+)
+from .workloads import PROFILES  # noqa: E402
+
+
+def _names(value: str, choices) -> List[str]:
+    """Split a comma separated argument, checking each name."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    for name in names:
+        if name not in choices:
+            raise argparse.ArgumentTypeError(
+                f"invalid choice: {name!r} (choose from {', '.join(choices)})")
+    return names
+
+
+def _sizes(value: str) -> List[str]:
+    if value == "all":
+        return list(SIZES)
+    sizes = [size.strip() for size in value.split(",") if size.strip()]
+    for size in sizes:
+        try:
+            parse_size(size)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    return sizes
+
+
+def _print_case(case: Dict[str, Any]) -> None:
+    memory = case["peak_memory_mb"]
+    memory_text = "" if memory is None else f", peak {memory:.2f} MB"
+    if case.get("peak_rss_mb") is not None:
+        memory_text += f", peak RSS {case['peak_rss_mb']:.1f} MB"
+    print(f"{case['profile']:>12} {case['size']:>6} {case['operation']:<15} "
+          f"p50 {case['p50_ms']:9.2f} ms, p95 {case['p95_ms']:9.2f} ms, "
+          f"p99 {case['p99_ms']:9.2f} ms, {case['mb_per_s']:6.2f} MB/s"
+          f"{memory_text} ({case['runs']} runs)", flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks.
+
+    Args:
+        argv: Command line arguments, sys.argv[1:] when None
+
+    Returns:
+        The exit status: 0, or 1 when regressions were found
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark parse, parse_file, export_markdown and export_html.")
+    parser.add_argument("--profiles", type=lambda v: _names(v, list(PROFILES)),
+                        default=list(PROFILES),
+                        help=f"comma separated workload profiles (default: all of "
+                             f"{','.join(PROFILES)})")
+    parser.add_argument("--sizes", type=_sizes, default=list(DEFAULT_SIZES),
+                        help=f"comma separated document sizes, or all for "
+                             f"{','.join(SIZES)} (default: {','.join(DEFAULT_SIZES)})")
+    parser.add_argument("--operations", type=lambda v: _names(v, OPERATIONS),
+                        default=list(OPERATIONS),
+                        help=f"comma separated operations (default: {','.join(OPERATIONS)})")
+    parser.add_argument("--min-runs", type=int, default=5,
+                        help="runs always made per case (default: 5)")
+    parser.add_argument("--max-runs", type=int, default=100,
+                        help="runs never exceeded per case (default: 100)")
+    parser.add_argument("--time-budget", type=float, default=2.0,
+                        help="seconds per case after which no more runs start once "
+                             "--min-runs are made (default: 2)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced run measuring peak memory, and the "
+                             "process measuring peak RSS of parse and parse_file")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="parse to lightweight nodes instead of Pydantic models")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed slowdown or memory growth over the baseline, "
+                             "as a fraction (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.baseline) if args.baseline else None
+    results = run_suite(args.profiles, args.sizes, args.operations, report=_print_case,
+                        validate=not args.no_validate, min_runs=args.min_runs,
+                        max_runs=args.max_runs, time_budget=args.time_budget,
+                        measure_memory=not args.no_memory)
+    if args.output:
+        save_results(results, args.output)
+
+    if baseline is None:
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression['profile']} {regression['size']} "
+              f"{regression['operation']} {regression['metric']}: "
+              f"{regression['baseline']:.2f} -> {regression['current']:.2f} "
+              f"({regression['ratio']:.2f}x)")
+    if not regressions:
+        print(f"No regressions over {args.tolerance:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
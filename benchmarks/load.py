@@ -0,0 +1,187 @@
+"""Load test of the HTTP rendering service, on localhost.
+
+    python -m benchmarks.load --concurrency 16 --requests 2000 --size 10KB
+    python -m benchmarks.load --url http://127.0.0.1:8000 --revalidate
+
+Without --url, a RenderServer is started on a free port of 127.0.0.1 for
+the run. Each client thread keeps one connection alive and posts generated
+documents in turn; with --revalidate it sends the ETag it last received for
+a document as If-None-Match, as a caching client would. Prints throughput,
+latency percentiles, the statuses received and the queue depth the server
+reports at the end.
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from markdown_parser.server import RenderServer  # noqa: E402
+
+from .runner import parse_size, percentile  # noqa: E402
+from .workloads import PROFILES, generate  # noqa: E402
+
+
+def run_load(url: str, texts: List[str], route: str = "html", concurrency: int = 16,
+             requests: int = 1000, revalidate: bool = False) -> Dict[str, Any]:
+    """Post texts to a rendering service from concurrent clients.
+
+    Args:
+        url: Base URL of the service, such as http://127.0.0.1:8000
+        texts: Documents posted in turn by each client
+        route: "html" or "json"
+        concurrency: Client threads, each with its own connection
+        requests: Requests made in total
+        revalidate: Send the ETag last received for a text as If-None-Match
+
+    Returns:
+        requests, seconds, requests_per_s, p50_ms, p95_ms, p99_ms, and
+        statuses, the count of each response status
+    """
+    parts = urlsplit(url)
+    bodies = [text.encode("utf-8") for text in texts]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    def client(number: int, count: int) -> None:
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+        etags: Dict[int, str] = {}
+        mine = []
+        seen: Dict[int, int] = {}
+        try:
+            for i in range(count):
+                index = (number + i * concurrency) % len(bodies)
+                headers = {"Content-Type": "text/markdown; charset=utf-8"}
+                if revalidate and index in etags:
+                    headers["If-None-Match"] = etags[index]
+                start = time.perf_counter()
+                connection.request("POST", f"/{route}", bodies[index], headers)
+                response = connection.getresponse()
+                response.read()
+                mine.append(time.perf_counter() - start)
+                seen[response.status] = seen.get(response.status, 0) + 1
+                if response.getheader("ETag"):
+                    etags[index] = response.getheader("ETag")
+        finally:
+            connection.close()
+            with lock:
+                latencies.extend(mine)
+                for status, seen_count in seen.items():
+                    statuses[status] = statuses.get(status, 0) + seen_count
+
+    threads = [threading.Thread(target=client,
+                                args=(n, requests // concurrency + (n < requests % concurrency)))
+               for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies = latencies or [0.0]
+    return {
+        "requests": sum(statuses.values()),
+        "seconds": seconds,
+        "requests_per_s": sum(statuses.values()) / seconds,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def fetch_metrics(url: str) -> Dict[str, float]:
+    """Return the unlabelled samples of the service's /metrics, by name."""
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+    try:
+        connection.request("GET", "/metrics")
+        text = connection.getresponse().read().decode("utf-8")
+    finally:
+        connection.close()
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#") and "{" not in line:
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the load test.
+
+    Args:
+        argv: Command line arguments, sys.argv[1:] when None
+
+    Returns:
+        The exit status: 0, or 1 when any request failed
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description="Load test the rendering service of python -m markdown_parser serve.")
+    parser.add_argument("--url", help="service to test (default: start one on localhost)")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes of the started service (default: one per CPU)")
+    parser.add_argument("--route", choices=("html", "json"), default="html",
+                        help="route to post to (default: html)")
+    parser.add_argument("--profile", choices=list(PROFILES), default="prose",
+                        help="workload profile of the documents (default: prose)")
+    parser.add_argument("--size", type=parse_size, default="10KB",
+                        help="size of each document (default: 10KB)")
+    parser.add_argument("--documents", type=int, default=50,
+                        help="distinct documents posted in turn (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="concurrent clients (default: 16)")
+    parser.add_argument("--requests", type=int, default=1000,
+                        help="requests in total (default: 1000)")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="send If-None-Match with the ETag last received")
+    args = parser.parse_args(argv)
+
+    # Distinct documents, so that their ETags differ
+    text = generate(args.profile, args.size)
+    texts = [f"# Document {i}\n\n{text}" for i in range(args.documents)]
+
+    server = None
+    url = args.url
+    if url is None:
+        server = RenderServer(("127.0.0.1", 0), args.workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://{}:{}".format(*server.server_address[:2])
+    try:
+        result = run_load(url, texts, args.route, args.concurrency, args.requests,
+                          args.revalidate)
+        metrics = fetch_metrics(url)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(f"{result['requests']} requests to {url}/{args.route} in {result['seconds']:.2f} s, "
+          f"{result['requests_per_s']:.1f} requests/s, {args.concurrency} clients")
+    print(f"latency p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms")
+    print("statuses " + ", ".join(f"{status}: {count}"
+                                   for status, count in result["statuses"].items()))
+    print(f"server: {metrics.get('markdown_parser_workers', 0):.0f} workers, "
+          f"queue depth {metrics.get('markdown_parser_queue_depth', 0):.0f}, "
+          f"mean queue wait {_mean_wait(metrics) * 1000:.2f} ms")
+    return 0 if all(status < 400 for status in result["statuses"]) else 1
+
+
+def _mean_wait(metrics: Dict[str, float]) -> float:
+    count = metrics.get("markdown_parser_queue_wait_seconds_count", 0)
+    return metrics.get("markdown_parser_queue_wait_seconds_sum", 0) / count if count else 0.0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Running benchmark cases and comparing results.
+
+A case is one operation, parse, parse_file, export_markdown or
+export_html, on the text of one workload profile and size. run_case() times
+the operation alone: the text is generated, written to a file for
+parse_file, and for exports the document parsed, before timing starts.
+Each case runs at least min_runs times, then more until its time budget or
+max_runs is reached, and reports:
+
+    p50_ms, p95_ms, p99_ms  latency percentiles, interpolated between runs
+    mb_per_s                megabytes of markdown source per second at p50
+    peak_memory_mb          peak memory allocated by Python during one more
+                            run, traced with tracemalloc, or None when
+                            memory is not measured
+    peak_rss_mb             for parse and parse_file, the peak resident
+                            memory of a new process parsing the text from a
+                            file, with parse(open(path).read()) or
+                            parse_file(path), imports included; None when
+                            memory is not measured or the platform can not
+                            tell. Unlike tracemalloc it sees the mapped
+                            pages of parse_file.
+
+Results are saved as JSON with the Python version and the settings of the
+run. compare() matches the cases of two results and reports those slower,
+or using more memory, than the baseline by more than a tolerance.
+"""
+
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import markdown_parser
+from markdown_parser import export_html, export_markdown, parse, parse_file
+
+from .workloads import generate
+
+RESULTS_VERSION = 1
+
+OPERATIONS = ("parse", "parse_file", "export_markdown", "export_html")
+
+# Document sizes covered by the suite, and those run when none are given
+SIZES = ("1KB", "10KB", "100KB", "1MB", "10MB", "100MB")
+DEFAULT_SIZES = ("1KB", "10KB", "100KB", "1MB")
+
+_UNITS = {"KB": 1024, "MB": 1024 * 1024, "B": 1}
+
+
+def parse_size(size: str) -> int:
+    """Return the number of bytes of a size such as "10KB" or "1MB".
+
+    Raises:
+        ValueError: If the size is not a number followed by B, KB or MB
+    """
+    text = size.strip().upper()
+    for unit, factor in _UNITS.items():
+        if text.endswith(unit) and text[:-len(unit)].isdigit():
+            return int(text[:-len(unit)]) * factor
+    raise ValueError(f"Invalid size: {size!r}")
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Return a percentile of samples, interpolating between the nearest two.
+
+    Args:
+        samples: At least one value
+        fraction: The percentile as a fraction, 0.95 for p95
+    """
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _operation(name: str, text: str, path: str, validate: bool) -> Callable[[], Any]:
+    """Return a function running an operation on text, or on the file at path."""
+    if name == "parse":
+        return lambda: parse(text, validate)
+    if name == "parse_file":
+        return lambda: parse_file(path, validate)
+    document = parse(text, validate)
+    if name == "export_markdown":
+        return lambda: export_markdown(document)
+    if name == "export_html":
+        return lambda: export_html(document)
+    raise ValueError(f"Unknown operation: {name!r}")
+
+
+# Parse in a new process, the statement run on a file named by argv[1]
+_RSS_STATEMENTS = {
+    "parse": "parse(open(sys.argv[1], encoding='utf-8').read(), {validate})",
+    "parse_file": "parse_file(sys.argv[1], {validate})",
+}
+
+
+def peak_rss(operation: str, path: str, validate: bool = True) -> Optional[float]:
+    """Return the peak resident megabytes of a process parsing the file at path.
+
+    Args:
+        operation: "parse" or "parse_file"
+        path: Markdown file
+        validate: Parse to Pydantic models, or with False to lightweight nodes
+
+    Returns:
+        The peak resident memory in MB, or None where the platform does not
+        report it
+    """
+    if not hasattr(os, "wait4"):
+        return None
+    code = ("import sys\n"
+            "from markdown_parser import parse, parse_file\n"
+            + _RSS_STATEMENTS[operation].format(validate=validate))
+    package_path = os.path.dirname(os.path.dirname(markdown_parser.__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_path, env.get("PYTHONPATH")]))
+    process = subprocess.Popen([sys.executable, "-c", code, path], env=env)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"Measuring {operation} failed with status {process.returncode}")
+    # Kilobytes on Linux, bytes on macOS
+    return usage.ru_maxrss / (1e6 if sys.platform == "darwin" else 1e3)
+
+
+def run_case(profile: str, size: str, operation: str, validate: bool = True,
+             min_runs: int = 5, max_runs: int = 100, time_budget: float = 2.0,
+             measure_memory: bool = True) -> Dict[str, Any]:
+    """Benchmark one operation on one workload.
+
+    Args:
+        profile: Workload profile, see workloads.PROFILES
+        size: Document size, such as "1MB"
+        operation: One of OPERATIONS
+        validate: Parse to Pydantic models, or with False to lightweight nodes
+        min_runs: Runs always made
+        max_runs: Runs never exceeded
+        time_budget: Seconds after which no more runs are started once
+            min_runs are made
+        measure_memory: Make one more run under tracemalloc for the peak
+
+    Returns:
+        The result of the case, see the module docstring
+    """
+    text = generate(profile, parse_size(size))
+    source_bytes = len(text.encode("utf-8"))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "workload.md")
+        if operation in _RSS_STATEMENTS:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return _run_case(profile, size, operation, text, path, source_bytes, validate,
+                         min_runs, max_runs, time_budget, measure_memory)
+
+
+def _run_case(profile: str, size: str, operation: str, text: str, path: str,
+              source_bytes: int, validate: bool, min_runs: int, max_runs: int,
+              time_budget: float, measure_memory: bool) -> Dict[str, Any]:
+    """Benchmark one operation, the text written to path for the parse operations."""
+    run = _operation(operation, text, path, validate)
+
+    timings: List[float] = []
+    started = time.perf_counter()
+    gc.collect()
+    while len(timings) < max_runs:
+        start_time = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start_time)
+        if len(timings) >= min_runs and time.perf_counter() - started >= time_budget:
+            break
+
+    peak_memory = None
+    if measure_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    rss = None
+    if measure_memory and operation in _RSS_STATEMENTS:
+        rss = peak_rss(operation, path, validate)
+
+    p50 = percentile(timings, 0.50)
+    return {
+        "profile": profile,
+        "size": size,
+        "bytes": source_bytes,
+        "operation": operation,
+        "runs": len(timings),
+        "p50_ms": p50 * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "mb_per_s": source_bytes / p50 / 1e6 if p50 else None,
+        "peak_memory_mb": None if peak_memory is None else peak_memory / 1e6,
+        "peak_rss_mb": rss,
+    }
+
+
+def run_suite(profiles: Iterable[str], sizes: Iterable[str],
+              operations: Iterable[str] = OPERATIONS,
+              report: Optional[Callable[[Dict[str, Any]], None]] = None,
+              **options: Any) -> Dict[str, Any]:
+    """Benchmark every operation on every profile and size.
+
+    Args:
+        profiles: Workload profiles
+        sizes: Document sizes
+        operations: Operations to measure
+        report: Called with the result of each case as it finishes
+        **options: Passed to run_case()
+
+    Returns:
+        The results, to be saved as JSON
+    """
+    cases = []
+    for size in sizes:
+        for profile in profiles:
+            for operation in operations:
+                result = run_case(profile, size, operation, **options)
+                cases.append(result)
+                if report is not None:
+                    report(result)
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "markdown_parser": markdown_parser.__version__,
+        "options": options,
+        "cases": cases,
+    }
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """Write results to a JSON file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read results written by save_results().
+
+    Raises:
+        ValueError: If the file holds results of another format version
+    """
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported results version in {path}: {results.get('version')!r}")
+    return results
+
+
+def _case_key(case: Dict[str, Any]) -> Tuple[str, str, str]:
+    return case["profile"], case["size"], case["operation"]
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10,
+            metrics: Iterable[str] = ("p50_ms", "peak_memory_mb", "peak_rss_mb")
+            ) -> List[Dict[str, Any]]:
+    """Find the cases that regressed against a baseline.
+
+    Cases are matched by profile, size and operation; cases missing from
+    either side, and metrics either side did not measure, are skipped.
+
+    Args:
+        results: Results of the current run
+        baseline: Results of the baseline run
+        tolerance: Allowed increase, as a fraction of the baseline value
+        metrics: Metrics to compare, where larger is worse
+
+    Returns:
+        One entry per regressed metric of a case, with the case key, the
+        metric, both values and the ratio of current to baseline
+    """
+    baseline_cases = {_case_key(case): case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        before = baseline_cases.get(_case_key(case))
+        if before is None:
+            continue
+        for metric in metrics:
+            old, new = before.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append({
+                    "profile": case["profile"],
+                    "size": case["size"],
+                    "operation": case["operation"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "ratio": new / old,
+                })
+    return regressions
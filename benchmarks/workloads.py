@@ -0,0 +1,88 @@
+"""Generated markdown inputs for the benchmarks.
+
+Each workload profile builds a document from numbered units, one or a few
+blocks each, that differ in their text so that no two blocks are equal.
+generate() repeats the units of a profile until the text reaches the size
+asked for, and cuts it at the last unit boundary that fits, so the size is
+exact to within one unit and the text is always complete markdown.
+"""
+
+from typing import Callable, Dict, List
+
+
+def _prose_unit(i: int) -> str:
+    heading = f"## Section {i}\n\n" if i % 8 == 0 else ""
+    return (f"{heading}Paragraph {i} talks about **parsers** and *their* inputs. "
+            f"It has a few sentences of plain text, one with `inline code`, and "
+            f"wraps onto a second line\nthat continues the same paragraph {i}.\n\n")
+
+
+def _table_unit(i: int) -> str:
+    rows = "".join(f"| {i}.{r} | **v{r}** | *w{r}* | `c{r}` | text {r} |\n" for r in range(20))
+    return (f"Table {i}:\n\n"
+            "| id | bold | italic | code | plain |\n"
+            "|:---|:----:|-----:|------|-------|\n"
+            f"{rows}\n")
+
+
+def _nested_list_unit(i: int) -> str:
+    items = []
+    for depth in range(6):
+        items.append(f"{'  ' * depth}- item {i}.{depth} with *some* text\n")
+        items.append(f"{'  ' * depth}- sibling {i}.{depth} and `code`\n")
+    items.append(f"1. ordered {i}\n2. ordered again\n")
+    return "".join(items) + "\n"
+
+
+def _code_unit(i: int) -> str:
+    return (f"Call `function_{i}()` as below:\n\n"
+            f"```python example_{i}.py\n"
+            f"def function_{i}(value):\n"
+            f"    # Return the value scaled by {i}\n"
+            f"    result = value * {i}\n"
+            f"    return result\n"
+            "```\n\n")
+
+
+def _link_unit(i: int) -> str:
+    return (f"See [page {i}](https://example.com/{i} \"Page {i}\"), "
+            f"[docs](https://docs.example.com/{i}) and "
+            f"![figure {i}](images/{i}.png){{size=0.5, css=\"border: 1px;\"}} "
+            f"next to ![icon](icons/{i % 10}.svg) and [more](#s{i}).\n\n")
+
+
+PROFILES: Dict[str, Callable[[int], str]] = {
+    "prose": _prose_unit,
+    "tables": _table_unit,
+    "nested_lists": _nested_list_unit,
+    "code": _code_unit,
+    "links": _link_unit,
+}
+
+
+def generate(profile: str, size: int) -> str:
+    """Generate markdown text of a workload profile.
+
+    Args:
+        profile: A name in PROFILES
+        size: Size of the text in bytes; the units are ASCII. The text is
+            at least one unit long.
+
+    Returns:
+        The markdown text
+
+    Raises:
+        KeyError: If the profile is unknown
+    """
+    unit = PROFILES[profile]
+    parts: List[str] = []
+    total = 0
+    i = 0
+    while True:
+        text = unit(i)
+        if parts and total + len(text) > size:
+            break
+        parts.append(text)
+        total += len(text)
+        i += 1
+    return "".join(parts)
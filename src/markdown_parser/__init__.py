@@ -1,7 +1,20 @@
 """Markdown parser package."""
 
-from .parser import parse
-from .exporter import export_markdown, export_html
+from .parser import parse, parse_file
+from .stream import parse_stream, parse_file_stream
+from .batch import parse_many, export_html_many
+from .parallel import parse_parallel
+from .aio import AsyncParser, AsyncStats, parse_async, export_html_async
+from .cache import ParseCache, CacheStats
+from .memo import BlockMemo, MemoStats
+from .columnar import parse_columnar, ColumnarDocument
+from .profiler import ParseProfiler, ParserStats, PatternStats
+from .limits import ParseLimits, ParseLimitError
+from .exporter import export_markdown, export_html, iter_export_html, export_html_to, export_html_bytes
+from .exporter import HtmlRenderer, MarkdownRenderer
+from .direct import render_html
+from .json_export import export_json, iter_export_json
+from .renderer import Renderer
 from .models import (
     Document,
     Element,
@@ -32,8 +45,38 @@ __version__ = "0.1.0"
 
 __all__ = [
     "parse",
+    "parse_file",
+    "parse_stream",
+    "parse_file_stream",
+    "parse_many",
+    "export_html_many",
+    "parse_parallel",
+    "parse_async",
+    "export_html_async",
+    "AsyncParser",
+    "AsyncStats",
+    "ParseCache",
+    "CacheStats",
+    "BlockMemo",
+    "MemoStats",
+    "parse_columnar",
+    "ColumnarDocument",
+    "ParseProfiler",
+    "ParserStats",
+    "PatternStats",
+    "ParseLimits",
+    "ParseLimitError",
     "export_markdown",
     "export_html",
+    "iter_export_html",
+    "export_html_to",
+    "export_html_bytes",
+    "render_html",
+    "export_json",
+    "iter_export_json",
+    "Renderer",
+    "HtmlRenderer",
+    "MarkdownRenderer",
     "Document",
     "Element",
     "BlockElement",
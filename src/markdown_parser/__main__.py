@@ -0,0 +1,71 @@
+"""Command line of the package.
+
+    python -m markdown_parser serve --port 8000 --workers 4
+
+serve runs the local HTTP rendering service of server.py until Ctrl-C.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .server import DEFAULT_MAX_BYTES, DEFAULT_MAX_DEPTH, DEFAULT_PORT, serve
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a command.
+
+    Args:
+        argv: Command line arguments, sys.argv[1:] when None
+
+    Returns:
+        The exit status
+    """
+    parser = argparse.ArgumentParser(prog="python -m markdown_parser",
+                                     description="Markdown parser tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser(
+        "serve", help="serve markdown rendering over HTTP",
+        description="Render markdown POSTed to /html or /json in a pool of worker "
+                    "processes; GET /metrics for latencies and queue depth.")
+    serve_parser.add_argument("--host", default="127.0.0.1",
+                              help="address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                              help=f"port to listen on, 0 for any free port "
+                                   f"(default: {DEFAULT_PORT})")
+    serve_parser.add_argument("--workers", type=_positive_int,
+                              help="worker processes (default: one per CPU)")
+    serve_parser.add_argument("--max-bytes", type=_positive_int, default=DEFAULT_MAX_BYTES,
+                              help=f"largest request body accepted "
+                                   f"(default: {DEFAULT_MAX_BYTES})")
+    serve_parser.add_argument("--timeout", type=_positive_float,
+                              help="most seconds a render may take (default: no limit)")
+    serve_parser.add_argument("--max-depth", type=_positive_int, default=DEFAULT_MAX_DEPTH,
+                              help=f"deepest list nesting or quote level of a document "
+                                   f"(default: {DEFAULT_MAX_DEPTH})")
+    serve_parser.add_argument("--access-log", action="store_true",
+                              help="log each request to stderr")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers, args.max_bytes, args.timeout,
+              args.access_log, args.max_depth)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Parsing and HTML export for asyncio applications.
+
+parse() and export_html() are CPU-bound pure Python: called from a
+coroutine, they stop the event loop for as long as they run. AsyncParser
+runs them on an executor instead, and the coroutine awaits the result:
+
+    executor     the loop's default thread pool, or any
+                 concurrent.futures executor. Worker threads still share
+                 the GIL with the loop, which then waits up to the switch
+                 interval, 5 ms by default, for each turn; a
+                 ProcessPoolExecutor keeps the loop free of the work and
+                 only unpickles the results, in a thread of the executor.
+    concurrency  at most max_concurrency computations are submitted at a
+                 time; further requests wait on a semaphore, not in the
+                 executor's queue, so cancelling them is free
+    coalescing   a request for the same text and options as one running
+                 joins it instead of computing the result again. Joined
+                 requests get the same object, so a coalesced Document is
+                 shared: copy it before changing it.
+
+A request can be cancelled without cancelling the computation that other
+requests joined; the computation is cancelled with the last of them, and
+never submitted if it was still waiting. The semaphore and the running computations are kept
+per event loop, so one AsyncParser can serve several loops in turn.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+from pydantic import BaseModel
+from . import models, nodes as fast_nodes
+from .exporter import export_html
+from .parser import parse
+
+
+class AsyncStats(BaseModel):
+    """Counters of an AsyncParser."""
+
+    computations: int = 0
+    coalesced: int = 0
+    running: int = 0
+    waiting: int = 0
+
+
+class AsyncParser:
+    """Runs parse() and export_html() off the event loop.
+
+    Args:
+        executor: Executor running the work; None for the loop's default
+            thread pool. A ProcessPoolExecutor keeps the loop responsive
+            under load, see the module docstring. The executor is not shut
+            down by the AsyncParser.
+        max_concurrency: Most computations submitted at a time,
+            os.cpu_count() by default
+        coalesce: Share one computation between concurrent requests for the
+            same text and options
+    """
+
+    def __init__(self, executor: Optional[Executor] = None,
+                 max_concurrency: Optional[int] = None, coalesce: bool = True):
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.coalesce = coalesce
+        # Event loop -> (semaphore, running computations by request key)
+        self._loops: "weakref.WeakKeyDictionary[Any, Tuple[asyncio.Semaphore, Dict]]" = \
+            weakref.WeakKeyDictionary()
+        self._computations = 0
+        self._coalesced = 0
+        self._running = 0
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    async def parse(self, markdown_text: str, validate: bool = True,
+                    track_spans: bool = False
+                    ) -> Union[models.Document, fast_nodes.Document]:
+        """Parse markdown text on the executor.
+
+        See parse() for the arguments. A coalesced document is shared with
+        the other requests that joined its computation.
+        """
+        return await self._run(("parse", markdown_text, validate, track_spans),
+                               parse, markdown_text, validate, track_spans)
+
+    async def export_html(self, markdown_text: str, include_extensions: bool = True,
+                          title: str = "Document") -> str:
+        """Parse markdown text and export it to HTML on the executor.
+
+        See export_html() for the arguments.
+        """
+        return await self._run(("html", markdown_text, include_extensions, title),
+                               _export_html, markdown_text, include_extensions, title)
+
+    def stats(self) -> AsyncStats:
+        """Return a snapshot of the counters, running and waiting across all loops."""
+        with self._lock:
+            return AsyncStats(computations=self._computations, coalesced=self._coalesced,
+                              running=self._running, waiting=self._waiting)
+
+    async def _run(self, key: Hashable, function: Callable[..., Any], *args: Any) -> Any:
+        """Return the result of function(*args), joining a running computation of key."""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+        semaphore, running = state
+
+        if not self.coalesce:
+            return await self._compute(loop, semaphore, function, args)
+
+        # A running computation is [task, requests awaiting it]
+        entry = running.get(key)
+        if entry is None:
+            task = loop.create_task(self._compute(loop, semaphore, function, args))
+            entry = running[key] = [task, 0]
+            task.add_done_callback(lambda _: _finished(running, key, entry))
+        else:
+            with self._lock:
+                self._coalesced += 1
+        entry[1] += 1
+        try:
+            # Cancelling one request leaves the computation to the others
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not entry[0].done():
+                # Every request was cancelled: so is the computation
+                entry[0].cancel()
+                if running.get(key) is entry:
+                    del running[key]
+
+    async def _compute(self, loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore,
+                       function: Callable[..., Any], args: tuple) -> Any:
+        """Run function(*args) on the executor once the semaphore allows."""
+        with self._lock:
+            self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        try:
+            with self._lock:
+                self._computations += 1
+                self._running += 1
+            return await loop.run_in_executor(self.executor, function, *args)
+        finally:
+            with self._lock:
+                self._running -= 1
+            semaphore.release()
+
+
+def _finished(running: Dict[Hashable, list], key: Hashable, entry: list) -> None:
+    """Forget a finished computation, and its error when every request was cancelled."""
+    if running.get(key) is entry:
+        del running[key]
+    if not entry[0].cancelled():
+        entry[0].exception()
+
+
+def _export_html(markdown_text: str, include_extensions: bool, title: str) -> str:
+    """Parse and export text, in the executor."""
+    return export_html(parse(markdown_text), include_extensions, title)
+
+
+_default_parser: Optional[AsyncParser] = None
+_default_lock = threading.Lock()
+
+
+def _default() -> AsyncParser:
+    """Return the AsyncParser of parse_async() and export_html_async()."""
+    global _default_parser
+    with _default_lock:
+        if _default_parser is None:
+            _default_parser = AsyncParser()
+        return _default_parser
+
+
+async def parse_async(markdown_text: str, validate: bool = True, track_spans: bool = False,
+                      parser: Optional[AsyncParser] = None
+                      ) -> Union[models.Document, fast_nodes.Document]:
+    """Parse markdown text without blocking the event loop.
+
+    Args:
+        markdown_text: The markdown text to parse
+        validate: Build validated Pydantic models, see parse()
+        track_spans: Record the source span of every node, see parse()
+        parser: AsyncParser with the executor, concurrency limit and
+            coalescing to use; by default a shared one on the loop's default
+            thread pool
+
+    Returns:
+        The document, shared with concurrent requests for the same text
+    """
+    return await (parser or _default()).parse(markdown_text, validate, track_spans)
+
+
+async def export_html_async(markdown_text: str, include_extensions: bool = True,
+                            title: str = "Document",
+                            parser: Optional[AsyncParser] = None) -> str:
+    """Parse markdown text and export it to HTML without blocking the event loop.
+
+    Args:
+        markdown_text: The markdown text to convert
+        include_extensions: Whether to include extended syntax, see export_html()
+        title: Title of the HTML document
+        parser: AsyncParser to use, see parse_async()
+
+    Returns:
+        The HTML document
+    """
+    return await (parser or _default()).export_html(markdown_text, include_extensions, title)
@@ -0,0 +1,125 @@
+"""Batch parsing of many documents across a process pool.
+
+Parsing is CPU-bound pure Python, so independent documents are spread over
+worker processes. Documents are sent to the workers largest first, so a big
+document picked up last does not keep one worker busy after the others are
+done. Workers build the lightweight nodes, which unpickle several times faster
+than validated Pydantic trees, and return only the blocks and their line
+ranges: the parent already holds the source text.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar, Union
+from . import models, nodes as fast_nodes
+from .exporter import export_html
+from .parser import parse
+
+T = TypeVar("T")
+
+# Chunks handed out per worker when no chunksize is given
+_CHUNKS_PER_WORKER = 16
+
+
+def parse_many(texts: Iterable[str], workers: Optional[int] = None,
+               chunksize: Optional[int] = None, validate: bool = True,
+               track_spans: bool = False
+               ) -> List[Union[models.Document, fast_nodes.Document]]:
+    """Parse many markdown texts in parallel.
+
+    Args:
+        texts: The markdown texts to parse
+        workers: Number of worker processes, os.cpu_count() by default. With 1,
+            the texts are parsed in this process.
+        chunksize: Number of texts sent to a worker at a time. By default the
+            texts are split in about 16 chunks per worker.
+        validate: Return validated Pydantic documents, see parse(). The
+            conversion runs in this process, so validate=False is the fast path.
+        track_spans: Record the source span of every node, see parse()
+
+    Returns:
+        The parsed documents, in the order of texts
+    """
+    texts = list(texts)
+    results = _map_largest_first(partial(_parse_blocks, track_spans=track_spans),
+                                 texts, workers, chunksize)
+    return [_assemble(text, result, validate, track_spans)
+            for text, result in zip(texts, results)]
+
+
+def export_html_many(texts: Iterable[str], workers: Optional[int] = None,
+                     chunksize: Optional[int] = None, include_extensions: bool = True,
+                     title: str = "Document") -> List[str]:
+    """Parse many markdown texts and export them to HTML in parallel.
+
+    Args:
+        texts: The markdown texts to convert
+        workers: Number of worker processes, see parse_many()
+        chunksize: Number of texts sent to a worker at a time, see parse_many()
+        include_extensions: Whether to include extended syntax, see export_html()
+        title: Title of each HTML document
+
+    Returns:
+        The HTML documents, in the order of texts
+    """
+    return _map_largest_first(
+        partial(_export_html, include_extensions=include_extensions, title=title),
+        list(texts), workers, chunksize)
+
+
+def _map_largest_first(function: Callable[[str], T], texts: List[str],
+                       workers: Optional[int], chunksize: Optional[int]) -> List[T]:
+    """Apply function to texts in a process pool, longest texts first.
+
+    Returns the results in the order of texts.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    if workers == 1 or len(texts) < 2:
+        return [function(text) for text in texts]
+
+    order = _largest_first(texts)
+    if chunksize is None:
+        chunksize = max(1, len(texts) // (workers * _CHUNKS_PER_WORKER))
+
+    results: List[T] = [None] * len(texts)
+    with ProcessPoolExecutor(max_workers=min(workers, len(texts))) as executor:
+        mapped = executor.map(function, (texts[i] for i in order), chunksize=chunksize)
+        for i, result in zip(order, mapped):
+            results[i] = result
+    return results
+
+
+def _largest_first(texts: List[str]) -> List[int]:
+    """Return the indices of texts from the longest text to the shortest."""
+    return sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+
+
+def _parse_blocks(text: str, track_spans: bool = False
+                  ) -> Tuple[List[fast_nodes.BlockElement], List[Tuple[int, int]]]:
+    """Parse text in a worker, returning its blocks and their line ranges."""
+    document = parse(text, validate=False, track_spans=track_spans)
+    return document.blocks, document._block_lines
+
+
+def _assemble(text: str,
+              result: Tuple[List[fast_nodes.BlockElement], List[Tuple[int, int]]],
+              validate: bool, track_spans: bool
+              ) -> Union[models.Document, fast_nodes.Document]:
+    """Build the document that parse() returns from a worker result."""
+    blocks, block_lines = result
+    document = fast_nodes.Document(blocks=blocks)
+    document._lines = text.split('\n')
+    document._block_lines = block_lines
+    document._track_spans = track_spans
+    return document.to_model() if validate else document
+
+
+def _export_html(text: str, include_extensions: bool = True,
+                 title: str = "Document") -> str:
+    """Parse and export text in a worker."""
+    return export_html(parse(text), include_extensions=include_extensions, title=title)
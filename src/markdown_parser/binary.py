@@ -0,0 +1,580 @@
+"""Compact binary encoding of parsed documents.
+
+dumps() writes a document, models or lightweight nodes, as bytes that
+loads() reads back without running validation. The layout, all integers
+unsigned and little-endian:
+
+    magic  b"MDPB", then the format version as one byte
+    header varints: string count, block count, metadata string + 1 or 0
+    string offsets: string count + 1 uint32, into the string blob
+    block offsets: block count + 1 uint32, into the node section
+    string blob: the UTF-8 text of every distinct string, concatenated
+    node section: the blocks, one after the other
+
+Every string, whether content, URL, language or alignment, is stored once
+in the string table and referenced by its index; optional strings by index
+plus one, with 0 for None. A node starts with its type code, whose two high
+bits say whether a span and a raw_text follow; a span is its start and its
+length. Then come the node's own fields, with children as a count and the
+nodes. Integers are varints (LEB128). The offset tables let load_block()
+decode block N, and only the strings it uses, without reading the others.
+Metadata is stored as JSON text. The source kept by parse() for
+incremental edits is not stored.
+"""
+
+import json
+import struct
+from typing import (Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+from . import models, nodes as fast_nodes
+from .models import AlignType
+
+MAGIC = b"MDPB"
+VERSION = 1
+
+# Type codes, the node class for each is looked up by name
+_CODES = {
+    "Text": 1, "Bold": 2, "Italic": 3, "Code": 4, "Link": 5, "Image": 6,
+    "Heading": 7, "Paragraph": 8, "ListElement": 9, "ListItem": 10,
+    "Quote": 11, "CodeBlock": 12, "Table": 13, "TableRow": 14, "TableCell": 15,
+    "HorizontalRule": 16, "Align": 17,
+}
+
+_HAS_SPAN = 0x40
+_HAS_RAW_TEXT = 0x80
+_CODE_MASK = 0x3f
+
+_UINT32 = struct.Struct("<I")
+_DOUBLE = struct.Struct("<d")
+
+
+def dumps(document: Union[models.Document, fast_nodes.Document]) -> bytes:
+    """Encode a document as bytes.
+
+    Args:
+        document: A document from parse(), with validate True or False
+
+    Returns:
+        The encoded document, see the module docstring for the layout
+    """
+    encoder = _Encoder()
+    metadata = encoder.optional(json.dumps(document.metadata)
+                                if document.metadata else None)
+
+    section = bytearray()
+    block_offsets = [0]
+    for block in document.blocks:
+        encoder.out = section
+        encoder.node(block)
+        block_offsets.append(len(section))
+
+    blob = bytearray()
+    string_offsets = [0]
+    for text in encoder.strings:
+        blob += text.encode('utf-8', 'surrogatepass')
+        string_offsets.append(len(blob))
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_varint(out, len(encoder.strings))
+    _write_varint(out, len(document.blocks))
+    _write_varint(out, metadata)
+    out += struct.pack(f"<{len(string_offsets)}I", *string_offsets)
+    out += struct.pack(f"<{len(block_offsets)}I", *block_offsets)
+    out += blob
+    out += section
+    return bytes(out)
+
+
+def loads(data: bytes, validate: bool = True
+          ) -> Union[models.Document, fast_nodes.Document]:
+    """Decode a document encoded by dumps().
+
+    Args:
+        data: The encoded document
+        validate: Return Pydantic models, built without validation as the
+            data is trusted. With False, return the lightweight nodes.
+
+    Returns:
+        The document, equal to the one encoded
+    """
+    decoder = _Decoder(data, validate)
+    decoder.load_strings()
+    blocks = []
+    for index in range(decoder.block_count):
+        decoder.pos = decoder.block_start(index)
+        blocks.append(decoder.node())
+
+    metadata = decoder.metadata()
+    if validate:
+        return models.Document.model_construct(blocks=blocks, metadata=metadata)
+    return fast_nodes.Document(blocks=blocks, metadata=metadata)
+
+
+def load_block(data: bytes, index: int, validate: bool = True
+               ) -> Union[models.BlockElement, fast_nodes.BlockElement]:
+    """Decode block index of a document encoded by dumps().
+
+    Only the block and the strings it uses are read.
+
+    Args:
+        data: The encoded document
+        index: Index of the block, negative indexes count from the end
+        validate: Return Pydantic models, see loads()
+
+    Returns:
+        The block
+    """
+    decoder = _Decoder(data, validate)
+    if index < 0:
+        index += decoder.block_count
+    if not 0 <= index < decoder.block_count:
+        raise IndexError("block index out of range")
+    decoder.pos = decoder.block_start(index)
+    return decoder.node()
+
+
+def block_count(data: bytes) -> int:
+    """Return the number of blocks of a document encoded by dumps()."""
+    return _Decoder(data, False).block_count
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 integer."""
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _Encoder:
+    """Writes nodes to out and collects the string table."""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.strings: List[str] = []
+        self._indexes: Dict[str, int] = {}
+
+    def string(self, text: str) -> int:
+        """Return the index of text in the string table, adding it if new."""
+        index = self._indexes.get(text)
+        if index is None:
+            index = self._indexes[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def optional(self, text: Optional[str]) -> int:
+        """Return the index of text plus one, or 0 for None."""
+        return 0 if text is None else self.string(text) + 1
+
+    def node(self, node: Any) -> None:
+        """Write a node and its children.
+
+        The children of each node are written from an explicit stack, so
+        deep nesting needs no recursion.
+        """
+        write_fields = self._write_fields
+        stack = [iter((node,))]
+        while stack:
+            for child in stack[-1]:
+                children = write_fields(child)
+                if children:
+                    stack.append(iter(children))
+                    break
+            else:
+                stack.pop()
+
+    def _write_fields(self, node: Any) -> Optional[Iterable[Any]]:
+        """Write the type code and fields of a node, returning its children."""
+        name = type(node).__name__
+        code = _CODES[name]
+        span = node.span
+        raw_text = getattr(node, "raw_text", None)
+        if span is not None:
+            code |= _HAS_SPAN
+        if raw_text is not None:
+            code |= _HAS_RAW_TEXT
+
+        out = self.out
+        out.append(code)
+        if span is not None:
+            _write_varint(out, span[0])
+            _write_varint(out, span[1] - span[0])
+        if raw_text is not None:
+            _write_varint(out, self.string(raw_text))
+        return _WRITERS[name](self, node)
+
+
+# Writers write the fields of a node, and the count of its children, and
+# return the children to write after them, or None
+
+
+def _counted(encoder: _Encoder, nodes: List[Any]) -> List[Any]:
+    """Write the count of a list of children and return it."""
+    _write_varint(encoder.out, len(nodes))
+    return nodes
+
+
+def _write_inline(encoder: _Encoder, node: Any) -> None:
+    _write_varint(encoder.out, encoder.string(node.content))
+
+
+def _write_link(encoder: _Encoder, node: Any) -> None:
+    out = encoder.out
+    _write_varint(out, encoder.string(node.content))
+    _write_varint(out, encoder.string(node.url))
+    _write_varint(out, encoder.optional(node.title))
+
+
+def _write_image(encoder: _Encoder, node: Any) -> None:
+    _write_link(encoder, node)
+    out = encoder.out
+    _write_varint(out, encoder.optional(node.css))
+    if node.size is None:
+        out.append(0)
+    else:
+        out.append(1)
+        out += _DOUBLE.pack(node.size)
+
+
+def _write_heading(encoder: _Encoder, node: Any) -> List[Any]:
+    _write_varint(encoder.out, node.level)
+    return _counted(encoder, node.content)
+
+
+def _write_paragraph(encoder: _Encoder, node: Any) -> List[Any]:
+    return _counted(encoder, node.content)
+
+
+def _write_list(encoder: _Encoder, node: Any) -> List[Any]:
+    out = encoder.out
+    out.append(node.ordered)
+    _write_varint(out, 0 if node.start_number is None else node.start_number + 1)
+    return _counted(encoder, node.items)
+
+
+def _write_list_item(encoder: _Encoder, node: Any) -> List[Any]:
+    _write_varint(encoder.out, node.indent_level)
+    return _counted(encoder, node.content)
+
+
+def _write_quote(encoder: _Encoder, node: Any) -> List[Any]:
+    _write_varint(encoder.out, node.level)
+    return _counted(encoder, node.content)
+
+
+def _write_code_block(encoder: _Encoder, node: Any) -> None:
+    out = encoder.out
+    _write_varint(out, encoder.optional(node.language))
+    _write_varint(out, encoder.optional(node.filename))
+    _write_varint(out, encoder.string(node.code))
+
+
+def _write_table(encoder: _Encoder, node: Any) -> Iterator[Any]:
+    out = encoder.out
+    _write_varint(out, len(node.alignments))
+    for alignment in node.alignments:
+        _write_varint(out, encoder.optional(alignment))
+    return _table_children(encoder, node)
+
+
+def _table_children(encoder: _Encoder, node: Any) -> Iterator[Any]:
+    """Yield the header, then write the count of the rows and yield them."""
+    yield node.header
+    yield from _counted(encoder, node.rows)
+
+
+def _write_table_row(encoder: _Encoder, node: Any) -> List[Any]:
+    return _counted(encoder, node.cells)
+
+
+def _write_table_cell(encoder: _Encoder, node: Any) -> List[Any]:
+    _write_varint(encoder.out, encoder.optional(node.alignment))
+    return _counted(encoder, node.content)
+
+
+def _write_nothing(encoder: _Encoder, node: Any) -> None:
+    pass
+
+
+def _write_align(encoder: _Encoder, node: Any) -> List[Any]:
+    _write_varint(encoder.out, encoder.string(node.alignment.value))
+    return _counted(encoder, node.content)
+
+
+_WRITERS: Dict[str, Callable[[_Encoder, Any], Optional[Iterable[Any]]]] = {
+    "Text": _write_inline, "Bold": _write_inline, "Italic": _write_inline,
+    "Code": _write_inline, "Link": _write_link, "Image": _write_image,
+    "Heading": _write_heading, "Paragraph": _write_paragraph,
+    "ListElement": _write_list, "ListItem": _write_list_item,
+    "Quote": _write_quote, "CodeBlock": _write_code_block,
+    "Table": _write_table, "TableRow": _write_table_row,
+    "TableCell": _write_table_cell, "HorizontalRule": _write_nothing,
+    "Align": _write_align,
+}
+
+
+class _Decoder:
+    """Reads nodes from encoded data, building models or lightweight nodes."""
+
+    def __init__(self, data: bytes, validate: bool):
+        if data[:4] != MAGIC:
+            raise ValueError("Not an encoded document")
+        if data[4] != VERSION:
+            raise ValueError(f"Unsupported encoded document version {data[4]}")
+
+        self.data = data
+        self.pos = 5
+        string_count = self.varint()
+        self.block_count = self.varint()
+        self._metadata = self.varint()
+
+        self._string_offsets = self.pos
+        self._block_offsets = self.pos + 4 * (string_count + 1)
+        self._blob = self._block_offsets + 4 * (self.block_count + 1)
+        self._section = self._blob + _UINT32.unpack_from(data, self._block_offsets - 4)[0]
+        self._string_count = string_count
+        self._strings: Dict[int, str] = {}
+
+        # Node classes by type code, built without validation for models
+        if validate:
+            self._classes = {code: _model_builder(getattr(models, name))
+                             for name, code in _CODES.items()}
+        else:
+            self._classes = {code: getattr(fast_nodes, name)
+                             for name, code in _CODES.items()}
+        self._readers = {code: _READERS[name] for name, code in _CODES.items()}
+
+    def load_strings(self) -> None:
+        """Decode the whole string table at once."""
+        count = self._string_count
+        offsets = struct.unpack_from(f"<{count + 1}I", self.data, self._string_offsets)
+        blob = self.data[self._blob:self._blob + offsets[-1]]
+        self._strings = {
+            index: blob[offsets[index]:offsets[index + 1]].decode('utf-8', 'surrogatepass')
+            for index in range(count)
+        }
+
+    def string(self, index: int) -> str:
+        """Return string index of the string table."""
+        try:
+            return self._strings[index]
+        except KeyError:
+            start, end = struct.unpack_from(
+                "<2I", self.data, self._string_offsets + 4 * index)
+            text = self.data[self._blob + start:self._blob + end].decode(
+                'utf-8', 'surrogatepass')
+            self._strings[index] = text
+            return text
+
+    def optional(self) -> Optional[str]:
+        """Read an optional string reference."""
+        index = self.varint()
+        return None if index == 0 else self.string(index - 1)
+
+    def metadata(self) -> Dict[str, Any]:
+        """Return the document metadata."""
+        return json.loads(self.string(self._metadata - 1)) if self._metadata else {}
+
+    def block_start(self, index: int) -> int:
+        """Return the position of block index."""
+        return self._section + _UINT32.unpack_from(
+            self.data, self._block_offsets + 4 * index)[0]
+
+    def varint(self) -> int:
+        """Read an unsigned LEB128 integer."""
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            self.pos = pos
+            return byte
+
+        value = byte & 0x7f
+        shift = 7
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                self.pos = pos
+                return value
+            shift += 7
+
+    def node(self) -> Any:
+        """Read a node and its children.
+
+        The readers of nodes with children are generators run from an
+        explicit stack, so deep nesting needs no recursion: each yields the
+        count of the next children it needs and is sent the list of them.
+        """
+        classes = self._classes
+        readers = self._readers
+        parents = _PARENT_CODES
+        varint = self.varint
+        data = self.data
+        # The node whose children are being read, as (code, fields, reader),
+        # None for the node asked for, and the suspended nodes above it
+        parent = None
+        children: List[Any] = []
+        remaining = 1
+        stack = []
+        while True:
+            while remaining:
+                code = data[self.pos]
+                self.pos += 1
+                fields = {}
+                if code & _HAS_SPAN:
+                    start = varint()
+                    fields["span"] = (start, start + varint())
+                if code & _HAS_RAW_TEXT:
+                    fields["raw_text"] = self.string(varint())
+                code &= _CODE_MASK
+
+                if code in parents:
+                    stack.append((parent, children, remaining - 1))
+                    reader = readers[code](self, fields)
+                    parent = (code, fields, reader)
+                    children = []
+                    remaining = next(reader)
+                else:
+                    readers[code](self, fields)
+                    children.append(classes[code](**fields))
+                    remaining -= 1
+
+            if parent is None:
+                return children[0]
+            code, fields, reader = parent
+            try:
+                remaining = reader.send(children)
+                children = []
+            except StopIteration:
+                node = classes[code](**fields)
+                parent, children, remaining = stack.pop()
+                children.append(node)
+
+
+def _model_builder(cls: type) -> Callable[..., Any]:
+    """Return a function building instances of a model without validation.
+
+    Does what cls.model_construct() does for the plain fields of the node
+    models, without its per-call inspection of the fields, which makes up
+    most of the cost of loading.
+    """
+    defaults = {name: field.get_default(call_default_factory=True)
+                for name, field in cls.model_fields.items()}
+    new = object.__new__
+    set_attribute = object.__setattr__
+
+    def build(**fields: Any) -> Any:
+        node = new(cls)
+        values = dict(defaults)
+        values.update(fields)
+        set_attribute(node, "__dict__", values)
+        set_attribute(node, "__pydantic_fields_set__", set(fields))
+        set_attribute(node, "__pydantic_extra__", None)
+        set_attribute(node, "__pydantic_private__", None)
+        return node
+
+    return build
+
+
+def _read_inline(decoder: _Decoder, fields: dict) -> None:
+    fields["content"] = decoder.string(decoder.varint())
+
+
+def _read_link(decoder: _Decoder, fields: dict) -> None:
+    fields["content"] = decoder.string(decoder.varint())
+    fields["url"] = decoder.string(decoder.varint())
+    fields["title"] = decoder.optional()
+
+
+def _read_image(decoder: _Decoder, fields: dict) -> None:
+    _read_link(decoder, fields)
+    fields["css"] = decoder.optional()
+    has_size = decoder.data[decoder.pos]
+    decoder.pos += 1
+    if has_size:
+        fields["size"] = _DOUBLE.unpack_from(decoder.data, decoder.pos)[0]
+        decoder.pos += 8
+    else:
+        fields["size"] = None
+
+
+# Readers of nodes with children are generators, see _Decoder.node()
+_ChildReader = Generator[int, List[Any], None]
+
+
+def _read_heading(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["level"] = decoder.varint()
+    fields["content"] = yield decoder.varint()
+
+
+def _read_paragraph(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["content"] = yield decoder.varint()
+
+
+def _read_list(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["ordered"] = bool(decoder.data[decoder.pos])
+    decoder.pos += 1
+    start_number = decoder.varint()
+    fields["start_number"] = start_number - 1 if start_number else None
+    fields["items"] = yield decoder.varint()
+
+
+def _read_list_item(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["indent_level"] = decoder.varint()
+    fields["content"] = yield decoder.varint()
+
+
+def _read_quote(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["level"] = decoder.varint()
+    fields["content"] = yield decoder.varint()
+
+
+def _read_code_block(decoder: _Decoder, fields: dict) -> None:
+    fields["language"] = decoder.optional()
+    fields["filename"] = decoder.optional()
+    fields["code"] = decoder.string(decoder.varint())
+
+
+def _read_table(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["alignments"] = [decoder.optional() for _ in range(decoder.varint())]
+    fields["header"] = (yield 1)[0]
+    fields["rows"] = yield decoder.varint()
+
+
+def _read_table_row(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["cells"] = yield decoder.varint()
+
+
+def _read_table_cell(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["alignment"] = decoder.optional()
+    fields["content"] = yield decoder.varint()
+
+
+def _read_nothing(decoder: _Decoder, fields: dict) -> None:
+    pass
+
+
+def _read_align(decoder: _Decoder, fields: dict) -> _ChildReader:
+    fields["alignment"] = AlignType(decoder.string(decoder.varint()))
+    fields["content"] = yield decoder.varint()
+
+
+_READERS: Dict[str, Callable[[_Decoder, dict], Optional[_ChildReader]]] = {
+    "Text": _read_inline, "Bold": _read_inline, "Italic": _read_inline,
+    "Code": _read_inline, "Link": _read_link, "Image": _read_image,
+    "Heading": _read_heading, "Paragraph": _read_paragraph,
+    "ListElement": _read_list, "ListItem": _read_list_item,
+    "Quote": _read_quote, "CodeBlock": _read_code_block,
+    "Table": _read_table, "TableRow": _read_table_row,
+    "TableCell": _read_table_cell, "HorizontalRule": _read_nothing,
+    "Align": _read_align,
+}
+
+# Type codes of the nodes with children, whose readers are generators
+_PARENT_CODES = frozenset(_CODES[name] for name in (
+    "Heading", "Paragraph", "ListElement", "ListItem", "Quote", "Table", "TableRow",
+    "TableCell", "Align"))
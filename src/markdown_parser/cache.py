@@ -0,0 +1,153 @@
+"""Bounded in-memory cache of parse and export results.
+
+Results are keyed by a BLAKE2b digest of the markdown text plus the options
+that change the result, and evicted least recently used first once the cache
+holds too many entries or too many bytes. Documents are stored pickled, as
+Pydantic models or lightweight nodes as asked for: every hit unpickles a
+fresh copy, so callers own the document they get and may mutate it, and the
+pickled size is what counts against the byte limit. Unpickling models does
+not validate them, which makes a hit about twice as fast as parsing, where
+converting cached nodes with to_model() would validate the whole tree again.
+Exported text is immutable and returned as is.
+"""
+
+import hashlib
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple, Union
+from pydantic import BaseModel
+from . import models, nodes as fast_nodes
+from .exporter import export_html, export_markdown
+from .parser import parse
+
+
+class CacheStats(BaseModel):
+    """Counters of a ParseCache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class ParseCache:
+    """LRU cache around parse(), export_html() and export_markdown().
+
+    Args:
+        max_entries: Most results kept
+        max_bytes: Approximate most bytes kept, counting pickled documents
+            and exported strings. A result larger than this is not cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Cache limits must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def parse(self, markdown_text: str, validate: bool = True,
+              track_spans: bool = False) -> Union[models.Document, fast_nodes.Document]:
+        """Parse markdown text, or return a copy of the cached document.
+
+        Args:
+            markdown_text: The markdown text to parse
+            validate: Return a validated Pydantic document, see parse()
+            track_spans: Record the source span of every node, see parse()
+
+        Returns:
+            A new document equal to parse(markdown_text, validate, track_spans)
+        """
+        key = ("parse", _digest(markdown_text), validate, track_spans)
+        data = self._get(key)
+
+        if data is None:
+            document = parse(markdown_text, validate=validate, track_spans=track_spans)
+            data = pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)
+            self._put(key, data, len(data))
+            return document
+        return pickle.loads(data)
+
+    def export_html(self, markdown_text: str, include_extensions: bool = True,
+                    title: str = "Document") -> str:
+        """Parse markdown text and export it to HTML, or return the cached HTML.
+
+        See export_html() for the arguments.
+        """
+        key = ("html", _digest(markdown_text), include_extensions, title)
+        html = self._get(key)
+
+        if html is None:
+            html = export_html(parse(markdown_text), include_extensions, title)
+            self._put(key, html, sys.getsizeof(html))
+        return html
+
+    def export_markdown(self, markdown_text: str, include_extensions: bool = True) -> str:
+        """Parse markdown text and export it again, or return the cached result.
+
+        See export_markdown() for the arguments.
+        """
+        key = ("markdown", _digest(markdown_text), include_extensions)
+        markdown = self._get(key)
+
+        if markdown is None:
+            markdown = export_markdown(parse(markdown_text), include_extensions)
+            self._put(key, markdown, sys.getsizeof(markdown))
+        return markdown
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses,
+                              evictions=self._evictions, entries=len(self._entries),
+                              bytes=self._bytes)
+
+    def clear(self) -> None:
+        """Remove all entries. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or None, and count the lookup."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def _put(self, key: Hashable, value: Any, size: int) -> None:
+        """Store a value and evict the least recently used entries over the limits."""
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+
+def _digest(text: str) -> bytes:
+    """Return a 128-bit digest of text."""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
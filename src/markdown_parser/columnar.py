@@ -0,0 +1,770 @@
+"""Array-backed columnar documents.
+
+A parsed document holds one object per node, with a span tuple and a content
+string each, and large documents have hundreds of thousands of small Text
+and TableCell nodes. A ColumnarDocument keeps the same tree in parallel
+arrays instead, one entry per node, with the text of the nodes as slices of
+the source it keeps:
+
+    types           type code, the codes of binary.py, with _RAW_TEXT_IS_SPAN
+                    set when raw_text is the source of the span
+    parents         index of the parent node, -1 for top-level blocks
+    first_children  index of the first child, -1 for none
+    next_siblings   index of the next child of the same parent, -1 for none
+    starts, ends    source span of the node
+    text_starts, text_ends
+                    content of inline elements and code of code blocks, as a
+                    slice of the source; a text that is not in the source, as
+                    paragraph lines are joined with spaces, is stored in
+                    strings and text_starts holds -1 - its index
+    values          level of headings and quotes, indent_level of list items,
+                    alignment code of table cells and aligns
+
+Nodes are numbered in document order, a node before its children. The
+children of a node are its content, list items, table cells, or for tables
+the header row and then the rows. The fields of links, images, lists, code
+blocks and tables that have no column are kept in the fields dict, by node
+index, and raw_text that is not the source of the span in raw_texts.
+
+parse_columnar() parses one block at a time into lightweight nodes and
+moves each block into the arrays, so only the nodes of one block exist at
+a time. Node views expose the attributes of the classes in models.py and
+to_document() builds the equivalent Document.
+"""
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from . import models, nodes as fast_nodes
+from .binary import _CODES
+from .models import AlignType, ElementType
+from .parser import _iter_blocks
+
+_RAW_TEXT_IS_SPAN = 0x80
+_CODE_MASK = 0x7f
+
+# Alignment codes of table cells and of aligns
+_CELL_ALIGNMENTS = (None, "left", "center", "right")
+_ALIGN_TYPES = tuple(AlignType)
+
+
+def parse_columnar(markdown_text: str) -> "ColumnarDocument":
+    """Parse markdown text into a columnar document.
+
+    Args:
+        markdown_text: The markdown text to parse
+
+    Returns:
+        A ColumnarDocument; to_document() on it gives the document of
+        parse(markdown_text, track_spans=True)
+    """
+    document = ColumnarDocument(markdown_text)
+    document._add(_blocks(document, markdown_text.split('\n')))
+    return document
+
+
+def _blocks(document: "ColumnarDocument", lines: List[str]) -> Iterator[Any]:
+    """Parse the blocks of lines, recording their line ranges in document."""
+    for block, start, end in _iter_blocks(lines, fast_nodes, track_spans=True):
+        if block:
+            document.block_lines.append(start)
+            document.block_lines.append(end)
+            yield block
+
+
+class ColumnarDocument:
+    """A document whose nodes are stored in parallel arrays.
+
+    See the module docstring for the columns.
+
+    Args:
+        source: The markdown text the nodes were parsed from
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.types = array('B')
+        self.parents = array('i')
+        self.first_children = array('i')
+        self.next_siblings = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.text_starts = array('i')
+        self.text_ends = array('i')
+        self.values = array('i')
+        self.strings: List[str] = []
+        self.fields: Dict[int, tuple] = {}
+        self.raw_texts: Dict[int, str] = {}
+        # [start, end) source line range of each top-level block, flattened
+        self.block_lines = array('i')
+        self.metadata: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        """Return the number of nodes."""
+        return len(self.types)
+
+    @property
+    def blocks(self) -> List["NodeView"]:
+        """The top-level blocks."""
+        return list(self._siblings(0 if self.types else -1))
+
+    def node(self, index: int) -> "NodeView":
+        """Return the view of node index."""
+        return _VIEWS[self.types[index] & _CODE_MASK](self, index)
+
+    def children(self, index: int) -> List["NodeView"]:
+        """Return the views of the children of node index."""
+        return list(self._siblings(self.first_children[index]))
+
+    def text(self, index: int) -> str:
+        """Return the content of an inline element or the code of a code block."""
+        start = self.text_starts[index]
+        if start < 0:
+            return self.strings[-1 - start]
+        return self.source[start:self.text_ends[index]]
+
+    def raw_text(self, index: int) -> Optional[str]:
+        """Return the raw_text of node index."""
+        if self.types[index] & _RAW_TEXT_IS_SPAN:
+            return self.source[self.starts[index]:self.ends[index]]
+        return self.raw_texts.get(index)
+
+    def to_document(self, validate: bool = True
+                    ) -> Union[models.Document, fast_nodes.Document]:
+        """Build the equivalent document.
+
+        Args:
+            validate: Build validated Pydantic models. With False, build the
+                lightweight nodes.
+
+        Returns:
+            The document of parse(self.source, validate, track_spans=True),
+            which can be edited incrementally like it
+        """
+        nodes = models if validate else fast_nodes
+        blocks = []
+        index = 0 if self.types else -1
+        while index >= 0:
+            blocks.append(self._build(index, nodes))
+            index = self.next_siblings[index]
+
+        document = nodes.Document(blocks=blocks, metadata=dict(self.metadata))
+        document._lines = self.source.split('\n')
+        block_lines = self.block_lines
+        document._block_lines = [(block_lines[k], block_lines[k + 1])
+                                 for k in range(0, len(block_lines), 2)]
+        document._track_spans = True
+        return document
+
+    def _siblings(self, index: int) -> Iterator["NodeView"]:
+        """Yield the views of index and the siblings after it."""
+        next_siblings = self.next_siblings
+        while index >= 0:
+            yield self.node(index)
+            index = next_siblings[index]
+
+    def _add(self, blocks: Iterable[Any]) -> None:
+        """Append top-level blocks and the nodes under them.
+
+        The nodes are walked with an explicit stack of child iterators rather
+        than recursion, so any nesting depth works. Each node is collected as
+        a row of its _ROW_COLUMNS values, and the rows are moved into the
+        arrays a column at a time, between blocks once _FLUSH_ROWS are
+        collected and at the end.
+        """
+        source = self.source
+        strings = self.strings
+        raw_texts = self.raw_texts
+        fields_by_index = self.fields
+        rows: List[int] = []
+
+        # Index of the first node in rows
+        first = index = len(self.types)
+        nodes: Iterator[Any] = iter(blocks)
+        parent = last = -1
+        stack: List[Tuple[Iterator[Any], int, int]] = []
+        while True:
+            for node in nodes:
+                if last >= first:
+                    rows[(last - first) * _ROW_SIZE + _NEXT_SIBLING] = index
+                elif last >= 0:
+                    self.next_siblings[last] = index
+                last = index
+                index += 1
+
+                code = _PLAIN_CODES.get(type(node))
+                if code is not None and node.raw_text is None:
+                    # Text, bold, italic and code without raw text, most nodes
+                    start, end = node.span
+                    text = node.content
+                    position = source.find(text, start, end)
+                    if position < 0:
+                        rows += (code, parent, -1, -1, start, end, -1 - len(strings), 0, 0)
+                        strings.append(text)
+                    else:
+                        rows += (code, parent, -1, -1, start, end,
+                                 position, position + len(text), 0)
+                    continue
+
+                code, columns = _COLUMNS[type(node)]
+                text, value, fields, children = columns(node)
+                start, end = node.span
+
+                raw_text = getattr(node, "raw_text", None)
+                if raw_text is not None:
+                    if raw_text == source[start:end]:
+                        code |= _RAW_TEXT_IS_SPAN
+                    else:
+                        raw_texts[last] = raw_text
+
+                if fields is not None:
+                    fields_by_index[last] = fields
+
+                if text is None:
+                    text_start = text_end = 0
+                else:
+                    text_start = source.find(text, start, end)
+                    if text_start < 0:
+                        text_start, text_end = -1 - len(strings), 0
+                        strings.append(text)
+                    else:
+                        text_end = text_start + len(text)
+
+                # Numbered in document order, a first child follows its parent
+                rows += (code, parent, index if children else -1, -1, start, end,
+                         text_start, text_end, value)
+                if children:
+                    stack.append((nodes, parent, last))
+                    nodes, parent, last = iter(children), last, -1
+                    break
+                if not stack and len(rows) >= _FLUSH_ROWS:
+                    self._flush(rows)
+                    first = index
+            else:
+                if stack:
+                    nodes, parent, last = stack.pop()
+                    if not stack and len(rows) >= _FLUSH_ROWS:
+                        self._flush(rows)
+                        first = index
+                    continue
+                self._flush(rows)
+                return
+
+    def _flush(self, rows: List[int]) -> None:
+        """Move rows collected by _add() into the arrays and clear them."""
+        for offset, column in enumerate(_ROW_COLUMNS):
+            getattr(self, column).fromlist(rows[offset::_ROW_SIZE])
+        rows.clear()
+
+    def _build(self, index: int, nodes: Any) -> Any:
+        """Build the node index and its children from a nodes module.
+
+        Nodes are numbered in document order, so building the nodes from the
+        last one under index back to index builds children before parents,
+        without recursion.
+        """
+        types = self.types
+        first_children = self.first_children
+        next_siblings = self.next_siblings
+
+        # The subtree ends at the next sibling of index or of an ancestor
+        end = index
+        while next_siblings[end] < 0 and self.parents[end] >= 0:
+            end = self.parents[end]
+        end = next_siblings[end] if next_siblings[end] >= 0 else len(types)
+
+        built: Dict[int, Any] = {}
+        for node in range(end - 1, index - 1, -1):
+            children = []
+            child = first_children[node]
+            while child >= 0:
+                children.append(built.pop(child))
+                child = next_siblings[child]
+            built[node] = _BUILDERS[types[node] & _CODE_MASK](self, node, nodes, children)
+        return built[index]
+
+
+# Column values of each node class: text, value, fields and children
+
+def _inline_columns(node: Any) -> tuple:
+    return node.content, 0, None, ()
+
+
+def _link_columns(node: Any) -> tuple:
+    return node.content, 0, (node.url, node.title), ()
+
+
+def _image_columns(node: Any) -> tuple:
+    return node.content, 0, (node.url, node.title, node.size, node.css), ()
+
+
+def _heading_columns(node: Any) -> tuple:
+    return None, node.level, None, node.content
+
+
+def _paragraph_columns(node: Any) -> tuple:
+    return None, 0, None, node.content
+
+
+def _list_columns(node: Any) -> tuple:
+    return None, 0, (node.ordered, node.start_number), node.items
+
+
+def _list_item_columns(node: Any) -> tuple:
+    return None, node.indent_level, None, node.content
+
+
+def _quote_columns(node: Any) -> tuple:
+    return None, node.level, None, node.content
+
+
+def _code_block_columns(node: Any) -> tuple:
+    return node.code, 0, (node.language, node.filename), ()
+
+
+def _table_columns(node: Any) -> tuple:
+    return None, 0, (node.alignments,), [node.header, *node.rows]
+
+
+def _table_row_columns(node: Any) -> tuple:
+    return None, 0, None, node.cells
+
+
+def _table_cell_columns(node: Any) -> tuple:
+    return None, _CELL_ALIGNMENTS.index(node.alignment), None, node.content
+
+
+def _horizontal_rule_columns(node: Any) -> tuple:
+    return None, 0, None, ()
+
+
+def _align_columns(node: Any) -> tuple:
+    return None, _ALIGN_TYPES.index(node.alignment), None, node.content
+
+
+_COLUMN_FUNCTIONS: Dict[str, Callable[[Any], tuple]] = {
+    "Text": _inline_columns,
+    "Bold": _inline_columns,
+    "Italic": _inline_columns,
+    "Code": _inline_columns,
+    "Link": _link_columns,
+    "Image": _image_columns,
+    "Heading": _heading_columns,
+    "Paragraph": _paragraph_columns,
+    "ListElement": _list_columns,
+    "ListItem": _list_item_columns,
+    "Quote": _quote_columns,
+    "CodeBlock": _code_block_columns,
+    "Table": _table_columns,
+    "TableRow": _table_row_columns,
+    "TableCell": _table_cell_columns,
+    "HorizontalRule": _horizontal_rule_columns,
+    "Align": _align_columns,
+}
+
+# Type code and column function of the models and lightweight node classes
+_COLUMNS = {getattr(module, name): (_CODES[name], columns)
+            for module in (models, fast_nodes)
+            for name, columns in _COLUMN_FUNCTIONS.items()}
+
+
+# Columns of the rows collected by ColumnarDocument._add(), in order
+_ROW_COLUMNS = ("types", "parents", "first_children", "next_siblings", "starts", "ends",
+                "text_starts", "text_ends", "values")
+_ROW_SIZE = len(_ROW_COLUMNS)
+_NEXT_SIBLING = _ROW_COLUMNS.index("next_siblings")
+# Values collected before they are moved into the arrays
+_FLUSH_ROWS = 1 << 16
+
+# Type code of the inline classes holding only text, added without _COLUMNS
+_PLAIN_CODES = {getattr(module, name): _CODES[name]
+                for module in (models, fast_nodes)
+                for name in ("Text", "Bold", "Italic", "Code")}
+
+
+# Building nodes from the columns
+
+def _span(document: ColumnarDocument, index: int) -> Tuple[int, int]:
+    return document.starts[index], document.ends[index]
+
+
+def _inline_builder(name: str) -> Callable[[ColumnarDocument, int, Any, list], Any]:
+    def build(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+        return getattr(nodes, name)(content=document.text(index),
+                                    raw_text=document.raw_text(index),
+                                    span=_span(document, index))
+    return build
+
+
+def _build_link(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    url, title = document.fields[index]
+    return nodes.Link(content=document.text(index), url=url, title=title,
+                      raw_text=document.raw_text(index), span=_span(document, index))
+
+
+def _build_image(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    url, title, size, css = document.fields[index]
+    return nodes.Image(content=document.text(index), url=url, title=title, size=size,
+                       css=css, raw_text=document.raw_text(index),
+                       span=_span(document, index))
+
+
+def _build_heading(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    return nodes.Heading(level=document.values[index],
+                         content=children,
+                         raw_text=document.raw_text(index), span=_span(document, index))
+
+
+def _build_paragraph(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    return nodes.Paragraph(content=children,
+                           raw_text=document.raw_text(index), span=_span(document, index))
+
+
+def _build_list(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    ordered, start_number = document.fields[index]
+    return nodes.ListElement(ordered=ordered, items=children,
+                             start_number=start_number, raw_text=document.raw_text(index),
+                             span=_span(document, index))
+
+
+def _build_list_item(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    return nodes.ListItem(content=children,
+                          indent_level=document.values[index], span=_span(document, index))
+
+
+def _build_quote(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    return nodes.Quote(content=children,
+                       level=document.values[index], raw_text=document.raw_text(index),
+                       span=_span(document, index))
+
+
+def _build_code_block(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    language, filename = document.fields[index]
+    return nodes.CodeBlock(language=language, filename=filename, code=document.text(index),
+                           raw_text=document.raw_text(index), span=_span(document, index))
+
+
+def _build_table(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    header, *rows = children
+    return nodes.Table(header=header, alignments=list(document.fields[index][0]), rows=rows,
+                       raw_text=document.raw_text(index), span=_span(document, index))
+
+
+def _build_table_row(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    return nodes.TableRow(cells=children,
+                          span=_span(document, index))
+
+
+def _build_table_cell(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    return nodes.TableCell(content=children,
+                           alignment=_CELL_ALIGNMENTS[document.values[index]],
+                           span=_span(document, index))
+
+
+def _build_horizontal_rule(document: ColumnarDocument, index: int, nodes: Any,
+                           children: list) -> Any:
+    return nodes.HorizontalRule(raw_text=document.raw_text(index),
+                                span=_span(document, index))
+
+
+def _build_align(document: ColumnarDocument, index: int, nodes: Any, children: list) -> Any:
+    return nodes.Align(alignment=_ALIGN_TYPES[document.values[index]],
+                       content=children,
+                       raw_text=document.raw_text(index), span=_span(document, index))
+
+
+_BUILDERS = {
+    _CODES["Text"]: _inline_builder("Text"),
+    _CODES["Bold"]: _inline_builder("Bold"),
+    _CODES["Italic"]: _inline_builder("Italic"),
+    _CODES["Code"]: _inline_builder("Code"),
+    _CODES["Link"]: _build_link,
+    _CODES["Image"]: _build_image,
+    _CODES["Heading"]: _build_heading,
+    _CODES["Paragraph"]: _build_paragraph,
+    _CODES["ListElement"]: _build_list,
+    _CODES["ListItem"]: _build_list_item,
+    _CODES["Quote"]: _build_quote,
+    _CODES["CodeBlock"]: _build_code_block,
+    _CODES["Table"]: _build_table,
+    _CODES["TableRow"]: _build_table_row,
+    _CODES["TableCell"]: _build_table_cell,
+    _CODES["HorizontalRule"]: _build_horizontal_rule,
+    _CODES["Align"]: _build_align,
+}
+
+
+# Node views
+
+class NodeView:
+    """A node of a columnar document, read from its columns.
+
+    Views have the attributes of the model class of the same name, with
+    views in place of child nodes. They are created on access and hold
+    only the document and the node index.
+    """
+
+    __slots__ = ("document", "index")
+
+    def __init__(self, document: ColumnarDocument, index: int):
+        self.document = document
+        self.index = index
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        return _span(self.document, self.index)
+
+    @property
+    def parent(self) -> Optional["NodeView"]:
+        """The view of the parent node, None for top-level blocks."""
+        parent = self.document.parents[self.index]
+        return None if parent < 0 else self.document.node(parent)
+
+    @property
+    def children(self) -> List["NodeView"]:
+        """The views of the child nodes, see the module docstring."""
+        return self.document.children(self.index)
+
+    def to_node(self, validate: bool = True) -> Any:
+        """Build the node and its children, as models or lightweight nodes."""
+        return self.document._build(self.index, models if validate else fast_nodes)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, NodeView):
+            return NotImplemented
+        return self.document is other.document and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.document), self.index))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(index={self.index})"
+
+
+class ElementView(NodeView):
+    """View of an element."""
+
+    __slots__ = ()
+    type: ElementType
+
+    @property
+    def raw_text(self) -> Optional[str]:
+        return self.document.raw_text(self.index)
+
+
+class InlineView(ElementView):
+    """View of an inline element."""
+
+    __slots__ = ()
+
+    @property
+    def content(self) -> str:
+        return self.document.text(self.index)
+
+
+class TextView(InlineView):
+    __slots__ = ()
+    type = ElementType.TEXT
+
+
+class BoldView(InlineView):
+    __slots__ = ()
+    type = ElementType.BOLD
+
+
+class ItalicView(InlineView):
+    __slots__ = ()
+    type = ElementType.ITALIC
+
+
+class CodeView(InlineView):
+    __slots__ = ()
+    type = ElementType.CODE
+
+
+class LinkView(InlineView):
+    __slots__ = ()
+    type = ElementType.LINK
+
+    @property
+    def url(self) -> str:
+        return self.document.fields[self.index][0]
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.document.fields[self.index][1]
+
+
+class ImageView(InlineView):
+    __slots__ = ()
+    type = ElementType.IMAGE
+
+    @property
+    def alt(self) -> str:
+        return self.content
+
+    @property
+    def url(self) -> str:
+        return self.document.fields[self.index][0]
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.document.fields[self.index][1]
+
+    @property
+    def size(self) -> Optional[float]:
+        return self.document.fields[self.index][2]
+
+    @property
+    def css(self) -> Optional[str]:
+        return self.document.fields[self.index][3]
+
+
+class ContainerView(ElementView):
+    """View of a block element whose children are its content."""
+
+    __slots__ = ()
+
+    @property
+    def content(self) -> List[NodeView]:
+        return self.children
+
+
+class HeadingView(ContainerView):
+    __slots__ = ()
+    type = ElementType.HEADING
+
+    @property
+    def level(self) -> int:
+        return self.document.values[self.index]
+
+
+class ParagraphView(ContainerView):
+    __slots__ = ()
+    type = ElementType.PARAGRAPH
+
+
+class ListElementView(ElementView):
+    __slots__ = ()
+    type = ElementType.LIST
+
+    @property
+    def ordered(self) -> bool:
+        return self.document.fields[self.index][0]
+
+    @property
+    def items(self) -> List["ListItemView"]:
+        return self.children
+
+    @property
+    def start_number(self) -> Optional[int]:
+        return self.document.fields[self.index][1]
+
+
+class ListItemView(NodeView):
+    __slots__ = ()
+
+    @property
+    def content(self) -> List[NodeView]:
+        return self.children
+
+    @property
+    def indent_level(self) -> int:
+        return self.document.values[self.index]
+
+
+class QuoteView(ContainerView):
+    __slots__ = ()
+    type = ElementType.QUOTE
+
+    @property
+    def level(self) -> int:
+        return self.document.values[self.index]
+
+
+class CodeBlockView(ElementView):
+    __slots__ = ()
+    type = ElementType.CODE_BLOCK
+
+    @property
+    def language(self) -> Optional[str]:
+        return self.document.fields[self.index][0]
+
+    @property
+    def filename(self) -> Optional[str]:
+        return self.document.fields[self.index][1]
+
+    @property
+    def code(self) -> str:
+        return self.document.text(self.index)
+
+
+class TableView(ElementView):
+    __slots__ = ()
+    type = ElementType.TABLE
+
+    @property
+    def header(self) -> "TableRowView":
+        return self.document.node(self.document.first_children[self.index])
+
+    @property
+    def alignments(self) -> List[Optional[str]]:
+        return list(self.document.fields[self.index][0])
+
+    @property
+    def rows(self) -> List["TableRowView"]:
+        return self.children[1:]
+
+
+class TableRowView(NodeView):
+    __slots__ = ()
+
+    @property
+    def cells(self) -> List["TableCellView"]:
+        return self.children
+
+
+class TableCellView(NodeView):
+    __slots__ = ()
+
+    @property
+    def content(self) -> List[NodeView]:
+        return self.children
+
+    @property
+    def alignment(self) -> Optional[str]:
+        return _CELL_ALIGNMENTS[self.document.values[self.index]]
+
+
+class HorizontalRuleView(ElementView):
+    __slots__ = ()
+    type = ElementType.HORIZONTAL_RULE
+
+
+class AlignView(ContainerView):
+    __slots__ = ()
+    type = ElementType.ALIGN
+
+    @property
+    def alignment(self) -> AlignType:
+        return _ALIGN_TYPES[self.document.values[self.index]]
+
+
+_VIEWS = {
+    _CODES["Text"]: TextView,
+    _CODES["Bold"]: BoldView,
+    _CODES["Italic"]: ItalicView,
+    _CODES["Code"]: CodeView,
+    _CODES["Link"]: LinkView,
+    _CODES["Image"]: ImageView,
+    _CODES["Heading"]: HeadingView,
+    _CODES["Paragraph"]: ParagraphView,
+    _CODES["ListElement"]: ListElementView,
+    _CODES["ListItem"]: ListItemView,
+    _CODES["Quote"]: QuoteView,
+    _CODES["CodeBlock"]: CodeBlockView,
+    _CODES["Table"]: TableView,
+    _CODES["TableRow"]: TableRowView,
+    _CODES["TableCell"]: TableCellView,
+    _CODES["HorizontalRule"]: HorizontalRuleView,
+    _CODES["Align"]: AlignView,
+}
@@ -0,0 +1,162 @@
+"""Direct markdown-to-HTML rendering without building a document.
+
+The block and inline parsers build their output through the classes of a
+nodes module, models or nodes. HtmlNodes stands in for such a module: each of
+its "classes" returns the HTML of the node it is given the fields of, so the
+parsers produce HTML text as they recognize each construct and no tree is
+built. Table cells and rows are the exception, they return their fields for
+the table to render, as a cell is rendered differently in the header.
+"""
+
+from typing import List, Optional, Tuple
+from .models import AlignType
+from .exporter import (
+    _HTML_TAIL, _code_block_html, _escape_html, _html_head, _image_html,
+    _link_html, _list_open_html,
+)
+from .line_tags import LineTags
+from .parser import _parse_block
+from .elements.table import index_markdown_tables
+
+
+class _BlockHtml(str):
+    """HTML of a block that is true even when empty.
+
+    The block parsers test the node they built for truth, so an <Align>
+    rendered without extensions and without content must not look like a
+    failed match.
+    """
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class HtmlNodes:
+    """Node factories returning HTML, used in place of a nodes module.
+
+    Args:
+        include_extensions: Whether to render custom extensions
+    """
+
+    def __init__(self, include_extensions: bool = True):
+        self.include_extensions = include_extensions
+
+    # Inline elements
+
+    def Text(self, content: str) -> str:
+        return _escape_html(content)
+
+    def Bold(self, content: str) -> str:
+        return f"<strong>{_escape_html(content)}</strong>"
+
+    def Italic(self, content: str) -> str:
+        return f"<em>{_escape_html(content)}</em>"
+
+    def Code(self, content: str) -> str:
+        return f"<code>{_escape_html(content)}</code>"
+
+    def Link(self, content: str, url: str, title: Optional[str] = None) -> str:
+        return _link_html(content, url, title)
+
+    def Image(self, content: str, url: str, size: Optional[float] = None,
+              css: Optional[str] = None, title: Optional[str] = None) -> str:
+        return _image_html(content, url, title, size, css)
+
+    # Block elements
+
+    def Heading(self, level: int, content: List[str], raw_text: Optional[str] = None) -> str:
+        return f"<h{level}>{''.join(content)}</h{level}>"
+
+    def Paragraph(self, content: List[str]) -> str:
+        return f"<p>{''.join(content)}</p>"
+
+    def ListItem(self, content: List[str], indent_level: int = 0) -> str:
+        # Nested lists are rendered like the inline content around them
+        return f"<li>{''.join(content)}</li>"
+
+    def ListElement(self, ordered: bool, items: List[str],
+                    start_number: Optional[int] = None) -> str:
+        close = "</ol>" if ordered else "</ul>"
+        return f"{_list_open_html(ordered, start_number)}{''.join(items)}{close}"
+
+    def Quote(self, content: List[str], level: int = 1) -> str:
+        return f"<blockquote>{''.join(content)}</blockquote>"
+
+    def CodeBlock(self, language: Optional[str], filename: Optional[str], code: str) -> str:
+        return _code_block_html(language, filename, code, self.include_extensions)
+
+    def TableCell(self, content: List[str],
+                  alignment: Optional[str] = None) -> Tuple[Optional[str], str]:
+        return alignment, ''.join(content)
+
+    def TableRow(self, cells: List[Tuple[Optional[str], str]]) -> List[Tuple[Optional[str], str]]:
+        return cells
+
+    def Table(self, header: List[Tuple[Optional[str], str]], alignments: List[Optional[str]],
+              rows: List[List[Tuple[Optional[str], str]]]) -> str:
+        parts = ["<table><thead><tr>"]
+        parts.extend(_cell_html("th", alignment, content) for alignment, content in header)
+        parts.append("</tr></thead>")
+        if rows:
+            parts.append("<tbody>")
+            for row in rows:
+                parts.append("<tr>")
+                parts.extend(_cell_html("td", alignment, content) for alignment, content in row)
+                parts.append("</tr>")
+            parts.append("</tbody>")
+        parts.append("</table>")
+        return ''.join(parts)
+
+    def HorizontalRule(self) -> str:
+        return "<hr>"
+
+    def Align(self, alignment: AlignType, content: List[str]) -> str:
+        if not self.include_extensions:
+            # Just render the content without alignment
+            return _BlockHtml(''.join(content))
+        return f'<div class="text-{alignment.value}">{"".join(content)}</div>'
+
+
+def _cell_html(tag: str, alignment: Optional[str], content: str) -> str:
+    """Return the HTML of a table cell."""
+    style = f' style="text-align: {alignment};"' if alignment else ""
+    return f"<{tag}{style}>{content}</{tag}>"
+
+
+_HTML_NODES = {flag: HtmlNodes(flag) for flag in (True, False)}
+
+
+def render_html(markdown_text: str, include_extensions: bool = True,
+                title: str = "Document") -> str:
+    """Render markdown text to HTML without building a document.
+
+    Runs the same block and inline parsers as parse(), with HtmlNodes in
+    place of the node classes, so the result is export_html(parse(text))
+    without the cost of building and walking the nodes. Custom renderers are not supported; use
+    export_html() with a renderer for those.
+
+    Args:
+        markdown_text: The markdown text to render
+        include_extensions: Whether to include custom extensions
+        title: Title for the HTML document
+
+    Returns:
+        HTML text
+    """
+    nodes = _HTML_NODES[include_extensions]
+    lines = markdown_text.split('\n')
+    tags = LineTags(lines)
+    tables = index_markdown_tables(lines)
+    parts = [_html_head(title)]
+    i = 0
+
+    while i < len(lines):
+        html, i = _parse_block(lines, i, tags, tables, nodes)
+        if html is not None and len(html):
+            parts.append("\n")
+            parts.append(html)
+
+    parts.append(_HTML_TAIL)
+    return ''.join(parts)
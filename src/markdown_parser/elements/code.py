@@ -1,15 +1,19 @@
 """Code block parser for markdown."""
 
 import re
+from types import ModuleType
 from typing import List, Optional, Tuple
+from .. import models
 from ..models import CodeBlock
+from ..mapped import strip_code_lines
 from ..regex_patterns import (
     CODE_FENCE_START_PATTERN, CODE_FENCE_END_PATTERN,
     CODE_INDENT_PATTERN, CODE_INDENT_CAPTURE_PATTERN
 )
 
 
-def parse_code_block(lines: List[str], start_idx: int) -> Optional[Tuple[CodeBlock, int]]:
+def parse_code_block(lines: List[str], start_idx: int,
+                     nodes: ModuleType = models) -> Optional[Tuple[CodeBlock, int]]:
     """Parse a code block starting from the given line index.
     
     Supports both fenced code blocks (```) and indented code blocks.
@@ -23,16 +27,17 @@ def parse_code_block(lines: List[str], start_idx: int) -> Optional[Tuple[CodeBlo
     # Check for fenced code block
     fence_match = CODE_FENCE_START_PATTERN.match(first_line)
     if fence_match:
-        return _parse_fenced_code_block(lines, start_idx, fence_match)
+        return _parse_fenced_code_block(lines, start_idx, fence_match, nodes)
     
     # Check for indented code block (4 spaces or 1 tab)
     if CODE_INDENT_PATTERN.match(first_line):
-        return _parse_indented_code_block(lines, start_idx)
+        return _parse_indented_code_block(lines, start_idx, nodes)
     
     return None
 
 
-def _parse_fenced_code_block(lines: List[str], start_idx: int, fence_match: re.Match) -> Optional[Tuple[CodeBlock, int]]:
+def _parse_fenced_code_block(lines: List[str], start_idx: int, fence_match: re.Match,
+                             nodes: ModuleType) -> Optional[Tuple[CodeBlock, int]]:
     """Parse a fenced code block (```)."""
     language = fence_match.group(1)
     filename = fence_match.group(2).strip() if fence_match.group(2) else None
@@ -42,25 +47,21 @@ def _parse_fenced_code_block(lines: List[str], start_idx: int, fence_match: re.M
         language = filename
         filename = None
     
-    code_lines = []
     current_idx = start_idx + 1
+    code_end = len(lines)
     
-    # Collect lines until closing fence
+    # Find the closing fence
     while current_idx < len(lines):
-        line = lines[current_idx]
-        
-        # Check for closing fence
-        if CODE_FENCE_END_PATTERN.match(line):
+        if CODE_FENCE_END_PATTERN.match(lines[current_idx]):
+            code_end = current_idx
             current_idx += 1
             break
-        
-        code_lines.append(line.rstrip())
         current_idx += 1
     
     # Join code lines
-    code = '\n'.join(code_lines)
+    code = strip_code_lines(lines, start_idx + 1, code_end)
     
-    code_block = CodeBlock(
+    code_block = nodes.CodeBlock(
         language=language,
         filename=filename,
         code=code
@@ -69,7 +70,8 @@ def _parse_fenced_code_block(lines: List[str], start_idx: int, fence_match: re.M
     return code_block, current_idx
 
 
-def _parse_indented_code_block(lines: List[str], start_idx: int) -> Optional[Tuple[CodeBlock, int]]:
+def _parse_indented_code_block(lines: List[str], start_idx: int,
+                               nodes: ModuleType) -> Optional[Tuple[CodeBlock, int]]:
     """Parse an indented code block (4 spaces or tab)."""
     code_lines = []
     current_idx = start_idx
@@ -103,7 +105,7 @@ def _parse_indented_code_block(lines: List[str], start_idx: int) -> Optional[Tup
     # Join code lines
     code = '\n'.join(code_lines)
     
-    code_block = CodeBlock(
+    code_block = nodes.CodeBlock(
         language=None,
         filename=None,
         code=code
@@ -1,19 +1,26 @@
 """Custom element parsers for markdown extensions."""
 
 import re
+from types import ModuleType
 from typing import List, Optional, Tuple
+from .. import models
 from ..models import Align, AlignType, BlockElement, InlineElement
 from .text import parse_inline_elements
+from ..positions import SourceMap, strip_mapped
 from ..regex_patterns import ALIGN_TAG_PATTERN
 
 
-def parse_align(lines: List[str], start_idx: int) -> Optional[Tuple[Align, int]]:
+def parse_align(lines: List[str], start_idx: int, nodes: ModuleType = models,
+                line_offsets: Optional[List[int]] = None) -> Optional[Tuple[Align, int]]:
     """Parse custom alignment tags.
     
     Formats:
     - <Align center>content</Align>
     - <Align left>content</Align>
     - <Align right>content</Align>
+    
+    When line_offsets, the source position of each line, is given, the inline
+    elements get source spans.
     """
     if start_idx >= len(lines):
         return None
@@ -28,6 +35,10 @@ def parse_align(lines: List[str], start_idx: int) -> Optional[Tuple[Align, int]]
     
     align_attr = align_match.group(1).lower()
     remaining_content = align_match.group(2)
+    tracked = line_offsets is not None
+    if tracked:
+        remaining_offset = (line_offsets[start_idx] + len(first_line) -
+                            len(first_line.lstrip()) + align_match.start(2))
     
     # Determine alignment
     alignment = AlignType(align_attr)
@@ -40,9 +51,10 @@ def parse_align(lines: List[str], start_idx: int) -> Optional[Tuple[Align, int]]
                                  remaining_content, re.IGNORECASE)
         if content_match:
             content_text = content_match.group(1)
-            content = parse_inline_elements(content_text)
+            origin = SourceMap(0, remaining_offset) if tracked else None
+            content = parse_inline_elements(content_text, nodes, origin)
             
-            align = Align(
+            align = nodes.Align(
                 alignment=alignment,
                 content=content
             )
@@ -53,6 +65,10 @@ def parse_align(lines: List[str], start_idx: int) -> Optional[Tuple[Align, int]]
     content_lines = [remaining_content] if remaining_content else []
     current_idx = start_idx + 1
     
+    # Source position of each content line when spans are tracked
+    if tracked:
+        content_offsets = [remaining_offset] if remaining_content else []
+    
     while current_idx < len(lines):
         line = lines[current_idx]
         
@@ -63,12 +79,18 @@ def parse_align(lines: List[str], start_idx: int) -> Optional[Tuple[Align, int]]
                                      line, re.IGNORECASE)
             if content_match:
                 content_lines.append(content_match.group(1))
+                if tracked:
+                    content_offsets.append(line_offsets[current_idx])
             
             # Parse all content
-            content_text = '\n'.join(content_lines).strip()
-            content = _parse_align_content(content_text)
+            if tracked:
+                content_text, origin = strip_mapped(
+                    *SourceMap.join('\n', list(zip(content_lines, content_offsets))))
+            else:
+                content_text, origin = '\n'.join(content_lines).strip(), None
+            content = _parse_align_content(content_text, nodes, origin)
             
-            align = Align(
+            align = nodes.Align(
                 alignment=alignment,
                 content=content
             )
@@ -76,16 +98,19 @@ def parse_align(lines: List[str], start_idx: int) -> Optional[Tuple[Align, int]]
             return align, current_idx + 1
         
         content_lines.append(line.rstrip())
+        if tracked:
+            content_offsets.append(line_offsets[current_idx])
         current_idx += 1
     
     # No closing tag found
     return None
 
 
-def _parse_align_content(text: str) -> List[InlineElement]:
+def _parse_align_content(text: str, nodes: ModuleType,
+                         origin: Optional[SourceMap] = None) -> List[InlineElement]:
     """Parse content inside align tags.
     
     For now, treats everything as inline elements.
     Could be extended to support block elements.
     """
-    return parse_inline_elements(text) 
\ No newline at end of file
+    return parse_inline_elements(text, nodes, origin) 
\ No newline at end of file
@@ -1,16 +1,22 @@
 """Heading parser for markdown."""
 
 import re
+from types import ModuleType
 from typing import Optional
+from .. import models
 from ..models import Heading
 from .text import parse_inline_elements
-from ..regex_patterns import HEADING_PATTERN, HEADING_TRAILING_HASH_PATTERN
+from ..positions import SourceMap
+from ..regex_patterns import HEADING_PATTERN
 
 
-def parse_heading(line: str) -> Optional[Heading]:
+def parse_heading(line: str, nodes: ModuleType = models,
+                  offset: Optional[int] = None) -> Optional[Heading]:
     """Parse a heading from a line.
     
     Supports ATX-style headings (# Heading).
+    When offset, the source position of the line, is given, the inline
+    elements get source spans.
     """
     # Match heading pattern: 1-6 # followed by space and content
     match = HEADING_PATTERN.match(line.strip())
@@ -21,13 +27,23 @@ def parse_heading(line: str) -> Optional[Heading]:
     level = len(match.group(1))
     content_text = match.group(2).strip()
     
-    # Remove trailing # if present (optional in markdown)
-    content_text = HEADING_TRAILING_HASH_PATTERN.sub('', content_text)
+    # Remove trailing # if present (optional in markdown). Stripped as
+    # \s*#+\s*$ would, without its search trying every whitespace character
+    # of the text
+    stripped = content_text.rstrip('#')
+    if len(stripped) < len(content_text):
+        content_text = stripped.rstrip()
     
     # Parse inline elements in the heading
-    content = parse_inline_elements(content_text)
+    origin = None
+    if offset is not None:
+        # Leading whitespace of the line and of the heading text
+        group = match.group(2)
+        origin = SourceMap(0, offset + len(line) - len(line.lstrip()) +
+                           match.start(2) + len(group) - len(group.lstrip()))
+    content = parse_inline_elements(content_text, nodes, origin)
     
-    return Heading(
+    return nodes.Heading(
         level=level,
         content=content,
         raw_text=line
@@ -4,24 +4,26 @@ import re
 from typing import Optional
 from ..models import Link, Image
 from ..regex_patterns import (
-    LINK_FULL_PATTERN, IMAGE_FULL_PATTERN,
-    IMAGE_SIZE_ATTR_PATTERN, IMAGE_CSS_ATTR_PATTERN
+    IMAGE_FULL_PATTERN, IMAGE_SIZE_ATTR_PATTERN, IMAGE_CSS_ATTR_PATTERN
 )
+from .text import _Closers, _find_link
 
 
 def parse_link(text: str) -> Optional[Link]:
     """Parse a link from text.
     
     Format: [text](url) or [text](url "title")
+    The link must be the whole text. Parsed in linear time.
     """
-    match = LINK_FULL_PATTERN.match(text.strip())
-    if not match:
+    text = text.strip()
+    if not text.startswith('['):
         return None
     
-    link_text = match.group(1) or ""
-    url = match.group(2) or ""
-    title = match.group(3)  # Optional
+    found = _find_link(text, 0, _Closers(text), len(text))
+    if found is None:
+        return None
     
+    link_text, url, title, _ = found
     return Link(content=link_text, url=url, title=title)
 
 
@@ -1,171 +1,305 @@
-"""List parser for markdown."""
+"""List parser for markdown.
+
+A nested list is parsed from the lines of its item, with the indentation of
+the items around it removed. Those lines are _Line views of the source
+lines, so removing the indentation copies nothing, and each nested list is
+a generator run from an explicit stack rather than a recursive call. Deep
+nesting so costs time linear in the size of the list, and no stack depth.
+"""
 
 import re
-from typing import List, Optional, Tuple
+from types import ModuleType
+from typing import Dict, Generator, List, Optional, Sequence, Tuple
+from .. import models
 from ..models import ListElement, ListItem
 from .text import parse_inline_elements
-from ..regex_patterns import UNORDERED_LIST_PATTERN, ORDERED_LIST_PATTERN
+from ..limits import active_budget
+from ..positions import SourceMap, strip_mapped
+from ..regex_patterns import LINE_CLASS_PATTERN
+
+# Generators parsing a list or an item: they yield the lines and start index
+# of each nested list, and are sent back its element and the index after it
+_ListParse = Generator[Tuple[Sequence["_Line"], int], Tuple[ListElement, int],
+                       Tuple[ListElement, int]]
+_ItemParse = Generator[Tuple[Sequence["_Line"], int], Tuple[ListElement, int],
+                       Tuple[ListItem, int]]
 
 
-def parse_list(lines: List[str], start_idx: int) -> Optional[Tuple[ListElement, int]]:
+def parse_list(lines: List[str], start_idx: int, nodes: ModuleType = models,
+               line_offsets: Optional[List[int]] = None) -> Optional[Tuple[ListElement, int]]:
     """Parse a list starting from the given line index.
-    
+
+    When line_offsets, the source position of each line, is given, the list
+    and everything in it get source spans.
     Returns the list element and the index of the next line after the list.
     """
     if start_idx >= len(lines):
         return None
-    
-    first_line = lines[start_idx]
-    list_match = _match_list_item(first_line)
-    
-    if not list_match:
+
+    source = _SourceLines(lines, line_offsets)
+    if not _match_list_item(source[start_idx]):
+        return None
+
+    budget = active_budget()
+    if budget is not None:
+        budget.check_depth(budget.depth)
+
+    tracked = line_offsets is not None
+    stack = [_parse_list(source, start_idx, nodes, tracked)]
+    result = None
+    while True:
+        try:
+            nested_lines, nested_idx = stack[-1].send(result)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            result = stop.value
+            if budget is not None:
+                budget.depth -= 1
+            continue
+
+        # A list nested deeper than the limits allow aborts the parse, so the
+        # depth needs no restoring on errors
+        if budget is not None:
+            budget.depth += 1
+            budget.check_depth(budget.depth)
+        stack.append(_parse_list(nested_lines, nested_idx, nodes, tracked))
+        result = None
+
+
+class _Line:
+    """A view of text[start:end]: a source line, or what a nested list sees of it.
+
+    Attributes:
+        text: The source line
+        start: Start of the view in text
+        end: End of the view in text
+        origin: Source position of text[0], 0 when spans are not tracked
+        indent_end: End of the whitespace at the start of the view
+    """
+
+    __slots__ = ("text", "start", "end", "origin", "indent_end")
+
+    def __init__(self, text: str, start: int, end: int, origin: int, indent_end: int):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.origin = origin
+        self.indent_end = indent_end
+
+    def sliced(self, start: int, end: Optional[int] = None) -> "_Line":
+        """Return the view of text[start:end], a part of this view."""
+        if end is None:
+            end = self.end
+        # The indentation is only looked for again past the known one
+        indent_end = self.indent_end
+        if start > indent_end:
+            indent_end = _space_end(self.text, start, end)
+        return _Line(self.text, start, end, self.origin, min(indent_end, end))
+
+    def is_blank(self) -> bool:
+        """Whether the view is empty or whitespace only."""
+        return self.indent_end == self.end
+
+    def indent(self) -> int:
+        """Number of leading whitespace characters."""
+        return self.indent_end - self.start
+
+    def value(self) -> str:
+        """Return the text of the view."""
+        return self.text[self.start:self.end]
+
+
+class _SourceLines:
+    """Views of the lines given to parse_list, made when first read."""
+
+    __slots__ = ("lines", "offsets", "views")
+
+    def __init__(self, lines: List[str], offsets: Optional[List[int]]):
+        self.lines = lines
+        self.offsets = offsets
+        self.views: Dict[int, _Line] = {}
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, index: int) -> _Line:
+        try:
+            return self.views[index]
+        except KeyError:
+            text = self.lines[index]
+            origin = self.offsets[index] if self.offsets is not None else 0
+            view = _Line(text, 0, len(text), origin, _space_end(text, 0, len(text)))
+            self.views[index] = view
+            return view
+
+
+def _space_end(text: str, start: int, end: int) -> int:
+    """Return the end of the whitespace at text[start], within text[:end]."""
+    return LINE_CLASS_PATTERN.match(text, start, end).end(1)
+
+
+def _match_list_item(line: _Line) -> Optional[re.Match]:
+    """Match the list item marker after the indentation of a line.
+
+    Returns the LINE_CLASS_PATTERN match, whose lastgroup is "bullet" or
+    "number", or None when the line is not a list item.
+    """
+    if line.indent_end == line.end:
         return None
-    
-    ordered = list_match['ordered']
+    match = LINE_CLASS_PATTERN.match(line.text, line.indent_end, line.end)
+    kind = match.lastgroup
+    return match if kind == "bullet" or kind == "number" else None
+
+
+def _parse_list(lines: Sequence[_Line], start_idx: int, nodes: ModuleType,
+                tracked: bool) -> _ListParse:
+    """Parse the list whose first item is lines[start_idx]."""
+    list_match = _match_list_item(lines[start_idx])
+    ordered = list_match.lastgroup == "number"
     items = []
     current_idx = start_idx
-    
-    while current_idx < len(lines):
+    line_count = len(lines)
+
+    while current_idx < line_count:
         line = lines[current_idx]
-        
+
         # Check if this is a list item
         item_match = _match_list_item(line)
         if not item_match:
             # Check if it's a continuation of the previous item (indented)
-            if line.strip() and len(line) - len(line.lstrip()) >= 2:
+            if not line.is_blank() and line.indent() >= 2:
                 # This is a continuation, will be handled by the item parser
                 current_idx += 1
                 continue
             else:
                 # End of list
                 break
-        
+
         # Check if it's the same type of list
-        if item_match['ordered'] != ordered:
+        if (item_match.lastgroup == "number") != ordered:
             break
-        
+
         # Parse this list item and any sub-items
-        item, next_idx = _parse_list_item(lines, current_idx)
-        if item:
-            items.append(item)
-        current_idx = next_idx
-    
-    if not items:
-        return None
-    
-    list_element = ListElement(
+        item, current_idx = yield from _parse_list_item(lines, current_idx, item_match,
+                                                        nodes, tracked)
+        items.append(item)
+
+    list_element = nodes.ListElement(
         ordered=ordered,
         items=items,
-        start_number=list_match.get('number') if ordered else None
+        # The marker is the number, its delimiter and one whitespace character
+        start_number=int(list_match.group("number")[:-2]) if ordered else None
     )
-    
+    if tracked:
+        list_element.span = _lines_span(lines, start_idx, current_idx)
+
     return list_element, current_idx
 
 
-def _match_list_item(line: str) -> Optional[dict]:
-    """Match a list item and return its properties."""
-    # Unordered list: -, *, or +
-    unordered_match = UNORDERED_LIST_PATTERN.match(line)
-    if unordered_match:
-        return {
-            'ordered': False,
-            'indent': len(unordered_match.group(1)),
-            'marker': unordered_match.group(2),
-            'content': unordered_match.group(3)
-        }
-    
-    # Ordered list: 1. or 1)
-    ordered_match = ORDERED_LIST_PATTERN.match(line)
-    if ordered_match:
-        return {
-            'ordered': True,
-            'indent': len(ordered_match.group(1)),
-            'number': int(ordered_match.group(2)),
-            'marker': ordered_match.group(3),
-            'content': ordered_match.group(4)
-        }
-    
-    return None
-
-
-def _parse_list_item(lines: List[str], start_idx: int) -> Tuple[Optional[ListItem], int]:
+def _parse_list_item(lines: Sequence[_Line], start_idx: int, item_match: re.Match,
+                     nodes: ModuleType, tracked: bool) -> _ItemParse:
     """Parse a single list item, including any nested content."""
-    if start_idx >= len(lines):
-        return None, start_idx
-    
-    item_match = _match_list_item(lines[start_idx])
-    if not item_match:
-        return None, start_idx
-    
-    indent_level = item_match['indent'] // 2  # Convert spaces to levels
-    content_lines = [item_match['content']]
+    first_line = lines[start_idx]
+    base_indent = first_line.indent()
+    indent_level = base_indent // 2  # Convert spaces to levels
+    content_start = _space_end(first_line.text, item_match.end(), first_line.end)
+    content_lines = [_Line(first_line.text, content_start, first_line.end, first_line.origin,
+                           content_start)]
     current_idx = start_idx + 1
-    
+    line_count = len(lines)
+
     # Collect continuation lines
-    base_indent = item_match['indent']
-    while current_idx < len(lines):
+    while current_idx < line_count:
         line = lines[current_idx]
-        
+
         # Empty line might be part of the item
-        if not line.strip():
+        if line.indent_end == line.end:
             # Check if next line is still part of this item
-            if current_idx + 1 < len(lines):
-                next_line = lines[current_idx + 1]
-                next_indent = len(next_line) - len(next_line.lstrip())
-                if next_indent > base_indent:
-                    content_lines.append('')
-                    current_idx += 1
-                    continue
-            break
-        
-        # Check indentation
-        line_indent = len(line) - len(line.lstrip())
-        
-        # If it's a new list item at the same or lower level, stop
-        if _match_list_item(line) and line_indent <= base_indent:
+            if current_idx + 1 < line_count and lines[current_idx + 1].indent() > base_indent:
+                content_lines.append(line.sliced(line.start, line.start))
+                current_idx += 1
+                continue
             break
-        
-        # If it's indented more than the base, it's part of this item
-        if line_indent > base_indent:
-            # Remove the base indentation
-            content_lines.append(line[base_indent + 2:])  # +2 for the marker space
-            current_idx += 1
-        else:
+
+        # A line indented more than the base is part of this item; a new list
+        # item at the same or lower level, or any other line, ends it
+        if line.indent_end - line.start <= base_indent:
             break
-    
-    # Parse the content
-    content_text = '\n'.join(content_lines).strip()
-    
-    # Check if the content contains a nested list
+
+        # Remove the base indentation, +2 for the marker space
+        content_lines.append(line.sliced(line.start + base_indent + 2))
+        current_idx += 1
+
+    # The first and last lines of the content text after str.strip()
+    first = 0
+    last = len(content_lines) - 1
+    while first < last and content_lines[first].is_blank():
+        first += 1
+    while last > first and content_lines[last].is_blank():
+        last -= 1
+
+    # Check if the content has several lines and a nested list; the leading
+    # whitespace strip() removes is the indentation the match skips anyway
+    nested_lines = None
+    if first < last:
+        last_line = _rstripped(content_lines[last])
+        if _match_list_item(last_line) or any(_match_list_item(line)
+                                              for line in content_lines[first:last]):
+            nested_lines = content_lines[first:last]
+            nested_lines[0] = nested_lines[0].sliced(nested_lines[0].indent_end)
+            nested_lines.append(last_line)
+
     content = []
-    if '\n' in content_text and any(_match_list_item(line) for line in content_text.split('\n')):
-        # Parse nested list
-        nested_lines = content_text.split('\n')
+    if nested_lines is not None:
         nested_idx = 0
-        
         while nested_idx < len(nested_lines):
             line = nested_lines[nested_idx]
-            
-            # Try to parse as nested list
-            nested_list_match = _match_list_item(line)
-            if nested_list_match:
-                nested_list, next_nested_idx = parse_list(nested_lines, nested_idx)
-                if nested_list:
-                    content.append(nested_list)
-                    nested_idx = next_nested_idx
-                    continue
-            
+
+            # Parse as nested list
+            if _match_list_item(line):
+                nested_list, nested_idx = yield nested_lines, nested_idx
+                content.append(nested_list)
+                continue
+
             # Otherwise, parse as inline elements
-            if line.strip():
-                content.extend(parse_inline_elements(line))
+            if not line.is_blank():
+                line_origin = SourceMap(0, line.origin + line.start) if tracked else None
+                content.extend(parse_inline_elements(line.value(), nodes, line_origin))
             nested_idx += 1
     else:
         # Simple content, just parse inline elements
-        content = parse_inline_elements(content_text)
-    
-    item = ListItem(
+        if tracked:
+            content_text, origin = strip_mapped(*SourceMap.join(
+                '\n', [(line.value(), line.origin + line.start) for line in content_lines]))
+        else:
+            content_text = '\n'.join([line.value() for line in content_lines]).strip()
+            origin = None
+        content = parse_inline_elements(content_text, nodes, origin)
+
+    item = nodes.ListItem(
         content=content,
         indent_level=indent_level
     )
-    
-    return item, current_idx 
\ No newline at end of file
+    if tracked:
+        start, end = _lines_span(lines, start_idx, current_idx)
+        item.span = (start + base_indent, end)
+
+    return item, current_idx
+
+
+def _rstripped(line: _Line) -> _Line:
+    """Return the view without its trailing whitespace, as str.rstrip() would."""
+    text = line.text
+    end = line.end
+    while end > line.indent_end and text[end - 1].isspace():
+        end -= 1
+    return line.sliced(line.start, end) if end < line.end else line
+
+
+def _lines_span(lines: Sequence[_Line], start_idx: int, end_idx: int) -> Tuple[int, int]:
+    """Return the source span of lines[start_idx:end_idx]."""
+    first = lines[start_idx]
+    last = lines[end_idx - 1]
+    return first.origin + first.start, last.origin + last.end
@@ -1,15 +1,22 @@
 """Quote block parser for markdown."""
 
 import re
+from types import ModuleType
 from typing import List, Optional, Tuple
-from ..models import Quote, BlockElement
+from .. import models
+from ..models import Quote, BlockElement, InlineElement
 from .text import parse_inline_elements
-from ..regex_patterns import remove_quote_prefix
+from ..limits import active_budget
+from ..positions import SourceMap, strip_mapped
+from ..regex_patterns import LINE_CLASS_PATTERN, remove_quote_prefix
 
 
-def parse_quote(lines: List[str], start_idx: int) -> Optional[Tuple[Quote, int]]:
+def parse_quote(lines: List[str], start_idx: int, nodes: ModuleType = models,
+                line_offsets: Optional[List[int]] = None) -> Optional[Tuple[Quote, int]]:
     """Parse a quote block starting from the given line index.
     
+    When line_offsets, the source position of each line, is given, the inline
+    elements get source spans.
     Returns the quote element and the index of the next line after the quote.
     """
     if start_idx >= len(lines):
@@ -54,19 +61,27 @@ def parse_quote(lines: List[str], start_idx: int) -> Optional[Tuple[Quote, int]]
     
     # Process quote lines to determine level and content
     level = _get_quote_level(quote_lines[0])
+    budget = active_budget()
+    if budget is not None:
+        budget.check_depth(level)
     content_lines = []
+    content_offsets = []
     
-    for line in quote_lines:
+    for i, line in enumerate(quote_lines):
         # Remove quote markers
-        processed_line = line
-        for _ in range(level):
-            processed_line = remove_quote_prefix(processed_line, count=1)
+        processed_line = remove_quote_prefix(line, count=level)
         content_lines.append(processed_line)
+        if line_offsets is not None:
+            content_offsets.append(line_offsets[start_idx + i] + len(line) - len(processed_line))
     
     # Parse content recursively (quotes can contain other blocks)
-    content = _parse_quote_content('\n'.join(content_lines))
+    if line_offsets is not None:
+        content = _parse_quote_content(
+            *SourceMap.join('\n', list(zip(content_lines, content_offsets))), nodes=nodes)
+    else:
+        content = _parse_quote_content('\n'.join(content_lines), nodes=nodes)
     
-    quote = Quote(
+    quote = nodes.Quote(
         content=content,
         level=level
     )
@@ -76,42 +91,62 @@ def parse_quote(lines: List[str], start_idx: int) -> Optional[Tuple[Quote, int]]
 
 def _get_quote_level(line: str) -> int:
     """Get the quote nesting level (number of > characters)."""
-    level = 0
-    temp_line = line.strip()
-    
-    while temp_line.startswith('>'):
-        level += 1
-        temp_line = temp_line[1:].strip()
-    
-    return max(1, level)
+    # The quote marker is the run of > characters and whitespace between them
+    match = LINE_CLASS_PATTERN.match(line.strip())
+    if match.lastgroup != "quote":
+        return 1
+    return match.group("quote").count('>')
 
 
-def _parse_quote_content(text: str) -> List[BlockElement]:
+def _parse_quote_content(text: str, origin: Optional[SourceMap] = None,
+                         nodes: ModuleType = models) -> List[BlockElement]:
     """Parse the content inside a quote block.
     
     For now, we'll treat it as inline elements in a paragraph.
     In a full implementation, this would recursively parse all block types.
+    origin maps text to the source when spans are tracked.
     """
     # Simple implementation: treat all content as inline elements
     # In a complete parser, this would handle nested blocks
     content = []
     
-    lines = text.strip().split('\n')
+    if origin is not None:
+        text, origin = strip_mapped(text, origin)
+    else:
+        text = text.strip()
+    
+    lines = text.split('\n')
     current_paragraph_lines = []
+    current_offsets = []
+    position = 0
     
     for line in lines:
         if not line.strip():
             # Empty line ends paragraph
             if current_paragraph_lines:
-                paragraph_text = ' '.join(current_paragraph_lines)
-                content.extend(parse_inline_elements(paragraph_text))
+                content.extend(_parse_quote_paragraph(current_paragraph_lines,
+                                                      current_offsets, origin, nodes))
                 current_paragraph_lines = []
+                current_offsets = []
         else:
             current_paragraph_lines.append(line.strip())
+            if origin is not None:
+                current_offsets.append(origin.offset(position + len(line) - len(line.lstrip())))
+        position += len(line) + 1
     
     # Don't forget the last paragraph
     if current_paragraph_lines:
-        paragraph_text = ' '.join(current_paragraph_lines)
-        content.extend(parse_inline_elements(paragraph_text))
+        content.extend(_parse_quote_paragraph(current_paragraph_lines,
+                                              current_offsets, origin, nodes))
     
-    return content 
\ No newline at end of file
+    return content
+
+
+def _parse_quote_paragraph(lines: List[str], offsets: List[int],
+                           origin: Optional[SourceMap], nodes: ModuleType) -> List[InlineElement]:
+    """Parse the inline elements of a paragraph inside a quote."""
+    if origin is not None:
+        paragraph_text, paragraph_origin = SourceMap.join(' ', list(zip(lines, offsets)))
+    else:
+        paragraph_text, paragraph_origin = ' '.join(lines), None
+    return parse_inline_elements(paragraph_text, nodes, paragraph_origin) 
\ No newline at end of file
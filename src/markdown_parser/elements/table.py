@@ -1,28 +1,41 @@
 """Table parser for markdown."""
 
 import re
-from typing import List, Optional, Tuple
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+from .. import models
 from ..models import Table, TableRow, TableCell
 from .text import parse_inline_elements
+from ..limits import _CHECK_LINES, active_budget
+from ..positions import SourceMap
 from ..regex_patterns import TABLE_SEPARATOR_PATTERN
 
 
-def parse_table(lines: List[str], start_idx: int) -> Optional[Tuple[Table, int]]:
+def parse_table(lines: List[str], start_idx: int,
+                table_index: Optional[Dict[int, Tuple[int, int, int]]] = None,
+                nodes: ModuleType = models,
+                line_offsets: Optional[List[int]] = None) -> Optional[Tuple[Table, int]]:
     """Parse a table starting from the given line index.
     
+    table_index is the result of index_markdown_tables for the same lines. When
+    it is not given, only the lines of the table itself are scanned. When
+    line_offsets, the source position of each line, is given, rows, cells and
+    inline elements get source spans.
     Returns the table element and the index of the next line after the table.
     """
     if start_idx >= len(lines):
         return None
     
-    # Use the existing table detection logic
-    tables = locate_markdown_tables(lines[start_idx:])
+    if table_index is not None:
+        span = table_index.get(start_idx)
+    else:
+        span = _locate_table_at(lines, start_idx)
     
-    if not tables or tables[0][0] != 0:
+    if span is None:
         return None
     
-    table_start, table_end = tables[0]
-    table_lines = lines[start_idx:start_idx + table_end + 1]
+    table_start, table_end, _ = span
+    table_lines = lines[table_start:table_end + 1]
     
     # Parse the table structure
     if len(table_lines) < 2:
@@ -45,39 +58,50 @@ def parse_table(lines: List[str], start_idx: int) -> Optional[Tuple[Table, int]]
         alignments.append(None)
     
     # Create header row
-    header = TableRow(cells=[
-        TableCell(
-            content=parse_inline_elements(cell),
+    offsets = None
+    if line_offsets is not None:
+        offsets = _cell_offsets(header_line, line_offsets[table_start])
+    
+    header = nodes.TableRow(cells=[
+        nodes.TableCell(
+            content=parse_inline_elements(cell, nodes, _cell_origin(offsets, i)),
             alignment=alignments[i] if i < len(alignments) else None
         )
         for i, cell in enumerate(header_cells)
     ])
+    if offsets is not None:
+        _set_row_spans(header, header_line, line_offsets[table_start], header_cells, offsets)
     
     # Parse data rows
     rows = []
-    for line in data_lines:
+    for line_idx, line in enumerate(data_lines, table_start + 2):
         cells = _parse_table_row(line)
         if cells:
+            if line_offsets is not None:
+                offsets = _cell_offsets(line, line_offsets[line_idx])
+            
             # Pad with empty cells if needed
             while len(cells) < len(header_cells):
                 cells.append('')
             
-            row = TableRow(cells=[
-                TableCell(
-                    content=parse_inline_elements(cell),
+            row = nodes.TableRow(cells=[
+                nodes.TableCell(
+                    content=parse_inline_elements(cell, nodes, _cell_origin(offsets, i)),
                     alignment=alignments[i] if i < len(alignments) else None
                 )
                 for i, cell in enumerate(cells[:len(header_cells)])
             ])
+            if offsets is not None:
+                _set_row_spans(row, line, line_offsets[line_idx], cells, offsets)
             rows.append(row)
     
-    table = Table(
+    table = nodes.Table(
         header=header,
         alignments=alignments[:len(header_cells)],
         rows=rows
     )
     
-    return table, start_idx + table_end + 1
+    return table, table_end + 1
 
 
 def _parse_table_row(line: str) -> List[str]:
@@ -99,6 +123,49 @@ def _parse_table_row(line: str) -> List[str]:
     return [part.strip() for part in parts]
 
 
+def _cell_offsets(line: str, offset: int) -> List[int]:
+    """Return the source position of each cell text of a row.
+    
+    offset is the source position of line. Cells are located the way
+    _parse_table_row splits them.
+    """
+    lead = len(line) - len(line.lstrip())
+    parts = line.strip().split('|')
+    
+    offsets = []
+    position = offset + lead
+    for part in parts:
+        offsets.append(position + len(part) - len(part.lstrip()))
+        position += len(part) + 1
+    
+    if parts and not parts[0].strip():
+        parts, offsets = parts[1:], offsets[1:]
+    if parts and not parts[-1].strip():
+        offsets = offsets[:-1]
+    return offsets
+
+
+def _cell_origin(offsets: Optional[List[int]], index: int) -> Optional[SourceMap]:
+    """Return the source map of a cell text, or None when spans are not tracked."""
+    if offsets is None or index >= len(offsets):
+        return None
+    return SourceMap(0, offsets[index])
+
+
+def _set_row_spans(row: TableRow, line: str, offset: int, cells: List[str],
+                   offsets: List[int]) -> None:
+    """Set the source spans of a row and its cells.
+    
+    Padding cells get an empty span at the end of the row.
+    """
+    row_end = offset + len(line.rstrip())
+    row.span = (offset + len(line) - len(line.lstrip()), row_end)
+    
+    for i, cell in enumerate(row.cells):
+        start = offsets[i] if i < len(offsets) else row_end
+        cell.span = (start, start + len(cells[i]))
+
+
 def _parse_alignments(separator_line: str) -> List[Optional[str]]:
     """Parse column alignments from separator line."""
     cells = _parse_table_row(separator_line)
@@ -234,4 +301,89 @@ def locate_markdown_tables(lines: List[str]) -> List[Tuple[int, int]]:
     if state == "inside":
         tables.append((current_start, n - 1))
     
-    return tables 
\ No newline at end of file
+    return tables
+
+
+def index_markdown_tables(lines: List[str]) -> Dict[int, Tuple[int, int, int]]:
+    """Index every table that can start in the given lines.
+    
+    Whether a table starts at a line depends only on that line and the lines
+    after it, so all starts are found in one backward and one forward pass.
+    Returns a mapping of start line to (start_line, end_line, column_count).
+    """
+    n = len(lines)
+    budget = active_budget()
+    if budget is None:
+        columns = [_count_columns(line) for line in lines]
+    else:
+        columns = []
+        for start in range(0, n, _CHECK_LINES):
+            budget.check_time()
+            columns.extend(_count_columns(line) for line in lines[start:start + _CHECK_LINES])
+    
+    # Last line of the run of non-blank lines with the same column count
+    run_end = [0] * n
+    for i in range(n - 1, -1, -1):
+        if i + 1 < n and columns[i] and columns[i + 1] == columns[i]:
+            run_end[i] = run_end[i + 1]
+        else:
+            run_end[i] = i
+    
+    tables = {}
+    for i in range(n - 1):
+        if budget is not None and not i % _CHECK_LINES:
+            budget.check_time()
+        n_cols = columns[i]
+        if not n_cols or columns[i + 1] != n_cols or '|' not in lines[i]:
+            continue
+        if not _is_table_header(lines, i, n_cols):
+            continue
+        
+        if i + 2 < n and columns[i + 2] == n_cols:
+            end = run_end[i + 2]
+        else:
+            end = i + 1
+        tables[i] = (i, end, n_cols)
+    
+    return tables
+
+
+def _locate_table_at(lines: List[str], start_idx: int) -> Optional[Tuple[int, int, int]]:
+    """Locate a table starting exactly at start_idx.
+    
+    Returns (start_line, end_line, column_count) or None.
+    """
+    if start_idx + 1 >= len(lines) or '|' not in lines[start_idx]:
+        return None
+    
+    n_cols = _count_columns(lines[start_idx])
+    if not n_cols or not _is_table_header(lines, start_idx, n_cols):
+        return None
+    
+    end = start_idx + 1
+    while end + 1 < len(lines) and _count_columns(lines[end + 1]) == n_cols:
+        end += 1
+    
+    return start_idx, end, n_cols
+
+
+def _is_table_header(lines: List[str], idx: int, n_cols: int) -> bool:
+    """Check if the line at idx is a table header followed by its separator."""
+    return (not is_separator_line(lines[idx]) and
+            is_separator_line(lines[idx + 1], n_cols))
+
+
+def _count_columns(line: str) -> int:
+    """Count the cells of a table row the way locate_markdown_tables does.
+    
+    Blank lines have no columns.
+    """
+    if '|' not in line:
+        return 1 if line.strip() else 0
+    
+    parts = line.strip().split('|')
+    if parts and not parts[0].strip():
+        parts = parts[1:]
+    if parts and not parts[-1].strip():
+        parts = parts[:-1]
+    return len(parts)
@@ -1,227 +1,264 @@
 """Text format parsers for inline elements."""
 
 import re
+from types import ModuleType
 from typing import List, Tuple, Optional
-from ..models import InlineElement, Text, Bold, Italic, Code, Link, Image
+from .. import models
+from ..models import InlineElement, Image
+from ..limits import _CHECK_INTERVAL, active_budget
+from ..positions import SourceMap
 from ..regex_patterns import (
-    IMAGE_PATTERN, LINK_PATTERN, BOLD_PATTERN, 
-    ITALIC_ASTERISK_PATTERN, ITALIC_UNDERSCORE_PATTERN, INLINE_CODE_PATTERN,
-    IMAGE_FULL_PATTERN, IMAGE_SIZE_ATTR_PATTERN, IMAGE_CSS_ATTR_PATTERN,
-    LINK_FULL_PATTERN
+    BOLD_PATTERN, ITALIC_ASTERISK_PATTERN, ITALIC_UNDERSCORE_PATTERN, INLINE_CODE_PATTERN,
+    ITALIC_ASTERISK_START_PATTERN, ITALIC_UNDERSCORE_START_PATTERN,
+    INLINE_TRIGGER_PATTERN, IMAGE_SIZE_ATTR_PATTERN, IMAGE_CSS_ATTR_PATTERN,
 )
 
+_WHITESPACE_RUN = re.compile(r'\s+')
 
-def parse_inline_elements(text: str) -> List[InlineElement]:
+
+def parse_inline_elements(text: str, nodes: ModuleType = models,
+                          origin: Optional[SourceMap] = None) -> List[InlineElement]:
     """Parse inline elements from text.
-    
+
     Handles: bold, italic, inline code, links, and images.
+
+    The text is walked once from left to right. The scanner jumps between
+    trigger characters (``*``, ``_``, `````, ``[``, ``!``) and only tries the
+    patterns that can start with the character found, so an element object is
+    built only for a match that is kept. Elements are built from the classes
+    in nodes: the models module or the lightweight nodes module. When origin
+    maps text positions to the source, each element gets its source span.
+
+    The worst case is linear in the length of text. A pattern that fails
+    could scan to the end of the text for its closing delimiter, once per
+    trigger character; the closers found are kept in a _Closers for the
+    whole scan instead, so a delimiter that is not there is looked for once.
+
+    Under ParseLimits the elements count against max_inline_nodes, checked
+    with the time every _CHECK_INTERVAL characters of a long text.
     """
     if not text:
         return []
-    
+
+    Text = nodes.Text
     elements = []
-    position = 0
-    
-    while position < len(text):
-        # Look for the next inline element starting from current position
-        remaining_text = text[position:]
-        
-        # Find all possible matches
-        all_matches = []
-        
-        for pattern_func in [_try_image, _try_link, _try_bold, _try_italic, _try_code]:
-            matches = pattern_func(remaining_text)
-            for match_pos, element, match_length in matches:
-                all_matches.append((match_pos, element, match_length, pattern_func.__name__))
-        
-        if all_matches:
-            # Filter out overlapping matches, keeping the outermost/longest ones
-            filtered_matches = _filter_nested_matches(all_matches)
-            
-            if filtered_matches:
-                # Sort by position
-                filtered_matches.sort(key=lambda x: x[0])
-                
-                # Take the first match
-                match_pos, element, match_length, pattern_name = filtered_matches[0]
-                
-                # Add any plain text before the match
-                if match_pos > 0:
-                    text_content = remaining_text[:match_pos]
-                    if elements and isinstance(elements[-1], Text):
-                        # Merge with previous text element
-                        elements[-1].content += text_content
-                    else:
-                        elements.append(Text(content=text_content))
-                
-                # Add the matched element
-                elements.append(element)
-                position += match_pos + match_length
-            else:
-                # No valid matches, add the rest as plain text
-                remaining_content = remaining_text
-                if elements and isinstance(elements[-1], Text):
-                    # Merge with previous text element
-                    elements[-1].content += remaining_content
-                else:
-                    elements.append(Text(content=remaining_content))
-                break
-        else:
-            # No matches found, add the rest as plain text
-            remaining_content = remaining_text
-            if elements and isinstance(elements[-1], Text):
-                # Merge with previous text element
-                elements[-1].content += remaining_content
-            else:
-                elements.append(Text(content=remaining_content))
+    position = 0  # End of the last emitted element
+    find_trigger = INLINE_TRIGGER_PATTERN.search
+    trigger = find_trigger(text)
+    closers = _Closers(text) if trigger else None
+    budget = active_budget()
+    counted = 0  # Elements counted against the budget
+    next_check = _CHECK_INTERVAL if budget is not None else len(text)
+
+    while trigger:
+        index = trigger.start()
+        if index >= next_check:
+            budget.add_inline(len(elements) - counted)
+            counted = len(elements)
+            next_check = index + _CHECK_INTERVAL
+        result = _TRIGGER_HANDLERS[text[index]](text, index, index == position, nodes,
+                                                closers)
+
+        if result is None:
+            trigger = find_trigger(text, index + 1)
+            continue
+
+        element, end = result
+
+        # Add any plain text before the match
+        if index > position:
+            elements.append(Text(content=text[position:index]))
+            if origin is not None:
+                elements[-1].span = origin.span(position, index)
+
+        if origin is not None:
+            element.span = origin.span(index, end)
+        elements.append(element)
+        position = end
+        trigger = find_trigger(text, end)
+
+    # Add the rest as plain text
+    if position < len(text):
+        elements.append(Text(content=text[position:]))
+        if origin is not None:
+            elements[-1].span = origin.span(position, len(text))
+
+    if budget is not None:
+        budget.add_inline(len(elements) - counted)
+    return elements
+
+
+class _Closers:
+    """Closing delimiters found in a text, shared by the matches tried on it.
+
+    find() returns what str.find() would, but remembers each answer: as the
+    scan moves right, the next ']' or ')' after a trigger is usually the one
+    found for an earlier trigger, and is not searched for again.
+    """
+
+    __slots__ = ("text", "_found", "_no_italic_closer")
+
+    def __init__(self, text: str):
+        self.text = text
+        # Character -> (start of the search, position found or -1)
+        self._found = {}
+        # (start, end) of a range of the text without a closing '*' of italic
+        self._no_italic_closer = (0, 0)
+
+    def find(self, char: str, start: int) -> int:
+        """Return the position of the first char at or after start, or -1."""
+        found = self._found.get(char)
+        if found is not None:
+            since, position = found
+            if since <= start and (start <= position or position < 0):
+                return position
+        position = self.text.find(char, start)
+        self._found[char] = (start, position)
+        return position
+
+
+def _match_emphasis(text: str, index: int, at_start: bool, nodes: ModuleType,
+                    closers: _Closers) -> Optional[Tuple[InlineElement, int]]:
+    """Match bold or italic text starting at index."""
+    match = BOLD_PATTERN.match(text, index)
+    if match:
+        return nodes.Bold(content=match.group(2)), match.end()
+
+    if text[index] == '*':
+        # The closing '*' of italic can not be next to another '*', and the
+        # same is true of every opening '*' but the one right after another
+        # element. A scan that found no closer up to the end of the line
+        # answers for every later '*' on that line.
+        start, end = closers._no_italic_closer
+        if start <= index < end:
+            return None
+        pattern = ITALIC_ASTERISK_START_PATTERN if at_start else ITALIC_ASTERISK_PATTERN
+    else:
+        pattern = ITALIC_UNDERSCORE_START_PATTERN if at_start else ITALIC_UNDERSCORE_PATTERN
+
+    match = pattern.match(text, index)
+    if match:
+        return nodes.Italic(content=match.group(1)), match.end()
+
+    if (text[index] == '*' and text[index + 1:index + 2] not in ('*', '', '\n') and
+            (at_start or index == 0 or text[index - 1] != '*')):
+        # The opening '*' was valid, so there is no closer on this line
+        end = closers.find('\n', index)
+        closers._no_italic_closer = (index, len(text) if end < 0 else end)
+    return None
+
+
+def _match_code(text: str, index: int, at_start: bool, nodes: ModuleType,
+                closers: _Closers) -> Optional[Tuple[InlineElement, int]]:
+    """Match inline code starting at index."""
+    match = INLINE_CODE_PATTERN.match(text, index)
+    if match:
+        return nodes.Code(content=match.group(1)), match.end()
+    return None
+
+
+def _match_link(text: str, index: int, at_start: bool, nodes: ModuleType,
+                closers: _Closers) -> Optional[Tuple[InlineElement, int]]:
+    """Match a link starting at index: [text](url) or [text](url "title")."""
+    found = _find_link(text, index, closers)
+    if found is None:
+        return None
+    content, url, title, end = found
+    return nodes.Link(content=content, url=url, title=title), end
+
+
+def _find_link(text: str, index: int, closers: _Closers, end: Optional[int] = None
+               ) -> Optional[Tuple[str, str, Optional[str], int]]:
+    """Find the link [text](url) or [text](url "title") starting at index.
+
+    Returns the text, URL, title and end of the link, or None. With end, the
+    link must end there. Written out instead of running a regex, whose
+    lazy URL tries a title at every whitespace character, and whose scans
+    for ']' and ')' restart at every '['.
+    """
+    close = closers.find(']', index + 1)
+    if close <= index + 1 or text[close + 1:close + 2] != '(':
+        return None
+    url_start = close + 2
+    paren = closers.find(')', url_start)
+    if paren <= url_start:
+        return None
+
+    # A title can follow the URL after any whitespace before the ')'; the
+    # whitespace characters of a run all lead to the same title, so only
+    # the first one the URL can end at is tried
+    position = url_start + 1
+    while True:
+        run = _WHITESPACE_RUN.search(text, position, paren)
+        if run is None:
             break
-    
-    # Post-process: merge short punctuation-only Text elements with previous elements
-    merged_elements = []
-    for i, element in enumerate(elements):
-        if (isinstance(element, Text) and 
-            element.content.strip() == '.' and
-            merged_elements and 
-            isinstance(merged_elements[-1], Text)):
-            # Merge single period with previous text element
-            merged_elements[-1].content += element.content
-        else:
-            merged_elements.append(element)
-    
-    return merged_elements
-
-
-def _filter_nested_matches(matches):
-    """Filter out nested matches, keeping only the outermost ones."""
-    if not matches:
-        return []
-    
-    # Sort by start position, then by length (longer first)
-    matches.sort(key=lambda x: (x[0], -x[2]))
-    
-    filtered = []
-    
-    for match in matches:
-        match_start, element, match_length, pattern_name = match
-        match_end = match_start + match_length
-        
-        # Check if this match overlaps with any already accepted match
-        overlaps = False
-        for existing_start, existing_element, existing_length, existing_pattern in filtered:
-            existing_end = existing_start + existing_length
-            
-            # Check for overlap
-            if (match_start < existing_end and match_end > existing_start):
-                overlaps = True
-                break
-        
-        if not overlaps:
-            filtered.append(match)
-    
-    return filtered
-
-
-def _try_image(text: str) -> List[Tuple[int, InlineElement, int]]:
-    """Try to find all images in text."""
-    matches = []
-    for match in IMAGE_PATTERN.finditer(text):
-        element = _parse_image_from_match(match)
-        matches.append((match.start(), element, match.end() - match.start()))
-    return matches
-
-
-def _try_link(text: str) -> List[Tuple[int, InlineElement, int]]:
-    """Try to find all links in text."""
-    matches = []
-    for match in LINK_PATTERN.finditer(text):
-        element = _parse_link_from_match(match)
-        matches.append((match.start(), element, match.end() - match.start()))
-    return matches
-
-
-def _try_bold(text: str) -> List[Tuple[int, InlineElement, int]]:
-    """Try to find all bold text in text."""
-    matches = []
-    for match in BOLD_PATTERN.finditer(text):
-        content = match.group(2)
-        matches.append((match.start(), Bold(content=content), match.end() - match.start()))
-    return matches
-
-
-def _try_italic(text: str) -> List[Tuple[int, InlineElement, int]]:
-    """Try to find all italic text in text."""
-    matches = []
-    
-    # Single asterisk pattern - allow any content except isolated asterisks at boundaries
-    for match in ITALIC_ASTERISK_PATTERN.finditer(text):
-        content = match.group(1)
-        # Make sure the content doesn't end or start with ** (which would be bold)
-        if not (content.startswith('*') or content.endswith('*')):
-            matches.append((match.start(), Italic(content=content), match.end() - match.start()))
-    
-    # Single underscore pattern
-    for match in ITALIC_UNDERSCORE_PATTERN.finditer(text):
-        content = match.group(1)
-        matches.append((match.start(), Italic(content=content), match.end() - match.start()))
-    
-    return matches
-
-
-def _try_code(text: str) -> List[Tuple[int, InlineElement, int]]:
-    """Try to find all inline code in text."""
-    matches = []
-    for match in INLINE_CODE_PATTERN.finditer(text):
-        content = match.group(1)
-        matches.append((match.start(), Code(content=content), match.end() - match.start()))
-    return matches
-
-
-def _parse_image_from_match(match: re.Match) -> Image:
-    """Parse image from regex match."""
-    full_match = match.group(0)
-    
-    # Extract basic image parts
-    img_match = IMAGE_FULL_PATTERN.match(full_match)
-    if not img_match:
-        return Image(content="", url="")
-    
-    alt = img_match.group(1) or ""
-    url = img_match.group(2) or ""
-    attrs = img_match.group(3)
-    
+        quote = run.end()
+        if text[quote] == '"':
+            title_end = closers.find('"', quote + 1)
+            if (title_end > quote + 1 and text[title_end + 1:title_end + 2] == ')' and
+                    (end is None or title_end + 2 == end)):
+                return (text[index + 1:close], text[url_start:run.start()],
+                        text[quote + 1:title_end], title_end + 2)
+        position = quote
+
+    if end is not None and paren + 1 != end:
+        return None
+    return text[index + 1:close], text[url_start:paren], None, paren + 1
+
+
+def _match_image(text: str, index: int, at_start: bool, nodes: ModuleType,
+                 closers: _Closers) -> Optional[Tuple[InlineElement, int]]:
+    """Match an image starting at index: ![alt](url), optionally with {attributes}."""
+    if text[index + 1:index + 2] != '[':
+        return None
+    close = closers.find(']', index + 2)
+    if close < 0 or text[close + 1:close + 2] != '(':
+        return None
+    url_start = close + 2
+    paren = closers.find(')', url_start)
+    if paren <= url_start:
+        return None
+
+    end = paren + 1
+    attrs = None
+    if text[end:end + 1] == '{':
+        brace = closers.find('}', end + 1)
+        if brace > end + 1:
+            attrs = text[end:brace + 1]
+            end = brace + 1
+    return _image_from_parts(text[index + 2:close], text[url_start:paren], attrs, nodes), end
+
+
+# Patterns to try for each trigger character
+_TRIGGER_HANDLERS = {
+    '*': _match_emphasis,
+    '_': _match_emphasis,
+    '`': _match_code,
+    '[': _match_link,
+    '!': _match_image,
+}
+
+
+def _image_from_parts(alt: str, url: str, attrs: Optional[str],
+                      nodes: ModuleType = models) -> Image:
+    """Build an image from its alt text, URL and {...} attributes."""
     # Parse extended attributes if present
     size = None
     css = None
-    
+
     if attrs:
         # Parse size attribute
         size_match = IMAGE_SIZE_ATTR_PATTERN.search(attrs)
         if size_match:
             try:
                 size = float(size_match.group(1))
-                size = max(0, min(1, size))  # Clamp to 0-1
+                size = max(0.0, min(1.0, size))  # Clamp to 0-1
             except ValueError:
                 pass
-        
+
         # Parse css attribute
         css_match = IMAGE_CSS_ATTR_PATTERN.search(attrs)
         if css_match:
             css = css_match.group(1)
-    
-    return Image(content=alt, url=url, size=size, css=css)
-
-
-def _parse_link_from_match(match: re.Match) -> Link:
-    """Parse link from regex match."""
-    full_match = match.group(0)
-    
-    # Extract link parts
-    link_match = LINK_FULL_PATTERN.match(full_match)
-    if not link_match:
-        return Link(content="", url="")
-    
-    text = link_match.group(1) or ""
-    url = link_match.group(2) or ""
-    title = link_match.group(3)  # Optional title
-    
-    return Link(content=text, url=url, title=title) 
\ No newline at end of file
+
+    return nodes.Image(content=alt, url=url, size=size, css=css)
@@ -1,89 +1,59 @@
 """Markdown exporter for converting parsed documents back to markdown."""
 
-from typing import List
-from .models import (
-    Document,
-    BlockElement,
-    InlineElement,
-    Heading,
-    Paragraph,
-    ListElement,
-    ListItem,
-    Quote,
-    CodeBlock,
-    Table,
-    HorizontalRule,
-    Text,
-    Bold,
-    Italic,
-    Code,
-    Link,
-    Image,
-    Align,
-    ElementType,
-)
-
-
-def export_markdown(document: Document, include_extensions: bool = True) -> str:
+from typing import IO, Iterator, Optional
+from . import models, nodes as fast_nodes
+from .models import Document, ListElement, HorizontalRule
+from .renderer import Renderer
+
+
+def export_markdown(document: Document, include_extensions: bool = True,
+                    renderer: Optional["MarkdownRenderer"] = None) -> str:
     """Export a parsed document back to markdown.
     
     Args:
         document: The parsed document
         include_extensions: Whether to include custom extensions
-        
+        renderer: Renderer used instead of the built-in one, whose own
+            include_extensions setting then applies
+    
     Returns:
         Markdown text
     """
+    if renderer is None:
+        renderer = _MARKDOWN_RENDERERS[include_extensions]
     lines = []
     
     for i, block in enumerate(document.blocks):
         # Add spacing between blocks
-        if i > 0 and not isinstance(document.blocks[i-1], HorizontalRule):
+        if i > 0 and not isinstance(document.blocks[i-1], (HorizontalRule, fast_nodes.HorizontalRule)):
             lines.append("")
-        
-        block_text = _export_block(block, include_extensions)
+    
+        block_text = renderer.render(block)
         if block_text:
             lines.append(block_text)
     
     return '\n'.join(lines)
 
 
-def _export_block(block: BlockElement, include_extensions: bool) -> str:
-    """Export a single block element."""
-    if isinstance(block, Heading):
-        return _export_heading(block)
-    elif isinstance(block, Paragraph):
-        return _export_paragraph(block)
-    elif isinstance(block, ListElement):
-        return _export_list(block)
-    elif isinstance(block, Quote):
-        return _export_quote(block)
-    elif isinstance(block, CodeBlock):
-        return _export_code_block(block, include_extensions)
-    elif isinstance(block, Table):
-        return _export_table(block)
-    elif isinstance(block, HorizontalRule):
-        return "---"
-    elif isinstance(block, Align):
-        return _export_align(block, include_extensions)
-    else:
-        return ""
-
-
-def _export_heading(heading: Heading) -> str:
+def _export_heading(renderer: Renderer, heading: models.Heading) -> str:
     """Export a heading."""
     prefix = '#' * heading.level
-    content = _export_inline_elements(heading.content)
+    content = renderer.render_all(heading.content)
     return f"{prefix} {content}"
 
 
-def _export_paragraph(paragraph: Paragraph) -> str:
+def _export_paragraph(renderer: Renderer, paragraph: models.Paragraph) -> str:
     """Export a paragraph."""
-    return _export_inline_elements(paragraph.content)
+    return renderer.render_all(paragraph.content)
 
 
-def _export_list(list_elem: ListElement, indent: int = 0) -> str:
-    """Export a list."""
+def _export_list(renderer: Renderer, list_elem: models.ListElement) -> str:
+    """Export a list.
+    
+    Nested lists go through the renderer like any other node, so an override
+    of ListElement applies to them too; their lines are then indented under
+    the item.
+    """
     lines = []
     
     for i, item in enumerate(list_elem.items):
@@ -93,52 +63,53 @@ def _export_list(list_elem: ListElement, indent: int = 0) -> str:
             marker = f"{number}."
         else:
             marker = "-"
-        
+    
         # Add indentation
-        prefix = "  " * (indent + item.indent_level) + marker + " "
-        
+        prefix = "  " * item.indent_level + marker + " "
+        nested_indent = "  " * (item.indent_level + 1)
+    
         # Export item content
         item_lines = []
         for element in item.content:
-            if isinstance(element, ListElement):
+            if isinstance(element, (ListElement, fast_nodes.ListElement)):
                 # Nested list
-                nested_text = _export_list(element, indent + item.indent_level + 1)
-                item_lines.extend(nested_text.split('\n'))
+                nested_text = renderer.render(element)
+                item_lines.extend(nested_indent + line for line in nested_text.split('\n'))
             else:
                 # Inline content
-                text = _export_inline_element(element)
+                text = renderer.render(element)
                 if text:
                     item_lines.append(text)
-        
+    
         # Format the item
         if item_lines:
             lines.append(prefix + item_lines[0])
             for line in item_lines[1:]:
-                lines.append("  " * (indent + item.indent_level + 1) + line)
+                lines.append(nested_indent + line)
     
     return '\n'.join(lines)
 
 
-def _export_quote(quote: Quote) -> str:
+def _export_quote(renderer: Renderer, quote: models.Quote) -> str:
     """Export a quote block."""
     prefix = '>' * quote.level + ' '
     
     # For now, treat content as inline elements
-    content = _export_inline_elements(quote.content)
+    content = renderer.render_all(quote.content)
     
     # Add prefix to each line
     lines = content.split('\n')
     return '\n'.join(prefix + line for line in lines)
 
 
-def _export_code_block(code_block: CodeBlock, include_extensions: bool) -> str:
+def _export_code_block(renderer: Renderer, code_block: models.CodeBlock) -> str:
     """Export a code block."""
     if code_block.language or code_block.filename:
         # Fenced code block
         info = code_block.language or ""
-        if include_extensions and code_block.filename:
+        if renderer.include_extensions and code_block.filename:
             info += f" {code_block.filename}"
-        
+    
         lines = ["```" + info]
         lines.extend(code_block.code.split('\n'))
         lines.append("```")
@@ -151,12 +122,12 @@ def _export_code_block(code_block: CodeBlock, include_extensions: bool) -> str:
         return '\n'.join(lines)
 
 
-def _export_table(table: Table) -> str:
+def _export_table(renderer: Renderer, table: models.Table) -> str:
     """Export a table."""
     lines = []
     
     # Header
-    header_cells = [_export_inline_elements(cell.content) for cell in table.header.cells]
+    header_cells = [renderer.render_all(cell.content) for cell in table.header.cells]
     lines.append("| " + " | ".join(header_cells) + " |")
     
     # Separator
@@ -174,17 +145,22 @@ def _export_table(table: Table) -> str:
     
     # Data rows
     for row in table.rows:
-        cells = [_export_inline_elements(cell.content) for cell in row.cells]
+        cells = [renderer.render_all(cell.content) for cell in row.cells]
         lines.append("| " + " | ".join(cells) + " |")
     
     return '\n'.join(lines)
 
 
-def _export_align(align: Align, include_extensions: bool) -> str:
+def _export_horizontal_rule(renderer: Renderer, rule: models.HorizontalRule) -> str:
+    """Export a horizontal rule."""
+    return "---"
+
+
+def _export_align(renderer: Renderer, align: models.Align) -> str:
     """Export an align element."""
-    if not include_extensions:
+    if not renderer.include_extensions:
         # Just export the content without alignment
-        return _export_inline_elements(align.content)
+        return renderer.render_all(align.content)
     
     # Determine tag name
     tag_map = {
@@ -194,7 +170,7 @@ def _export_align(align: Align, include_extensions: bool) -> str:
     }
     tag = tag_map.get(align.alignment.value, 'Align')
     
-    content = _export_inline_elements(align.content)
+    content = renderer.render_all(align.content)
     
     if tag == 'Align':
         return f"<Align {align.alignment.value}>{content}</Align>"
@@ -202,57 +178,166 @@ def _export_align(align: Align, include_extensions: bool) -> str:
         return f"<{tag}>{content}</{tag}>"
 
 
-def _export_inline_elements(elements: List[InlineElement]) -> str:
-    """Export a list of inline elements."""
-    return ''.join(_export_inline_element(elem) for elem in elements)
-
-
-def _export_inline_element(element: InlineElement) -> str:
-    """Export a single inline element."""
-    if isinstance(element, Text):
-        return element.content
-    elif isinstance(element, Bold):
-        return f"**{element.content}**"
-    elif isinstance(element, Italic):
-        return f"*{element.content}*"
-    elif isinstance(element, Code):
-        return f"`{element.content}`"
-    elif isinstance(element, Link):
-        text = f"[{element.content}]({element.url}"
-        if element.title:
-            text += f' "{element.title}"'
-        text += ")"
-        return text
-    elif isinstance(element, Image):
-        text = f"![{element.alt}]({element.url})"
-        if element.size is not None or element.css:
-            attrs = []
-            if element.size is not None:
-                attrs.append(f"size={element.size}")
-            if element.css:
-                attrs.append(f'css="{element.css}"')
-            text += "{" + ", ".join(attrs) + "}"
-        return text
-    else:
-        return ""
+def _export_text(renderer: Renderer, element: models.Text) -> str:
+    """Export a text element."""
+    return element.content
+
+
+def _export_bold(renderer: Renderer, element: models.Bold) -> str:
+    """Export bold text."""
+    return f"**{element.content}**"
+
+
+def _export_italic(renderer: Renderer, element: models.Italic) -> str:
+    """Export italic text."""
+    return f"*{element.content}*"
+
+
+def _export_code(renderer: Renderer, element: models.Code) -> str:
+    """Export inline code."""
+    return f"`{element.content}`"
+
+
+def _export_link(renderer: Renderer, element: models.Link) -> str:
+    """Export a link."""
+    text = f"[{element.content}]({element.url}"
+    if element.title:
+        text += f' "{element.title}"'
+    text += ")"
+    return text
+
+
+def _export_image(renderer: Renderer, element: models.Image) -> str:
+    """Export an image."""
+    text = f"![{element.alt}]({element.url})"
+    if element.size is not None or element.css:
+        attrs = []
+        if element.size is not None:
+            attrs.append(f"size={element.size}")
+        if element.css:
+            attrs.append(f'css="{element.css}"')
+        text += "{" + ", ".join(attrs) + "}"
+    return text
 
 
 # HTML Export functionality
-def export_html(document: Document, include_extensions: bool = True, title: str = "Document") -> str:
+
+# Characters buffered by export_html_to() between writes
+HTML_WRITE_BUFFER = 64 * 1024
+
+_HTML_TAIL = "\n</body>\n</html>"
+
+
+def export_html(document: Document, include_extensions: bool = True, title: str = "Document",
+                renderer: Optional["HtmlRenderer"] = None) -> str:
     """Export a parsed document to HTML.
     
     Args:
         document: The parsed document
         include_extensions: Whether to include custom extensions
         title: Title for the HTML document
-        
+        renderer: Renderer used instead of the built-in one, whose own
+            include_extensions setting then applies
+    
     Returns:
         HTML text
     """
-    html_parts = []
+    return ''.join(iter_export_html(document, include_extensions, title, renderer))
+
+
+def export_html_bytes(document: Document, include_extensions: bool = True,
+                      title: str = "Document",
+                      renderer: Optional["HtmlRenderer"] = None) -> bytes:
+    """Export a parsed document to UTF-8 encoded HTML.
+    
+    The page is joined as text and encoded once: a single encode of the
+    whole page costs less than encoding it piece by piece into a buffer.
+    
+    Args:
+        document: The parsed document
+        include_extensions: Whether to include custom extensions
+        title: Title for the HTML document
+        renderer: Renderer used instead of the built-in one, see export_html()
+    
+    Returns:
+        export_html(document) encoded as UTF-8
+    """
+    return export_html(document, include_extensions, title, renderer).encode("utf-8")
+
+
+def iter_export_html(document: Document, include_extensions: bool = True,
+                     title: str = "Document",
+                     renderer: Optional["HtmlRenderer"] = None) -> Iterator[str]:
+    """Export a parsed document to HTML piece by piece.
+    
+    Yields the head, then each block, with tables and lists split into rows
+    and items, then the tail. The pieces joined are export_html(document), so
+    a page can be streamed without holding all of it in memory.
+    
+    Args:
+        document: The parsed document
+        include_extensions: Whether to include custom extensions
+        title: Title for the HTML document
+        renderer: Renderer used instead of the built-in one, see export_html()
+    
+    Yields:
+        Consecutive pieces of the HTML text
+    """
+    if renderer is None:
+        renderer = _HTML_RENDERERS[include_extensions]
+    yield _html_head(title)
+    
+    for block in document.blocks:
+        pieces = renderer.iter_render(block)
+        first = next(pieces, None)
+        if first is not None:
+            yield "\n" + first
+            yield from pieces
+    
+    yield _HTML_TAIL
+
+
+def export_html_to(document: Document, fp: IO[str], include_extensions: bool = True,
+                   title: str = "Document", buffer_size: int = HTML_WRITE_BUFFER,
+                   renderer: Optional["HtmlRenderer"] = None) -> int:
+    """Export a parsed document to HTML, writing it to a text file object.
+    
+    Pieces from iter_export_html() are collected up to buffer_size characters
+    before each write, so memory use stays bounded whatever the page size.
+    
+    Args:
+        document: The parsed document
+        fp: File object opened in text mode, or anything with a write() method
+        include_extensions: Whether to include custom extensions
+        title: Title for the HTML document
+        buffer_size: Characters collected before each write
+        renderer: Renderer used instead of the built-in one, see export_html()
+    
+    Returns:
+        The number of characters written
+    """
+    buffer = []
+    buffered = 0
+    written = 0
+    
+    for piece in iter_export_html(document, include_extensions, title, renderer):
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= buffer_size:
+            fp.write(''.join(buffer))
+            written += buffered
+            buffer.clear()
+            buffered = 0
     
-    # HTML document structure
-    html_parts.append(f"""<!DOCTYPE html>
+    if buffer:
+        fp.write(''.join(buffer))
+        written += buffered
+    return written
+
+
+def _html_head(title: str) -> str:
+    """Return the HTML document up to the opening body tag."""
+    return f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -337,98 +422,76 @@ def export_html(document: Document, include_extensions: bool = True, title: str
         .text-right {{ text-align: right; }}
     </style>
 </head>
-<body>""")
-    
-    # Export blocks
-    for block in document.blocks:
-        html_content = _export_block_html(block, include_extensions)
-        if html_content:
-            html_parts.append(html_content)
-    
-    html_parts.append("</body>\n</html>")
-    
-    return '\n'.join(html_parts)
-
-
-def _export_block_html(block: BlockElement, include_extensions: bool) -> str:
-    """Export a single block element to HTML."""
-    if isinstance(block, Heading):
-        return _export_heading_html(block)
-    elif isinstance(block, Paragraph):
-        return _export_paragraph_html(block)
-    elif isinstance(block, ListElement):
-        return _export_list_html(block)
-    elif isinstance(block, Quote):
-        return _export_quote_html(block)
-    elif isinstance(block, CodeBlock):
-        return _export_code_block_html(block, include_extensions)
-    elif isinstance(block, Table):
-        return _export_table_html(block)
-    elif isinstance(block, HorizontalRule):
-        return "<hr>"
-    elif isinstance(block, Align):
-        return _export_align_html(block, include_extensions)
-    else:
-        return ""
+<body>"""
 
 
-def _export_heading_html(heading: Heading) -> str:
+def _export_heading_html(renderer: Renderer, heading: models.Heading) -> str:
     """Export a heading to HTML."""
-    content = _export_inline_elements_html(heading.content)
+    content = renderer.render_all(heading.content)
     return f"<h{heading.level}>{content}</h{heading.level}>"
 
 
-def _export_paragraph_html(paragraph: Paragraph) -> str:
+def _export_paragraph_html(renderer: Renderer, paragraph: models.Paragraph) -> str:
     """Export a paragraph to HTML."""
-    content = _export_inline_elements_html(paragraph.content)
+    content = renderer.render_all(paragraph.content)
     return f"<p>{content}</p>"
 
 
-def _export_list_html(list_elem: ListElement) -> str:
+def _export_list_html(renderer: Renderer, list_elem: models.ListElement) -> str:
     """Export a list to HTML."""
-    tag = "ol" if list_elem.ordered else "ul"
-    start_attr = f' start="{list_elem.start_number}"' if list_elem.ordered and list_elem.start_number else ""
-    
-    items_html = []
+    return ''.join(_iter_list_html(renderer, list_elem))
+
+
+def _iter_list_html(renderer: Renderer, list_elem: models.ListElement) -> Iterator[str]:
+    """Export a list to HTML item by item."""
+    yield _list_open_html(list_elem.ordered, list_elem.start_number)
     for item in list_elem.items:
-        item_content = []
-        for element in item.content:
-            if isinstance(element, ListElement):
-                # Nested list
-                item_content.append(_export_list_html(element))
-            else:
-                # Inline content
-                item_content.append(_export_inline_element_html(element))
-        
-        items_html.append(f"<li>{''.join(item_content)}</li>")
-    
-    return f"<{tag}{start_attr}>{''.join(items_html)}</{tag}>"
+        # Nested lists are rendered like the inline content around them
+        yield f"<li>{renderer.render_all(item.content)}</li>"
+    yield "</ol>" if list_elem.ordered else "</ul>"
+
+
+def _list_open_html(ordered: bool, start_number: Optional[int]) -> str:
+    """Return the opening tag of a list."""
+    if not ordered:
+        return "<ul>"
+    return f'<ol start="{start_number}">' if start_number else "<ol>"
 
 
-def _export_quote_html(quote: Quote) -> str:
+def _export_quote_html(renderer: Renderer, quote: models.Quote) -> str:
     """Export a quote block to HTML."""
-    content = _export_inline_elements_html(quote.content)
+    content = renderer.render_all(quote.content)
     return f"<blockquote>{content}</blockquote>"
 
 
-def _export_code_block_html(code_block: CodeBlock, include_extensions: bool) -> str:
+def _export_code_block_html(renderer: Renderer, code_block: models.CodeBlock) -> str:
     """Export a code block to HTML."""
-    escaped_code = _escape_html(code_block.code)
+    return _code_block_html(code_block.language, code_block.filename, code_block.code,
+                            renderer.include_extensions)
+
+
+def _code_block_html(language: Optional[str], filename: Optional[str], code: str,
+                     include_extensions: bool) -> str:
+    """Return the HTML of a code block from its fields."""
+    escaped_code = _escape_html(code)
     
-    if code_block.language:
+    if language:
         title_html = ""
-        if include_extensions and code_block.filename:
-            title_html = f'<div style="background-color: #f1f3f4; padding: 8px 16px; margin: -16px -16px 16px -16px; border-bottom: 1px solid #d0d7de; font-weight: 600;">{_escape_html(code_block.filename)}</div>'
-        
-        return f'<pre>{title_html}<code class="language-{code_block.language}">{escaped_code}</code></pre>'
+        if include_extensions and filename:
+            title_html = f'<div style="background-color: #f1f3f4; padding: 8px 16px; margin: -16px -16px 16px -16px; border-bottom: 1px solid #d0d7de; font-weight: 600;">{_escape_html(filename)}</div>'
+    
+        return f'<pre>{title_html}<code class="language-{language}">{escaped_code}</code></pre>'
     else:
         return f"<pre><code>{escaped_code}</code></pre>"
 
 
-def _export_table_html(table: Table) -> str:
+def _export_table_html(renderer: Renderer, table: models.Table) -> str:
     """Export a table to HTML."""
-    html_parts = ["<table>"]
-    
+    return ''.join(_iter_table_html(renderer, table))
+
+
+def _iter_table_html(renderer: Renderer, table: models.Table) -> Iterator[str]:
+    """Export a table to HTML row by row."""
     # Header
     header_cells = []
     for i, cell in enumerate(table.header.cells):
@@ -436,14 +499,14 @@ def _export_table_html(table: Table) -> str:
         style = ""
         if alignment:
             style = f' style="text-align: {alignment};"'
-        content = _export_inline_elements_html(cell.content)
+        content = renderer.render_all(cell.content)
         header_cells.append(f"<th{style}>{content}</th>")
     
-    html_parts.append(f"<thead><tr>{''.join(header_cells)}</tr></thead>")
+    yield f"<table><thead><tr>{''.join(header_cells)}</tr></thead>"
     
     # Rows
     if table.rows:
-        row_htmls = []
+        yield "<tbody>"
         for row in table.rows:
             cells = []
             for i, cell in enumerate(row.cells):
@@ -451,64 +514,84 @@ def _export_table_html(table: Table) -> str:
                 style = ""
                 if alignment:
                     style = f' style="text-align: {alignment};"'
-                content = _export_inline_elements_html(cell.content)
+                content = renderer.render_all(cell.content)
                 cells.append(f"<td{style}>{content}</td>")
-            row_htmls.append(f"<tr>{''.join(cells)}</tr>")
-        
-        html_parts.append(f"<tbody>{''.join(row_htmls)}</tbody>")
+            yield f"<tr>{''.join(cells)}</tr>"
+        yield "</tbody>"
     
-    html_parts.append("</table>")
-    return ''.join(html_parts)
+    yield "</table>"
+
+
+def _export_horizontal_rule_html(renderer: Renderer, rule: models.HorizontalRule) -> str:
+    """Export a horizontal rule to HTML."""
+    return "<hr>"
 
 
-def _export_align_html(align: Align, include_extensions: bool) -> str:
+def _export_align_html(renderer: Renderer, align: models.Align) -> str:
     """Export an align element to HTML."""
-    if not include_extensions:
+    if not renderer.include_extensions:
         # Just export the content without alignment
-        return _export_inline_elements_html(align.content)
+        return renderer.render_all(align.content)
     
     css_class = f"text-{align.alignment.value}"
-    content = _export_inline_elements_html(align.content)
+    content = renderer.render_all(align.content)
     return f'<div class="{css_class}">{content}</div>'
 
 
-def _export_inline_elements_html(elements: List[InlineElement]) -> str:
-    """Export a list of inline elements to HTML."""
-    return ''.join(_export_inline_element_html(elem) for elem in elements)
-
-
-def _export_inline_element_html(element: InlineElement) -> str:
-    """Export a single inline element to HTML."""
-    if isinstance(element, Text):
-        return _escape_html(element.content)
-    elif isinstance(element, Bold):
-        return f"<strong>{_escape_html(element.content)}</strong>"
-    elif isinstance(element, Italic):
-        return f"<em>{_escape_html(element.content)}</em>"
-    elif isinstance(element, Code):
-        return f"<code>{_escape_html(element.content)}</code>"
-    elif isinstance(element, Link):
-        url = _escape_html(element.url)
-        content = _escape_html(element.content)
-        title_attr = f' title="{_escape_html(element.title)}"' if element.title else ""
-        return f'<a href="{url}"{title_attr}>{content}</a>'
-    elif isinstance(element, Image):
-        url = _escape_html(element.url)
-        alt = _escape_html(element.alt)
-        title_attr = f' title="{_escape_html(element.title)}"' if element.title else ""
-        
-        # Handle custom attributes
-        style_parts = []
-        if element.size is not None:
-            style_parts.append(f"width: {element.size * 100}%")
-        if element.css:
-            style_parts.append(element.css)
-        
-        style_attr = f' style="{"; ".join(style_parts)}"' if style_parts else ""
-        
-        return f'<img src="{url}" alt="{alt}"{title_attr}{style_attr}>'
-    else:
-        return ""
+def _export_text_html(renderer: Renderer, element: models.Text) -> str:
+    """Export a text element to HTML."""
+    return _escape_html(element.content)
+
+
+def _export_bold_html(renderer: Renderer, element: models.Bold) -> str:
+    """Export bold text to HTML."""
+    return f"<strong>{_escape_html(element.content)}</strong>"
+
+
+def _export_italic_html(renderer: Renderer, element: models.Italic) -> str:
+    """Export italic text to HTML."""
+    return f"<em>{_escape_html(element.content)}</em>"
+
+
+def _export_code_html(renderer: Renderer, element: models.Code) -> str:
+    """Export inline code to HTML."""
+    return f"<code>{_escape_html(element.content)}</code>"
+
+
+def _export_link_html(renderer: Renderer, element: models.Link) -> str:
+    """Export a link to HTML."""
+    return _link_html(element.content, element.url, element.title)
+
+
+def _link_html(content: str, url: str, title: Optional[str]) -> str:
+    """Return the HTML of a link from its fields."""
+    title_attr = f' title="{_escape_html(title)}"' if title else ""
+    return f'<a href="{_escape_html(url)}"{title_attr}>{_escape_html(content)}</a>'
+
+
+def _export_image_html(renderer: Renderer, element: models.Image) -> str:
+    """Export an image to HTML."""
+    return _image_html(element.content, element.url, element.title, element.size,
+                       element.css)
+
+
+def _image_html(alt: str, url: str, title: Optional[str], size: Optional[float],
+                css: Optional[str]) -> str:
+    """Return the HTML of an image from its fields."""
+    url = _escape_html(url)
+    alt = _escape_html(alt)
+    title_attr = f' title="{_escape_html(title)}"' if title else ""
+    
+    # Handle custom attributes
+    style_parts = []
+    if size is not None:
+        style_parts.append(f"width: {size * 100}%")
+    if css:
+        style_parts.append(css)
+    
+    style_attr = f' style="{"; ".join(style_parts)}"' if style_parts else ""
+    
+    return f'<img src="{url}" alt="{alt}"{title_attr}{style_attr}>'
 
 
 def _escape_html(text: str) -> str:
@@ -519,4 +602,91 @@ def _escape_html(text: str) -> str:
                 .replace("<", "&lt;")
                 .replace(">", "&gt;")
                 .replace('"', "&quot;")
-                .replace("'", "&#x27;")) 
\ No newline at end of file
+                .replace("'", "&#x27;"))
+
+
+# Renderers
+
+def _for_both(renderers: dict) -> dict:
+    """Register each models renderer for the lightweight node of the same name too."""
+    table = {}
+    for model_type, function in renderers.items():
+        table[model_type] = function
+        table[getattr(fast_nodes, model_type.__name__)] = function
+    return table
+
+
+class MarkdownRenderer(Renderer):
+    """Renders nodes back to markdown, see Renderer."""
+    
+    RENDERERS = _for_both({
+        models.Heading: _export_heading,
+        models.Paragraph: _export_paragraph,
+        models.ListElement: _export_list,
+        models.Quote: _export_quote,
+        models.CodeBlock: _export_code_block,
+        models.Table: _export_table,
+        models.HorizontalRule: _export_horizontal_rule,
+        models.Align: _export_align,
+        models.Text: _export_text,
+        models.Bold: _export_bold,
+        models.Italic: _export_italic,
+        models.Code: _export_code,
+        models.Link: _export_link,
+        models.Image: _export_image,
+    })
+
+
+class HtmlRenderer(Renderer):
+    """Renders nodes to HTML, see Renderer.
+    
+    Built-in tables and lists can also be rendered row by row and item by
+    item with iter_render(), which iter_export_html() uses for streaming.
+    """
+    
+    RENDERERS = _for_both({
+        models.Heading: _export_heading_html,
+        models.Paragraph: _export_paragraph_html,
+        models.ListElement: _export_list_html,
+        models.Quote: _export_quote_html,
+        models.CodeBlock: _export_code_block_html,
+        models.Table: _export_table_html,
+        models.HorizontalRule: _export_horizontal_rule_html,
+        models.Align: _export_align_html,
+        models.Text: _export_text_html,
+        models.Bold: _export_bold_html,
+        models.Italic: _export_italic_html,
+        models.Code: _export_code_html,
+        models.Link: _export_link_html,
+        models.Image: _export_image_html,
+    })
+    
+    ITERATORS = _for_both({
+        models.ListElement: _iter_list_html,
+        models.Table: _iter_table_html,
+    })
+    
+    def __init__(self, include_extensions: bool = True):
+        super().__init__(include_extensions)
+        self._iterators = dict(self.ITERATORS)
+    
+    def register(self, node_type, function=None):
+        if function is not None:
+            # The override also replaces the built-in piecewise rendering
+            self._iterators.pop(node_type, None)
+        return super().register(node_type, function)
+    
+    def iter_render(self, node) -> Iterator[str]:
+        """Render a node piece by piece, yielding nothing for empty output."""
+        iterate = self._iterators.get(type(node))
+        if iterate is not None:
+            yield from iterate(self, node)
+        else:
+            html = self.render(node)
+            if html:
+                yield html
+
+
+# Shared renderers used when export functions get no renderer of their own
+_MARKDOWN_RENDERERS = {flag: MarkdownRenderer(flag) for flag in (True, False)}
+_HTML_RENDERERS = {flag: HtmlRenderer(flag) for flag in (True, False)}
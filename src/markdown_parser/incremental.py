@@ -0,0 +1,385 @@
+"""Incremental re-parsing of edited documents.
+
+A document returned by parse() keeps its source lines and the line range of
+every block. After an edit, parsing restarts at the last position before the
+edit whose result could change, and stops at the first position after the edit
+where the old parse also started: from there on the source is unchanged, so the
+old blocks are still valid and only their spans move by the size of the edit.
+
+Moving them is left until the document is next read: the edit records the
+move in a _PendingShifts of the document, and the document calls
+apply_shifts() when its blocks or their line ranges are read. An edit thus
+costs the same however many blocks follow it, and several edits between reads
+move the blocks once.
+"""
+
+from bisect import bisect_left, bisect_right
+from types import ModuleType
+from typing import Any, Callable, List, Sequence, Tuple, Union
+from . import models, nodes as fast_nodes
+from .parser import _iter_blocks
+from .positions import shift_spans
+from .regex_patterns import ALIGN_CLOSE_PATTERN, ALIGN_TAG_PATTERN
+
+# Lines parsed per window after the edit before the window is doubled
+_WINDOW = 64
+
+# Steps of pending shifts after which they are applied, see _PendingShifts
+_MAX_SHIFTS = 64
+
+
+def apply_edit(document: Union[models.Document, fast_nodes.Document],
+               start_offset: int, end_offset: int,
+               new_text: str) -> Tuple[int, int, int]:
+    """Replace source text of a parsed document and update its blocks in place.
+
+    Only the blocks overlapping the edit are re-parsed, plus the neighbors
+    whose boundaries the edit can move, such as an open code fence, a table,
+    a list or an <Align> region that now extends further or ends earlier.
+    The document ends up equal to parse() of the edited source.
+
+    Args:
+        document: Document returned by parse(), validated or not
+        start_offset: Source position where the replaced text starts
+        end_offset: Source position where the replaced text ends (exclusive)
+        new_text: Text inserted in place of the replaced text
+
+    Returns:
+        A tuple (index, removed, inserted): the old blocks[index:index + removed]
+        were replaced by the new blocks[index:index + inserted]
+
+    Raises:
+        ValueError: If the document has no source or the offsets are out of range
+    """
+    # Read the blocks as they are, with the shifts still pending
+    shifts = document._span_shifts or _PendingShifts()
+    document._span_shifts = None
+    try:
+        result = _apply_edit(document, shifts, start_offset, end_offset, new_text)
+    finally:
+        document._span_shifts = shifts if shifts.starts else None
+    if len(shifts.starts) > _MAX_SHIFTS:
+        apply_shifts(document)
+    return result
+
+
+def _apply_edit(document: Union[models.Document, fast_nodes.Document],
+                shifts: "_PendingShifts", start_offset: int, end_offset: int,
+                new_text: str) -> Tuple[int, int, int]:
+    """Do apply_edit(), recording the move of the following blocks in shifts."""
+    lines = document._lines
+    blocks = document.blocks
+    if lines is None:
+        raise ValueError("Document has no source to edit; use a document returned by parse()")
+    if not 0 <= start_offset <= end_offset:
+        raise ValueError(f"Invalid edit range: {start_offset}..{end_offset}")
+
+    # The line ranges and spans of the blocks with the pending shifts applied
+    block_lines = _ShiftedLines(document._block_lines, shifts)
+    spans = _ShiftedSpans(blocks, shifts)
+
+    nodes = models if isinstance(document, models.Document) else fast_nodes
+
+    start_line, start_column, start_line_offset = _locate(lines, block_lines, spans,
+                                                          start_offset)
+    end_line, end_column, _ = _locate(lines, block_lines, spans, end_offset)
+    replacement = (lines[start_line][:start_column] + new_text +
+                   lines[end_line][end_column:]).split('\n')
+    closes = [k for k, line in enumerate(replacement) if ALIGN_CLOSE_PATTERN.search(line)]
+
+    # Restart at the first block whose parse can see the edited lines, since
+    # parsing a block looks at most one line past its end, or earlier at a
+    # line between blocks whose lookahead reaches the edit
+    first = bisect_left(block_lines, start_line - 1, key=_end_line)
+    restart = max(start_line - 2, 0)
+    if first > 0:
+        restart = max(restart, block_lines[first - 1][1])
+    if first < len(blocks) and block_lines[first][0] <= restart:
+        restart = block_lines[first][0]
+        offset = spans[first][0]
+    else:
+        offset = start_line_offset
+        for k in range(restart, start_line):
+            offset -= len(lines[k]) + 1
+
+    # An <Align> tag left unclosed before the edit is closed by a </Align>
+    # tag that the edit adds after all the others
+    align_close = _last_align_close(document)
+    if closes and align_close < start_line:
+        for line in range(align_close + 1, restart):
+            if ALIGN_TAG_PATTERN.match(lines[line].strip()) and _is_visited(block_lines, line):
+                restart = line
+                offset = _visited_line_offset(lines, block_lines, spans, line)
+                break
+
+    first = bisect_left(block_lines, restart, key=_start_line)
+
+    # Replace the edited lines
+    lines[start_line:end_line + 1] = replacement
+    line_delta = len(replacement) - (end_line + 1 - start_line)
+    char_delta = len(new_text) - (end_offset - start_offset)
+    edit_end = start_line + len(replacement)  # First unchanged line
+
+    if align_close > end_line:
+        align_close += line_delta
+    elif closes:
+        align_close = start_line + closes[-1]
+    elif align_close >= start_line:
+        align_close = _find_align_close(lines, start_line)
+    document._align_close = align_close
+
+    def synced(line: int) -> bool:
+        """Check whether the old parse visited the same source at line."""
+        return line >= edit_end and _is_visited(block_lines, line - line_delta)
+
+    new_blocks, new_lines, position = _reparse_until(
+        lines, restart, offset, synced, nodes, align_close, document._track_spans,
+        size=2 * (edit_end - restart) + 2)
+
+    # Splice the new blocks in; the blocks after them move when next read
+    last = bisect_left(block_lines, position - line_delta, key=_start_line)
+    blocks[first:last] = new_blocks
+    document._block_lines[first:last] = new_lines
+    shifts.splice(first, last, len(new_blocks), line_delta, char_delta)
+
+    return first, last - first, len(new_blocks)
+
+
+def apply_shifts(document: Union[models.Document, fast_nodes.Document]) -> None:
+    """Move the blocks by the shifts that apply_edit() left pending.
+
+    Called by the document when its blocks or their line ranges are read.
+    """
+    shifts = document._span_shifts
+    document._span_shifts = None
+    blocks = document.blocks
+    block_lines = document._block_lines
+    track_spans = document._track_spans
+
+    ends = shifts.starts[1:] + [len(blocks)]
+    for start, end, line_delta, char_delta in zip(shifts.starts, ends,
+                                                  shifts.lines, shifts.chars):
+        for k in range(start, end):
+            first_line, end_line = block_lines[k]
+            block_lines[k] = (first_line + line_delta, end_line + line_delta)
+            if not char_delta:
+                continue
+            block = blocks[k]
+            if track_spans:
+                shift_spans(block, char_delta)
+            else:
+                span_start, span_end = block.span
+                block.span = (span_start + char_delta, span_end + char_delta)
+
+
+class _PendingShifts:
+    """Moves of blocks that apply_edit() has not applied to them yet.
+
+    A step function of the block index: the blocks from starts[k] up to
+    starts[k + 1] move by lines[k] lines and chars[k] source positions, and
+    the blocks before starts[0] stay. Repeated edits at one place update the
+    same step.
+    """
+
+    __slots__ = ("starts", "lines", "chars")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.lines: List[int] = []
+        self.chars: List[int] = []
+
+    def at(self, index: int) -> Tuple[int, int]:
+        """Return the line and position shift of the block at index."""
+        k = bisect_right(self.starts, index) - 1
+        if k < 0:
+            return 0, 0
+        return self.lines[k], self.chars[k]
+
+    def splice(self, first: int, last: int, inserted: int,
+               line_delta: int, char_delta: int) -> None:
+        """Record an edit replacing blocks[first:last] with inserted new blocks.
+
+        The new blocks are in place, and the blocks after them move by
+        line_delta lines and char_delta positions more than before.
+        """
+        tail_lines, tail_chars = self.at(last)
+        before = bisect_left(self.starts, first)
+        after = bisect_right(self.starts, last)
+        moved = inserted - (last - first)
+
+        starts = self.starts[:before] + [first, first + inserted]
+        lines = self.lines[:before] + [0, tail_lines + line_delta]
+        chars = self.chars[:before] + [0, tail_chars + char_delta]
+        starts += [start + moved for start in self.starts[after:]]
+        lines += [shift + line_delta for shift in self.lines[after:]]
+        chars += [shift + char_delta for shift in self.chars[after:]]
+
+        # Leave out empty steps and steps that do not change the shift
+        self.starts, self.lines, self.chars = [], [], []
+        previous = (0, 0)
+        for k, start in enumerate(starts):
+            if k + 1 < len(starts) and starts[k + 1] == start:
+                continue
+            if (lines[k], chars[k]) != previous:
+                self.starts.append(start)
+                self.lines.append(lines[k])
+                self.chars.append(chars[k])
+                previous = (lines[k], chars[k])
+
+
+class _ShiftedLines(Sequence[Tuple[int, int]]):
+    """The [start, end) line ranges of blocks with the pending shifts applied."""
+
+    def __init__(self, block_lines: List[Tuple[int, int]], shifts: _PendingShifts):
+        self.block_lines = block_lines
+        self.shifts = shifts
+
+    def __len__(self) -> int:
+        return len(self.block_lines)
+
+    def __getitem__(self, index: Any) -> Any:
+        start, end = self.block_lines[index]
+        line_delta = self.shifts.at(index)[0]
+        return start + line_delta, end + line_delta
+
+
+class _ShiftedSpans(Sequence[Tuple[int, int]]):
+    """The source spans of blocks with the pending shifts applied."""
+
+    def __init__(self, blocks: list, shifts: _PendingShifts):
+        self.blocks = blocks
+        self.shifts = shifts
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __getitem__(self, index: Any) -> Any:
+        start, end = self.blocks[index].span
+        char_delta = self.shifts.at(index)[1]
+        return start + char_delta, end + char_delta
+
+
+def _reparse_until(lines: List[str], position: int, offset: int,
+                  synced: Callable[[int], bool], nodes: ModuleType = models,
+                  align_close: int = -1, track_spans: bool = False, size: int = 0
+                  ) -> Tuple[list, List[Tuple[int, int]], int]:
+    """Parse lines from position until synced(line) says an old parse lines up.
+
+    Parsing runs in growing windows, so only the lines up to the first synced
+    line after position are parsed, plus the lookahead of the last block.
+
+    Args:
+        lines: All source lines
+        position: Line to start parsing at, visited by the parse of all lines
+        offset: Source position of lines[position]
+        synced: Returns True for a line at which the old parse is valid again
+        nodes: Module providing the node classes
+        align_close: Last line with a </Align> tag, or -1
+        track_spans: Record the source span of every node, see parse()
+        size: Number of lines parsed in the first window, at least _WINDOW
+
+    Returns:
+        The new blocks, their [start, end) line ranges and the synced line,
+        or len(lines) when the parse never lined up
+    """
+    new_blocks = []
+    new_lines: List[Tuple[int, int]] = []
+    size = max(_WINDOW, size)
+
+    while True:
+        stop = min(len(lines), position + size)
+        window = lines[position:stop]
+        consumed = 0
+
+        for block, start, consumed in _iter_blocks(
+                window, nodes, offset, at_end=stop == len(lines),
+                stop_at=lambda i: synced(position + i),
+                aligns_final=stop > align_close, track_spans=track_spans):
+            if block:
+                new_blocks.append(block)
+                new_lines.append((position + start, position + consumed))
+
+        for k in range(position, position + consumed):
+            offset += len(lines[k]) + 1
+        position += consumed
+
+        if position == len(lines) or synced(position):
+            return new_blocks, new_lines, position
+        size *= 2
+
+
+def _locate(lines: List[str], block_lines: Sequence[Tuple[int, int]],
+            spans: Sequence[Tuple[int, int]], offset: int) -> Tuple[int, int, int]:
+    """Find the source line containing offset.
+
+    Returns the line index, the column of offset in the line and the source
+    position of the start of the line.
+    """
+    k = bisect_right(spans, offset, key=_span_start) - 1
+
+    # Walk forward from the start of the closest block
+    if k >= 0:
+        line = block_lines[k][0]
+        line_offset = spans[k][0]
+    else:
+        line = 0
+        line_offset = 0
+
+    while offset > line_offset + len(lines[line]):
+        line_offset += len(lines[line]) + 1
+        line += 1
+        if line == len(lines):
+            raise ValueError(f"Offset {offset} is past the end of the document")
+
+    return line, offset - line_offset, line_offset
+
+
+def _is_visited(block_lines: Sequence[Tuple[int, int]], line: int) -> bool:
+    """Check whether parsing visited line, i.e. it is not inside a block."""
+    k = bisect_right(block_lines, line, key=_start_line) - 1
+    return k < 0 or line == block_lines[k][0] or line >= block_lines[k][1]
+
+
+def _visited_line_offset(lines: List[str], block_lines: Sequence[Tuple[int, int]],
+                         spans: Sequence[Tuple[int, int]], line: int) -> int:
+    """Return the source position of a line that parsing visited."""
+    k = bisect_right(block_lines, line, key=_start_line) - 1
+
+    if k >= 0 and block_lines[k][0] == line:
+        return spans[k][0]
+
+    # Walk the lines between the previous block and line
+    if k >= 0:
+        current, offset = block_lines[k][1], spans[k][1] + 1
+    else:
+        current, offset = 0, 0
+    for k in range(current, line):
+        offset += len(lines[k]) + 1
+    return offset
+
+
+def _last_align_close(document: Union[models.Document, fast_nodes.Document]) -> int:
+    """Return the last line with a </Align> tag, or -1, finding it on first use."""
+    if document._align_close is None:
+        document._align_close = _find_align_close(document._lines, len(document._lines))
+    return document._align_close
+
+
+def _find_align_close(lines: List[str], end: int) -> int:
+    """Return the last line before end with a </Align> tag, or -1."""
+    for line in range(end - 1, -1, -1):
+        if ALIGN_CLOSE_PATTERN.search(lines[line]):
+            return line
+    return -1
+
+
+def _start_line(lines: Tuple[int, int]) -> int:
+    return lines[0]
+
+
+def _end_line(lines: Tuple[int, int]) -> int:
+    return lines[1]
+
+
+def _span_start(span: Tuple[int, int]) -> int:
+    return span[0]
@@ -0,0 +1,299 @@
+"""JSON export of parsed documents for the frontend editor.
+
+The text is written directly, without going through Pydantic serializers,
+from models or lightweight nodes alike, and Document.model_validate_json()
+reads it back. The schema:
+
+    document    {"blocks": [block, ...], "metadata": {...}}
+    element     {"type": <ElementType value>, "raw_text": str|null,
+                 "span": [start, end]|null, <fields>}
+
+Element fields, in this order, after type, raw_text and span:
+
+    text, bold, italic, code  "content": str
+    link              "content": str, "url": str, "title": str|null
+    image             "content": str (alt text), "url": str, "title": str|null,
+                      "size": number|null, "css": str|null
+    heading           "level": int, "content": [inline, ...]
+    paragraph         "content": [inline, ...]
+    list              "ordered": bool, "items": [item, ...], "start_number": int|null
+    quote             "content": [element, ...], "level": int
+    code_block        "language": str|null, "filename": str|null, "code": str
+    table             "header": row, "alignments": [str|null, ...], "rows": [row, ...]
+    horizontal_rule   no fields
+    align             "alignment": "left"|"center"|"right", "content": [element, ...]
+
+List items, table rows and cells have no type:
+
+    item              {"content": [inline or list, ...], "indent_level": int,
+                       "span": [start, end]|null}
+    row               {"cells": [cell, ...], "span": [start, end]|null}
+    cell              {"content": [inline, ...], "alignment": str|null,
+                       "span": [start, end]|null}
+
+With exclude_defaults, fields equal to their default are left out: null
+values, an indent_level of 0, a quote level of 1 and empty metadata. The
+type of elements is always written.
+"""
+
+import json
+from json.encoder import encode_basestring
+from typing import Any, Callable, Dict, Iterator, List, Union
+from . import models, nodes as fast_nodes
+
+_Writer = Callable[[Any, List[str], bool], None]
+
+
+def export_json(document: Union[models.Document, fast_nodes.Document],
+                exclude_defaults: bool = False) -> str:
+    """Export a parsed document to JSON.
+
+    Args:
+        document: A document from parse(), with validate True or False
+        exclude_defaults: Leave out fields equal to their default, see the
+            module docstring
+
+    Returns:
+        JSON text, read back by Document.model_validate_json()
+    """
+    return ''.join(iter_export_json(document, exclude_defaults))
+
+
+def iter_export_json(document: Union[models.Document, fast_nodes.Document],
+                     exclude_defaults: bool = False) -> Iterator[str]:
+    """Export a parsed document to JSON block by block.
+
+    Yields the opening of the document, then each block, then the closing
+    with the metadata. The pieces joined are export_json(document).
+
+    Args:
+        document: A document from parse(), with validate True or False
+        exclude_defaults: Leave out fields equal to their default
+
+    Yields:
+        Consecutive pieces of the JSON text
+    """
+    yield '{"blocks":['
+    out: List[str] = []
+    for i, block in enumerate(document.blocks):
+        if i:
+            out.append(',')
+        _WRITERS[type(block)](block, out, exclude_defaults)
+        yield ''.join(out)
+        out.clear()
+
+    if exclude_defaults and not document.metadata:
+        yield ']}'
+    else:
+        yield f'],"metadata":{json.dumps(document.metadata, ensure_ascii=False)}}}'
+
+
+def _head(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    """Write the opening of an element: its type, raw_text and span."""
+    raw_text = node.raw_text
+    span = node.span
+    head = _TYPE_HEADS[node.type]
+    if raw_text is None and span is None:
+        out.append(head if exclude_defaults else head + ',"raw_text":null,"span":null')
+        return
+
+    out.append(head)
+    if raw_text is not None:
+        out.append(f',"raw_text":{encode_basestring(raw_text)}')
+    elif not exclude_defaults:
+        out.append(',"raw_text":null')
+    _span(span, out, exclude_defaults)
+
+
+def _span(span: Any, out: List[str], exclude_defaults: bool) -> None:
+    """Write the span field."""
+    if span is not None:
+        out.append(f',"span":[{span[0]},{span[1]}]')
+    elif not exclude_defaults:
+        out.append(',"span":null')
+
+
+def _optional(name: str, text: Any, out: List[str], exclude_defaults: bool) -> None:
+    """Write a field holding a string or None."""
+    if text is not None:
+        out.append(f',"{name}":{encode_basestring(text)}')
+    elif not exclude_defaults:
+        out.append(f',"{name}":null')
+
+
+def _children(nodes: List[Any], out: List[str], exclude_defaults: bool) -> None:
+    """Write a list of nodes."""
+    out.append('[')
+    no_source = '' if exclude_defaults else ',"raw_text":null,"span":null'
+    no_raw_text = '' if exclude_defaults else ',"raw_text":null'
+    separator = ''
+    for node in nodes:
+        head = _PLAIN_HEADS.get(type(node))
+        if head is not None and node.raw_text is None:
+            # Text, bold, italic and code without raw text, written inline
+            span = node.span
+            content = encode_basestring(node.content)
+            if span is None:
+                out.append(f'{separator}{head}{no_source},"content":{content}}}')
+            else:
+                out.append(f'{separator}{head}{no_raw_text},"span":[{span[0]},{span[1]}],'
+                           f'"content":{content}}}')
+        else:
+            if separator:
+                out.append(separator)
+            _WRITERS[type(node)](node, out, exclude_defaults)
+        separator = ','
+    out.append(']')
+
+
+def _write_inline(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(f',"content":{encode_basestring(node.content)}}}')
+
+
+def _write_link(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(f',"content":{encode_basestring(node.content)},"url":{encode_basestring(node.url)}')
+    _optional("title", node.title, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_image(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(f',"content":{encode_basestring(node.content)},"url":{encode_basestring(node.url)}')
+    _optional("title", node.title, out, exclude_defaults)
+    if node.size is not None:
+        out.append(f',"size":{float.__repr__(node.size)}')
+    elif not exclude_defaults:
+        out.append(',"size":null')
+    _optional("css", node.css, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_heading(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(f',"level":{node.level},"content":')
+    _children(node.content, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_paragraph(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(',"content":')
+    _children(node.content, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_list(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(',"ordered":true,"items":' if node.ordered else ',"ordered":false,"items":')
+    _children(node.items, out, exclude_defaults)
+    if node.start_number is not None:
+        out.append(f',"start_number":{node.start_number}}}')
+    else:
+        out.append('}' if exclude_defaults else ',"start_number":null}')
+
+
+def _write_list_item(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    out.append('{"content":')
+    _children(node.content, out, exclude_defaults)
+    if node.indent_level or not exclude_defaults:
+        out.append(f',"indent_level":{node.indent_level}')
+    _span(node.span, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_quote(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(',"content":')
+    _children(node.content, out, exclude_defaults)
+    if node.level != 1 or not exclude_defaults:
+        out.append(f',"level":{node.level}')
+    out.append('}')
+
+
+def _write_code_block(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    _optional("language", node.language, out, exclude_defaults)
+    _optional("filename", node.filename, out, exclude_defaults)
+    out.append(f',"code":{encode_basestring(node.code)}}}')
+
+
+def _write_table(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(',"header":')
+    _write_table_row(node.header, out, exclude_defaults)
+    alignments = ','.join('null' if alignment is None else encode_basestring(alignment)
+                          for alignment in node.alignments)
+    out.append(f',"alignments":[{alignments}],"rows":')
+    _children(node.rows, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_table_row(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    out.append('{"cells":')
+    _children(node.cells, out, exclude_defaults)
+    _span(node.span, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_table_cell(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    out.append('{"content":')
+    _children(node.content, out, exclude_defaults)
+    _optional("alignment", node.alignment, out, exclude_defaults)
+    _span(node.span, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_horizontal_rule(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append('}')
+
+
+def _write_align(node: Any, out: List[str], exclude_defaults: bool) -> None:
+    _head(node, out, exclude_defaults)
+    out.append(f',"alignment":"{node.alignment.value}","content":')
+    _children(node.content, out, exclude_defaults)
+    out.append('}')
+
+
+# Opening of each element, up to its type
+_TYPE_HEADS = {element_type: f'{{"type":"{element_type.value}"'
+               for element_type in models.ElementType}
+
+
+# Opening of the inline elements holding only text, by class
+_PLAIN_HEADS = {getattr(module, name): _TYPE_HEADS[models.ElementType[type_name]]
+                for module in (models, fast_nodes)
+                for name, type_name in (("Text", "TEXT"), ("Bold", "BOLD"),
+                                        ("Italic", "ITALIC"), ("Code", "CODE"))}
+
+
+def _for_both(writers: Dict[str, _Writer]) -> Dict[type, _Writer]:
+    """Map the models and lightweight node classes of each name to its writer."""
+    table = {}
+    for name, writer in writers.items():
+        table[getattr(models, name)] = writer
+        table[getattr(fast_nodes, name)] = writer
+    return table
+
+
+_WRITERS = _for_both({
+    "Text": _write_inline,
+    "Bold": _write_inline,
+    "Italic": _write_inline,
+    "Code": _write_inline,
+    "Link": _write_link,
+    "Image": _write_image,
+    "Heading": _write_heading,
+    "Paragraph": _write_paragraph,
+    "ListElement": _write_list,
+    "ListItem": _write_list_item,
+    "Quote": _write_quote,
+    "CodeBlock": _write_code_block,
+    "Table": _write_table,
+    "TableRow": _write_table_row,
+    "TableCell": _write_table_cell,
+    "HorizontalRule": _write_horizontal_rule,
+    "Align": _write_align,
+})
@@ -0,0 +1,162 @@
+"""Limits on the work parse() does, for untrusted documents.
+
+parse(text, limits=ParseLimits(...)) bounds:
+
+    max_bytes         the UTF-8 size of the text, checked before parsing
+    max_blocks        the top-level blocks of the document
+    max_inline_nodes  the inline elements of the whole document
+    max_depth         the nesting depth of lists, and the level of quotes
+    timeout           the wall-clock seconds the parse may take
+
+When a limit is exceeded, parse() raises ParseLimitError, or with truncate
+returns the blocks parsed before it, and the document metadata says which
+limit cut it short. A text over max_bytes is then cut to its lines within
+max_bytes before parsing.
+
+The limits of the running parse are kept in a context variable, where the
+block loop, parse_list, parse_quote and parse_inline_elements find them.
+Each check is a counter compared with its limit; the clock is read once
+per block, list, quote and inline text, every _CHECK_INTERVAL characters
+of a long inline text, and every _CHECK_LINES lines of the passes over the
+whole document that come before the blocks (line tags, the table index). Blocks reused from a BlockMemo are
+counted as blocks, but the inline elements in them are not counted again.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+from pydantic import BaseModel, Field
+
+# Characters of inline text scanned between two checks of the limits
+_CHECK_INTERVAL = 65536
+
+# Lines of a whole-document pass between two checks of the clock
+_CHECK_LINES = 4096
+
+
+class ParseLimitError(ValueError):
+    """Raised when parsing exceeds one of its ParseLimits.
+
+    Attributes:
+        limit: Name of the exceeded limit, such as "max_blocks"
+        value: The value of that limit
+    """
+
+    def __init__(self, limit: str, value: float, message: str):
+        super().__init__(message)
+        self.limit = limit
+        self.value = value
+
+
+class ParseLimits(BaseModel):
+    """Limits on the work of one parse; None leaves a limit unchecked.
+
+    Attributes:
+        max_bytes: Most bytes of UTF-8 encoded input
+        max_blocks: Most top-level blocks
+        max_inline_nodes: Most inline elements, in all blocks together
+        max_depth: Deepest list nesting, and highest quote level
+        timeout: Most seconds of wall-clock time
+        truncate: Return the blocks parsed before a limit was exceeded,
+            instead of raising ParseLimitError
+    """
+
+    max_bytes: Optional[int] = Field(None, ge=1)
+    max_blocks: Optional[int] = Field(None, ge=1)
+    max_inline_nodes: Optional[int] = Field(None, ge=1)
+    max_depth: Optional[int] = Field(None, ge=1)
+    timeout: Optional[float] = Field(None, gt=0)
+    truncate: bool = False
+
+    def _check_input(self, markdown_text: str) -> Tuple[str, Optional[str]]:
+        """Check the size of the input.
+
+        Returns the text to parse, and "max_bytes" when it was cut to fit.
+        """
+        limit = self.max_bytes
+        # A character is one to four bytes
+        if limit is None or len(markdown_text) * 4 <= limit:
+            return markdown_text, None
+        data = markdown_text.encode('utf-8') if len(markdown_text) <= limit else None
+        if data is not None and len(data) <= limit:
+            return markdown_text, None
+
+        if not self.truncate:
+            raise ParseLimitError("max_bytes", limit,
+                                  f"Input exceeds the limit of {limit} bytes")
+        if data is None:
+            data = markdown_text[:limit].encode('utf-8')
+        text = data[:limit].decode('utf-8', errors='ignore')
+        # Keep whole lines, the line cut included when it ends the text
+        return text[:text.rfind('\n') + 1], "max_bytes"
+
+    @contextmanager
+    def _enforcing(self) -> Iterator["_Budget"]:
+        """Enforce the limits on the parse run in the block."""
+        budget = _Budget(self)
+        token = _ACTIVE.set(budget)
+        try:
+            yield budget
+        finally:
+            _ACTIVE.reset(token)
+
+
+class _Budget:
+    """What is left of the limits for the running parse."""
+
+    __slots__ = ("limits", "truncate", "blocks", "inline_nodes", "depth", "deadline",
+                 "exceeded")
+
+    def __init__(self, limits: ParseLimits):
+        self.limits = limits
+        self.truncate = limits.truncate
+        self.blocks = 0
+        self.inline_nodes = 0
+        # Nesting depth of the list being parsed
+        self.depth = 1
+        self.deadline = (time.perf_counter() + limits.timeout
+                         if limits.timeout is not None else None)
+        # Name of the limit that truncated the document
+        self.exceeded: Optional[str] = None
+
+    def add_block(self) -> None:
+        """Count a top-level block."""
+        self.blocks += 1
+        limit = self.limits.max_blocks
+        if limit is not None and self.blocks > limit:
+            raise ParseLimitError("max_blocks", limit,
+                                  f"Document has more than {limit} blocks")
+        self.check_time()
+
+    def add_inline(self, count: int) -> None:
+        """Count inline elements."""
+        self.inline_nodes += count
+        limit = self.limits.max_inline_nodes
+        if limit is not None and self.inline_nodes > limit:
+            raise ParseLimitError("max_inline_nodes", limit,
+                                  f"Document has more than {limit} inline elements")
+        self.check_time()
+
+    def check_depth(self, depth: int) -> None:
+        """Check the nesting depth of a list or the level of a quote."""
+        limit = self.limits.max_depth
+        if limit is not None and depth > limit:
+            raise ParseLimitError("max_depth", limit,
+                                  f"Document nests deeper than {limit} levels")
+        self.check_time()
+
+    def check_time(self) -> None:
+        """Check the wall-clock time."""
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            limit = self.limits.timeout
+            raise ParseLimitError("timeout", limit,
+                                  f"Parsing took longer than {limit} seconds")
+
+
+_ACTIVE: ContextVar[Optional[_Budget]] = ContextVar("markdown_parser_limits", default=None)
+
+
+def active_budget() -> Optional[_Budget]:
+    """Return the budget of the running parse, or None when it has no limits."""
+    return _ACTIVE.get()
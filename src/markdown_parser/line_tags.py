@@ -0,0 +1,144 @@
+"""Per-document line classification for block parsing.
+
+Every line is tagged once before block parsing starts. Block dispatch and
+paragraph termination then read the tags instead of re-running the block
+regexes on every line they look at.
+"""
+
+from array import array
+from typing import List
+from .limits import _CHECK_LINES, active_budget
+from .regex_patterns import ALIGN_CLOSE_PATTERN, LINE_CLASS_PATTERN
+
+# Line flags
+LINE_BLANK = 1 << 0          # Empty or whitespace only
+LINE_FENCE = 1 << 1          # Opens a fenced code block (``` at column 0)
+LINE_FENCE_LIKE = 1 << 2     # Starts with ``` after leading whitespace
+LINE_INDENTED = 1 << 3       # Indented code (4 spaces or a tab)
+LINE_HEADING = 1 << 4        # ATX heading
+LINE_HR = 1 << 5             # Horizontal rule
+LINE_LIST = 1 << 6           # List item marker
+LINE_ORDERED = 1 << 7        # The list item marker is a number
+LINE_QUOTE = 1 << 8          # Quote marker
+LINE_CUSTOM_TAG = 1 << 9     # <Align>, <Left>, <Center> or <Right> at column 0
+LINE_ALIGN = 1 << 10         # <Align left|center|right> opening tag
+LINE_PIPE = 1 << 11          # Contains a pipe
+LINE_TABLE_RULE = 1 << 12    # Contains a pipe and a dash (possible separator)
+
+# Lines that end a paragraph
+LINE_PARAGRAPH_BREAK = (
+    LINE_HR | LINE_HEADING | LINE_QUOTE | LINE_FENCE_LIKE |
+    LINE_INDENTED | LINE_CUSTOM_TAG | LINE_LIST
+)
+
+
+class LineTags:
+    """Compact per-line tags for a list of lines.
+
+    Attributes:
+        flags: Bit set of LINE_* flags for each line
+        indents: Number of leading whitespace characters of each line
+        quote_depths: Number of leading '>' markers of each line
+        last_align_close: Index of the last line with an </Align> closing
+            tag, or -1 when there is none; an <Align> tag after it is never
+            closed, so it is not parsed as one
+    """
+
+    __slots__ = ("flags", "indents", "quote_depths", "last_align_close")
+
+    def __init__(self, lines: List[str]):
+        self.flags = array('H')
+        self.indents = array('I')
+        self.quote_depths = array('I')
+        self.last_align_close = -1
+
+        budget = active_budget()
+        for index, line in enumerate(lines):
+            if budget is not None and not index % _CHECK_LINES:
+                budget.check_time()
+            flags, indent, quote_depth = classify_line(line)
+            self.flags.append(flags)
+            self.indents.append(indent)
+            self.quote_depths.append(quote_depth)
+            if '</' in line and ALIGN_CLOSE_PATTERN.search(line):
+                self.last_align_close = index
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+
+def classify_line(line: str) -> tuple[int, int, int]:
+    """Classify a single line.
+
+    Returns the line flags, the indent width and the quote depth.
+    """
+    match = LINE_CLASS_PATTERN.match(line)
+    indent = match.end(1)
+
+    if indent == len(line):
+        return LINE_BLANK, indent, 0
+
+    flags = 0
+    quote_depth = 0
+    kind = match.lastgroup
+
+    if kind == 'fence':
+        flags |= LINE_FENCE_LIKE
+        if indent == 0:
+            flags |= LINE_FENCE
+    elif kind == 'heading':
+        flags |= LINE_HEADING
+    elif kind == 'bullet':
+        flags |= LINE_LIST
+    elif kind == 'number':
+        flags |= LINE_LIST | LINE_ORDERED
+    elif kind == 'quote':
+        flags |= LINE_QUOTE
+        quote_depth = match.group('quote').count('>')
+    elif kind == 'tag' or kind == 'align':
+        if match.group('align'):
+            flags |= LINE_ALIGN
+        if indent == 0:
+            flags |= LINE_CUSTOM_TAG
+
+    if line.startswith('    ') or line.startswith('\t'):
+        flags |= LINE_INDENTED
+
+    if line[indent] in '-*_' and is_horizontal_rule(line):
+        flags |= LINE_HR
+
+    if '|' in line:
+        flags |= LINE_PIPE
+        if '-' in line:
+            flags |= LINE_TABLE_RULE
+
+    return flags, indent, quote_depth
+
+
+def is_horizontal_rule(line: str) -> bool:
+    """Check if a line is a horizontal rule."""
+    line = line.strip()
+
+    # Return False for empty lines or lines that are too short
+    if len(line) < 3:
+        return False
+
+    # Simple and fast checks for horizontal rules
+    # Three or more consecutive -, *, or _
+    if line.replace('-', '') == '' and len(line) >= 3:
+        return True
+    if line.replace('*', '') == '' and len(line) >= 3:
+        return True
+    if line.replace('_', '') == '' and len(line) >= 3:
+        return True
+
+    # Check for spaced patterns (limit complexity)
+    # Remove all spaces and check if remaining chars are all the same
+    no_spaces = line.replace(' ', '')
+    if len(no_spaces) >= 3:
+        if (no_spaces.replace('-', '') == '' or
+            no_spaces.replace('*', '') == '' or
+            no_spaces.replace('_', '') == ''):
+            return True
+
+    return False
@@ -0,0 +1,141 @@
+"""Lines of a memory-mapped file, for parse_file().
+
+parse(open(path).read()) holds the text, then its split lines, and keeps
+the lines in the document for incremental edits: the source is in memory
+two or three times over before the first block is parsed. parse_file()
+maps the file instead, and parses a MappedLines sequence of its lines:
+
+    line starts   an array of the byte offset of each line, 8 bytes a
+                  line, found by splitting the mapping a chunk at a time
+    lines         decoded from the mapping when a parser reads them, a
+                  block of lines at a time, and only the last few blocks
+                  kept; the mapped pages are file cache that the system
+                  can drop and read again
+    code bodies   decoded as one slice of the mapping, not line by line
+
+The document gets no source lines, so it can not be edited incrementally.
+"""
+
+import mmap
+import re
+from array import array
+from itertools import accumulate, islice
+from typing import BinaryIO, Iterator, List, Union
+
+# Bytes of the mapping split at a time while finding line starts
+_CHUNK = 1 << 24
+
+# Lines decoded at once, and blocks of them kept decoded
+_BLOCK_LINES = 1024
+_CACHED_BLOCKS = 4
+
+# A '\r' line end of old Mac files, which text mode translates too
+_LONE_CR = re.compile(rb'\r(?!\n)')
+
+# Whitespace at the end of each line of a text, as str.rstrip() strips it
+_TRAILING_WHITESPACE = re.compile(r'[^\S\n]+$', re.MULTILINE)
+
+
+class MappedLines:
+    """The lines of a memory-mapped file, decoded on access.
+
+    Behaves as the list of lines of the decoded text split at '\\n', with
+    the '\\r' of '\\r\\n' line ends dropped, as text-mode files do. The
+    encoding must be ASCII-compatible, such as UTF-8, so that b'\\n' bytes
+    are line ends.
+
+    Args:
+        fp: File opened in binary mode; it can be closed once mapped
+        encoding: Encoding of the file
+    """
+
+    __slots__ = ("encoding", "_data", "_map", "_starts", "_size", "_blocks")
+
+    def __init__(self, fp: BinaryIO, encoding: str = 'utf-8'):
+        self.encoding = encoding
+        try:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can not be mapped
+            self._map = None
+        self._data = self._map if self._map is not None else b''
+        self._size = len(self._data)
+        self._starts = self._line_starts()
+        # Block number -> decoded lines, for the last few blocks read
+        self._blocks = {}
+
+    def _line_starts(self) -> array:
+        """Return the byte offset of the start of each line."""
+        starts = array('q', [0])
+        data = self._data
+        for base in range(0, self._size, _CHUNK):
+            pieces = data[base:base + _CHUNK].split(b'\n')
+            # Each piece but the last ends with a '\n', the next line starts after it
+            ends = accumulate(map((1).__add__, map(len, pieces[:-1])), initial=base)
+            starts.extend(islice(ends, 1, None))
+        return starts
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _end(self, index: int) -> int:
+        """Return the byte offset of the end of a line, before its line end."""
+        if index + 1 == len(self._starts):
+            return self._size
+        end = self._starts[index + 1] - 1
+        if end > self._starts[index] and self._data[end - 1] == 13:  # '\r'
+            end -= 1
+        return end
+
+    def _block(self, number: int) -> List[str]:
+        """Return the lines of a block of _BLOCK_LINES lines, decoded at once."""
+        lines = self._blocks.get(number)
+        if lines is None:
+            first = number * _BLOCK_LINES
+            last = min(first + _BLOCK_LINES, len(self._starts)) - 1
+            lines = self.text(first, last + 1).split('\n')
+            if len(self._blocks) >= _CACHED_BLOCKS:
+                self._blocks.clear()
+            self._blocks[number] = lines
+        return lines
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._starts)))]
+        if index < 0:
+            index += len(self._starts)
+        if not 0 <= index < len(self._starts):
+            raise IndexError("line index out of range")
+        return self._block(index // _BLOCK_LINES)[index % _BLOCK_LINES]
+
+    def __iter__(self) -> Iterator[str]:
+        for number in range((len(self._starts) + _BLOCK_LINES - 1) // _BLOCK_LINES):
+            yield from self._block(number)
+
+    def text(self, start: int, end: int) -> str:
+        """Return lines[start:end] joined with '\\n', decoded in one slice."""
+        if start >= end:
+            return ''
+        text = str(self._data[self._starts[start]:self._end(end - 1)], self.encoding)
+        return text.replace('\r\n', '\n') if '\r' in text else text
+
+    def has_lone_cr(self) -> bool:
+        """Return whether the file has '\r' line ends not followed by '\n'."""
+        return _LONE_CR.search(self._data) is not None
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._data = b''
+
+
+def strip_code_lines(lines: Union[List[str], MappedLines], start: int, end: int) -> str:
+    """Return lines[start:end] with trailing whitespace stripped, joined with '\\n'.
+
+    The text of mapped lines is decoded in one slice of the mapping.
+    """
+    if isinstance(lines, MappedLines):
+        return _TRAILING_WHITESPACE.sub('', lines.text(start, end))
+    return '\n'.join(line.rstrip() for line in lines[start:end])
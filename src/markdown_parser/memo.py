@@ -0,0 +1,110 @@
+"""Block-level memoization across parses.
+
+A block parser reads the lines of its block and at most one line past the
+line after it. A BlockMemo remembers each parsed block with exactly those
+lines, so when parse(text, memo=memo) meets the same lines again, in the same
+document or in a later version of it, the block is reused instead of being
+parsed again. Only blocks whose source changed go through inline parsing.
+
+Reused blocks are shallow copies that get their own span; their children are
+shared with the document the block was first parsed into, so documents
+parsed with a memo should be treated as read-only below the top-level blocks.
+"""
+
+import copy
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from . import models, nodes as fast_nodes
+from .regex_patterns import ALIGN_TAG_PATTERN
+
+
+class MemoStats(BaseModel):
+    """Counters of a BlockMemo."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Return the share of looked up blocks that were reused."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class BlockMemo:
+    """Bounded LRU table of parsed blocks keyed by their source lines.
+
+    Args:
+        max_blocks: Most blocks kept
+    """
+
+    def __init__(self, max_blocks: int = 10000):
+        if max_blocks < 1:
+            raise ValueError("max_blocks must be positive")
+        self.max_blocks = max_blocks
+        # (validated, first line, line count, following lines) -> block
+        self._blocks: "OrderedDict[tuple, Any]" = OrderedDict()
+        # (validated, first line) -> {line count: number of blocks}
+        self._counts: Dict[Tuple[bool, str], Dict[int, int]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def lookup(self, lines: List[str], i: int, validated: bool) -> Optional[Tuple[Any, int]]:
+        """Return a copy of the block parsed from the same lines as lines[i:], or None.
+
+        Returns the block and the index of the next line after it.
+        """
+        first = lines[i]
+        for count in self._counts.get((validated, first), ()):
+            key = (validated, first, count, tuple(lines[i + 1:i + count + 2]))
+            block = self._blocks.get(key)
+            if block is not None:
+                self._blocks.move_to_end(key)
+                self._hits += 1
+                copied = block.model_copy() if validated else copy.copy(block)
+                return copied, i + count
+        self._misses += 1
+        return None
+
+    def store(self, lines: List[str], i: int, next_i: int, block: Any,
+              validated: bool) -> None:
+        """Remember the block parsed from lines[i:next_i]."""
+        # An <Align> tag that failed to parse depends on all following lines
+        if not isinstance(block, (models.Align, fast_nodes.Align)) and (
+                ALIGN_TAG_PATTERN.match(lines[i].strip())):
+            return
+
+        count = next_i - i
+        key = (validated, lines[i], count, tuple(lines[i + 1:next_i + 2]))
+        if key in self._blocks:
+            return
+        self._blocks[key] = block
+        counts = self._counts.setdefault((validated, lines[i]), {})
+        counts[count] = counts.get(count, 0) + 1
+
+        while len(self._blocks) > self.max_blocks:
+            (validated, first, count, _), _ = self._blocks.popitem(last=False)
+            counts = self._counts[validated, first]
+            counts[count] -= 1
+            if not counts[count]:
+                del counts[count]
+                if not counts:
+                    del self._counts[validated, first]
+            self._evictions += 1
+
+    def stats(self) -> MemoStats:
+        """Return a snapshot of the memo counters."""
+        return MemoStats(hits=self._hits, misses=self._misses,
+                         evictions=self._evictions, entries=len(self._blocks))
+
+    def clear(self) -> None:
+        """Remove all blocks. The counters are kept."""
+        self._blocks.clear()
+        self._counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
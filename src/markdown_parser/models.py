@@ -1,8 +1,8 @@
 """Data models for markdown elements."""
 
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 
 
 class ElementType(str, Enum):
@@ -39,6 +39,7 @@ class Element(BaseModel):
     """Base class for all markdown elements."""
     type: ElementType
     raw_text: Optional[str] = None
+    span: Optional[Tuple[int, int]] = None  # Source character offsets [start, end)
     
 
 class InlineElement(Element):
@@ -115,6 +116,7 @@ class ListItem(BaseModel):
     """List item."""
     content: list[Union[InlineElement, "ListElement"]]
     indent_level: int = 0
+    span: Optional[Tuple[int, int]] = None
 
 
 class ListElement(BlockElement):
@@ -144,11 +146,13 @@ class TableCell(BaseModel):
     """Table cell."""
     content: list[InlineElement]
     alignment: Optional[str] = None  # left, center, right
+    span: Optional[Tuple[int, int]] = None
 
 
 class TableRow(BaseModel):
     """Table row."""
     cells: list[TableCell]
+    span: Optional[Tuple[int, int]] = None
 
 
 class Table(BlockElement):
@@ -176,6 +180,95 @@ class Document(BaseModel):
     blocks: list[BlockElement]
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    # Source lines and the [start, end) line range of each block, kept by
+    # parse() so the document can be edited incrementally, the last line
+    # with a </Align> tag, found on the first edit, and the moves of blocks
+    # after edits, applied when the blocks are next read
+    _lines: Optional[List[str]] = PrivateAttr(default=None)
+    _block_lines: Optional[List[Tuple[int, int]]] = PrivateAttr(default=None)
+    _align_close: Optional[int] = PrivateAttr(default=None)
+    _track_spans: bool = PrivateAttr(default=False)
+    _span_shifts: Any = PrivateAttr(default=None)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _elements_from_dicts(cls, data: Any) -> Any:
+        # Element fields are typed with base classes, which would build a bare
+        # BlockElement or InlineElement from a dict, so serialized documents
+        # get their elements built here from the class their type names
+        if isinstance(data, dict) and "blocks" in data:
+            data = dict(data, blocks=_elements_from_dicts(data["blocks"]))
+        return data
+
+    def __getattribute__(self, name: str) -> Any:
+        # Blocks left in place by apply_edit() are moved before they are read,
+        # including through __dict__ by serialization, pickling and copying
+        if name in _SHIFTED_READS:
+            private = super().__getattribute__("__pydantic_private__")
+            if private and private.get("_span_shifts") is not None:
+                from .incremental import apply_shifts
+                apply_shifts(self)
+        return super().__getattribute__(name)
+
+    def __eq__(self, other: Any) -> bool:
+        # The retained source is not part of the document's value
+        if not isinstance(other, Document):
+            return NotImplemented
+        return self.blocks == other.blocks and self.metadata == other.metadata
+
+    def apply_edit(self, start_offset: int, end_offset: int,
+                   new_text: str) -> Tuple[int, int, int]:
+        """Replace source text and re-parse only the affected blocks.
+
+        See incremental.apply_edit().
+        """
+        from .incremental import apply_edit
+        return apply_edit(self, start_offset, end_offset, new_text)
+
+    def node_path(self, offset: int) -> list:
+        """Return the nodes containing a source offset, outermost first.
+
+        See positions.node_path().
+        """
+        from .positions import node_path
+        return node_path(self, offset)
+
+    def block_at_line(self, line: int) -> Optional[BlockElement]:
+        """Return the block covering a source line, or None between blocks."""
+        from .positions import block_at_line
+        return block_at_line(self, line)
+
+
+# Attributes of a Document that read the blocks or their line ranges
+_SHIFTED_READS = frozenset(("blocks", "_block_lines", "__dict__", "__getstate__"))
+
+
+# Element classes by type, for _elements_from_dicts()
+_ELEMENT_CLASSES = {
+    element_class.model_fields["type"].default: element_class
+    for element_class in (Text, Bold, Italic, Code, Link, Image, Heading, Paragraph,
+                          ListElement, Quote, CodeBlock, Table, HorizontalRule, Align)
+}
+
+
+def _elements_from_dicts(value: Any) -> Any:
+    """Replace the element dicts in value with elements of the class their type names.
+
+    Children are built first. Dicts of list items, table rows and cells are
+    left to validation, their classes are not ambiguous.
+    """
+    if isinstance(value, list):
+        return [_elements_from_dicts(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    
+    value = {key: _elements_from_dicts(item) if isinstance(item, (list, dict)) else item
+             for key, item in value.items()}
+    element_class = _ELEMENT_CLASSES.get(value.get("type"))
+    if element_class is None:
+        return value
+    return element_class.model_validate(value)
+
 
 # Update forward references
 ListItem.model_rebuild()
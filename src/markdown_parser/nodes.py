@@ -0,0 +1,426 @@
+"""Lightweight node classes for trusted parser output.
+
+These classes mirror the models in models.py attribute for attribute, but they
+are plain slotted objects: building them runs no validation and they carry no
+per-instance __dict__. The parser produces them with parse(text, validate=False)
+because its output is correct by construction. Call to_model() on any node,
+including the Document, to get the equivalent validated Pydantic model.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from . import models
+from .models import AlignType, ElementType
+
+
+class Node:
+    """Base class for all lightweight nodes."""
+
+    __slots__ = ()
+
+    def to_model(self):
+        """Convert this node to the equivalent Pydantic model."""
+        raise NotImplementedError
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in _all_slots(type(self)))
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in _all_slots(type(self))
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class Element(Node):
+    """Base class for all markdown elements."""
+
+    __slots__ = ("raw_text", "span")
+    type: ElementType
+
+
+class InlineElement(Element):
+    """Base class for inline elements."""
+
+    __slots__ = ("content",)
+
+    def __init__(self, content: str, raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.content = content
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.InlineElement:
+        return _MODEL_TYPES[type(self)](content=self.content, raw_text=self.raw_text,
+                                        span=self.span)
+
+
+class Text(InlineElement):
+    """Plain text element."""
+
+    __slots__ = ()
+    type = ElementType.TEXT
+
+
+class Bold(InlineElement):
+    """Bold text element."""
+
+    __slots__ = ()
+    type = ElementType.BOLD
+
+
+class Italic(InlineElement):
+    """Italic text element."""
+
+    __slots__ = ()
+    type = ElementType.ITALIC
+
+
+class Code(InlineElement):
+    """Inline code element."""
+
+    __slots__ = ()
+    type = ElementType.CODE
+
+
+class Link(InlineElement):
+    """Link element."""
+
+    __slots__ = ("url", "title")
+    type = ElementType.LINK
+
+    def __init__(self, content: str, url: str, title: Optional[str] = None,
+                 raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.content = content
+        self.url = url
+        self.title = title
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.Link:
+        return models.Link(content=self.content, url=self.url, title=self.title,
+                           raw_text=self.raw_text, span=self.span)
+
+
+class Image(InlineElement):
+    """Image element with extended attributes."""
+
+    __slots__ = ("url", "title", "size", "css")
+    type = ElementType.IMAGE
+
+    def __init__(self, content: str, url: str, title: Optional[str] = None,
+                 size: Optional[float] = None, css: Optional[str] = None,
+                 raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.content = content
+        self.url = url
+        self.title = title
+        self.size = size
+        self.css = css
+        self.raw_text = raw_text
+        self.span = span
+
+    @property
+    def alt(self) -> str:
+        """Return content as alt text for backward compatibility."""
+        return self.content
+
+    @alt.setter
+    def alt(self, value: str):
+        """Set content when alt is assigned."""
+        self.content = value
+
+    def to_model(self) -> models.Image:
+        return models.Image(content=self.content, url=self.url, title=self.title,
+                            size=self.size, css=self.css, raw_text=self.raw_text,
+                            span=self.span)
+
+
+class BlockElement(Element):
+    """Base class for block elements."""
+
+    __slots__ = ()
+
+
+class Heading(BlockElement):
+    """Heading element."""
+
+    __slots__ = ("level", "content")
+    type = ElementType.HEADING
+
+    def __init__(self, level: int, content: List[InlineElement],
+                 raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.level = level
+        self.content = content
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.Heading:
+        return models.Heading(level=self.level, content=_to_models(self.content),
+                              raw_text=self.raw_text, span=self.span)
+
+
+class Paragraph(BlockElement):
+    """Paragraph element."""
+
+    __slots__ = ("content",)
+    type = ElementType.PARAGRAPH
+
+    def __init__(self, content: List[InlineElement], raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.content = content
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.Paragraph:
+        return models.Paragraph(content=_to_models(self.content), raw_text=self.raw_text,
+                                span=self.span)
+
+
+class ListItem(Node):
+    """List item."""
+
+    __slots__ = ("content", "indent_level", "span")
+
+    def __init__(self, content: List[Union[InlineElement, "ListElement"]],
+                 indent_level: int = 0, span: Optional[Tuple[int, int]] = None):
+        self.content = content
+        self.indent_level = indent_level
+        self.span = span
+
+    def to_model(self) -> models.ListItem:
+        return models.ListItem(content=_to_models(self.content),
+                               indent_level=self.indent_level, span=self.span)
+
+
+class ListElement(BlockElement):
+    """List element (ordered or unordered)."""
+
+    __slots__ = ("ordered", "items", "start_number")
+    type = ElementType.LIST
+
+    def __init__(self, ordered: bool, items: List[ListItem],
+                 start_number: Optional[int] = None, raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.ordered = ordered
+        self.items = items
+        self.start_number = start_number
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.ListElement:
+        return models.ListElement(ordered=self.ordered, items=_to_models(self.items),
+                                  start_number=self.start_number,
+                                  raw_text=self.raw_text, span=self.span)
+
+
+class Quote(BlockElement):
+    """Quote block element."""
+
+    __slots__ = ("content", "level")
+    type = ElementType.QUOTE
+
+    def __init__(self, content: List[Union[BlockElement, InlineElement]],
+                 level: int = 1, raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.content = content
+        self.level = level
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.Quote:
+        return models.Quote(content=_to_models(self.content), level=self.level,
+                            raw_text=self.raw_text, span=self.span)
+
+
+class CodeBlock(BlockElement):
+    """Code block element."""
+
+    __slots__ = ("language", "filename", "code")
+    type = ElementType.CODE_BLOCK
+
+    def __init__(self, code: str, language: Optional[str] = None,
+                 filename: Optional[str] = None, raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.language = language
+        self.filename = filename
+        self.code = code
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.CodeBlock:
+        return models.CodeBlock(language=self.language, filename=self.filename,
+                                code=self.code, raw_text=self.raw_text, span=self.span)
+
+
+class TableCell(Node):
+    """Table cell."""
+
+    __slots__ = ("content", "alignment", "span")
+
+    def __init__(self, content: List[InlineElement], alignment: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.content = content
+        self.alignment = alignment
+        self.span = span
+
+    def to_model(self) -> models.TableCell:
+        return models.TableCell(content=_to_models(self.content),
+                                alignment=self.alignment, span=self.span)
+
+
+class TableRow(Node):
+    """Table row."""
+
+    __slots__ = ("cells", "span")
+
+    def __init__(self, cells: List[TableCell], span: Optional[Tuple[int, int]] = None):
+        self.cells = cells
+        self.span = span
+
+    def to_model(self) -> models.TableRow:
+        return models.TableRow(cells=_to_models(self.cells), span=self.span)
+
+
+class Table(BlockElement):
+    """Table element."""
+
+    __slots__ = ("header", "alignments", "rows")
+    type = ElementType.TABLE
+
+    def __init__(self, header: TableRow, alignments: List[Optional[str]],
+                 rows: List[TableRow], raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.header = header
+        self.alignments = alignments
+        self.rows = rows
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.Table:
+        return models.Table(header=self.header.to_model(), alignments=self.alignments,
+                            rows=_to_models(self.rows), raw_text=self.raw_text,
+                            span=self.span)
+
+
+class HorizontalRule(BlockElement):
+    """Horizontal rule element."""
+
+    __slots__ = ()
+    type = ElementType.HORIZONTAL_RULE
+
+    def __init__(self, raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.HorizontalRule:
+        return models.HorizontalRule(raw_text=self.raw_text, span=self.span)
+
+
+class Align(BlockElement):
+    """Custom alignment element."""
+
+    __slots__ = ("alignment", "content")
+    type = ElementType.ALIGN
+
+    def __init__(self, alignment: AlignType,
+                 content: List[Union[BlockElement, InlineElement]],
+                 raw_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None):
+        self.alignment = alignment
+        self.content = content
+        self.raw_text = raw_text
+        self.span = span
+
+    def to_model(self) -> models.Align:
+        return models.Align(alignment=self.alignment, content=_to_models(self.content),
+                            raw_text=self.raw_text, span=self.span)
+
+
+class Document(Node):
+    """The complete markdown document."""
+
+    __slots__ = ("blocks", "metadata", "_lines", "_block_lines", "_align_close",
+                 "_track_spans", "_span_shifts")
+
+    def __init__(self, blocks: List[BlockElement],
+                 metadata: Optional[Dict[str, Any]] = None):
+        self.blocks = blocks
+        self.metadata = {} if metadata is None else metadata
+        self._lines = None
+        self._block_lines = None
+        self._align_close = None
+        self._track_spans = False
+        self._span_shifts = None
+
+    def __getattribute__(self, name: str) -> Any:
+        # Blocks left in place by apply_edit() are moved before they are read
+        if name in _SHIFTED_READS and object.__getattribute__(self, "_span_shifts") is not None:
+            from .incremental import apply_shifts
+            apply_shifts(self)
+        return object.__getattribute__(self, name)
+
+    def apply_edit(self, start_offset: int, end_offset: int,
+                   new_text: str) -> Tuple[int, int, int]:
+        """Replace source text and re-parse only the affected blocks.
+
+        See incremental.apply_edit().
+        """
+        from .incremental import apply_edit
+        return apply_edit(self, start_offset, end_offset, new_text)
+
+    def node_path(self, offset: int) -> list:
+        """Return the nodes containing a source offset, outermost first.
+
+        See positions.node_path().
+        """
+        from .positions import node_path
+        return node_path(self, offset)
+
+    def block_at_line(self, line: int) -> Optional[BlockElement]:
+        """Return the block covering a source line, or None between blocks."""
+        from .positions import block_at_line
+        return block_at_line(self, line)
+
+    def to_model(self) -> models.Document:
+        document = models.Document(blocks=_to_models(self.blocks),
+                                   metadata=dict(self.metadata))
+        if self._lines is not None:
+            document._lines = list(self._lines)
+            document._block_lines = list(self._block_lines)
+            document._align_close = self._align_close
+            document._track_spans = self._track_spans
+        return document
+
+
+# Attributes of a Document that read the blocks or their line ranges
+_SHIFTED_READS = frozenset(("blocks", "_block_lines"))
+
+
+_MODEL_TYPES = {
+    Text: models.Text,
+    Bold: models.Bold,
+    Italic: models.Italic,
+    Code: models.Code,
+}
+
+
+def _to_models(nodes: List[Node]) -> list:
+    """Convert a list of nodes to Pydantic models."""
+    return [node.to_model() for node in nodes]
+
+
+def _all_slots(cls: type) -> tuple:
+    """Collect the public slot names of a class and its bases, base classes first."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(name for name in klass.__dict__.get("__slots__", ())
+                     if not name.startswith("_"))
+    return tuple(names)
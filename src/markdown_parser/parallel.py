@@ -0,0 +1,200 @@
+"""Parallel parsing of a single large document.
+
+The document is cut into chunks at blank lines where no block can continue:
+outside fenced code and <Align> regions, and before a line that does not
+continue a list, a quote or indented code. Worker processes parse the chunks
+and the parent stitches their blocks together. Each seam is then checked
+like an edit in incremental.py: the blocks whose parse could see the cut are
+parsed again until the parse lines up with the next chunk. The result is the
+same as parse() even where a cut turns out not to be safe, for example after
+an <Align> tag whose closing tag is in a later chunk.
+"""
+
+import os
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Tuple, Union
+from . import models, nodes as fast_nodes
+from .incremental import (
+    _end_line, _find_align_close, _is_visited, _reparse_until, _start_line,
+)
+from .line_tags import classify_line, LINE_BLANK, LINE_INDENTED, LINE_LIST, LINE_QUOTE
+from .parser import parse, _iter_blocks
+from .regex_patterns import (
+    ALIGN_CLOSE_PATTERN, ALIGN_TAG_PATTERN,
+    CODE_FENCE_START_PATTERN, CODE_FENCE_END_PATTERN,
+)
+
+# Fewest lines per chunk, so that seams stay rare
+MIN_CHUNK_LINES = 2000
+
+# Chunks per worker when no chunk size is given
+_CHUNKS_PER_WORKER = 4
+
+# Lines after which a block can not continue past a blank line
+_CONTINUATION = LINE_BLANK | LINE_INDENTED | LINE_LIST | LINE_QUOTE
+
+
+def parse_parallel(markdown_text: str, workers: Optional[int] = None,
+                   validate: bool = True, track_spans: bool = False,
+                   chunk_lines: Optional[int] = None
+                   ) -> Union[models.Document, fast_nodes.Document]:
+    """Parse one large markdown text with several worker processes.
+
+    Args:
+        markdown_text: The markdown text to parse
+        workers: Number of worker processes, os.cpu_count() by default
+        validate: Return a validated Pydantic document, see parse(). The
+            conversion runs in this process, so validate=False is the fast path.
+        track_spans: Record the source span of every node, see parse()
+        chunk_lines: Fewest lines per chunk. By default the text is split in
+            about 4 chunks per worker of at least MIN_CHUNK_LINES lines.
+
+    Returns:
+        The same document as parse(markdown_text)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    lines = markdown_text.split('\n')
+    if chunk_lines is None:
+        chunk_lines = max(MIN_CHUNK_LINES, len(lines) // (workers * _CHUNKS_PER_WORKER))
+
+    cuts = split_points(lines, chunk_lines) if workers > 1 else []
+    if not cuts:
+        return parse(markdown_text, validate=validate, track_spans=track_spans)
+
+    document = _parse_chunks(markdown_text, lines, cuts, workers, track_spans)
+    return document.to_model() if validate else document
+
+
+def split_points(lines: List[str], chunk_lines: int = MIN_CHUNK_LINES
+                 ) -> List[Tuple[int, int]]:
+    """Find lines where a document can be cut into independently parsed chunks.
+
+    A cut goes after a blank line outside fenced code and <Align> regions,
+    before a line with no indentation that starts no list item or quote.
+    Consecutive cuts are at least chunk_lines lines apart.
+
+    Args:
+        lines: The source lines
+        chunk_lines: Fewest lines between two cuts
+
+    Returns:
+        The (line, source position) where each chunk after the first starts
+    """
+    align_close = _find_align_close(lines, len(lines))
+    cuts = []
+    offset = 0
+    last_cut = 0
+    in_fence = False
+    in_align = False
+
+    for i, line in enumerate(lines):
+        if in_fence:
+            in_fence = not CODE_FENCE_END_PATTERN.match(line)
+        elif in_align:
+            in_align = not ALIGN_CLOSE_PATTERN.search(line)
+        elif line.startswith('```'):
+            in_fence = bool(CODE_FENCE_START_PATTERN.match(line))
+        elif line.lstrip().startswith('<') and i < align_close:
+            match = ALIGN_TAG_PATTERN.match(line.strip())
+            in_align = bool(match) and not ALIGN_CLOSE_PATTERN.search(match.group(2))
+        elif (i + 1 - last_cut >= chunk_lines and i + 1 < len(lines) and
+              not line.strip() and not classify_line(lines[i + 1])[0] & _CONTINUATION
+              and not lines[i + 1][0].isspace()):
+            last_cut = i + 1
+            cuts.append((i + 1, offset + len(line) + 1))
+        offset += len(line) + 1
+
+    return cuts
+
+
+def _parse_chunks(markdown_text: str, lines: List[str], cuts: List[Tuple[int, int]],
+                  workers: int, track_spans: bool) -> fast_nodes.Document:
+    """Parse the chunks between cuts in a process pool and stitch them together."""
+    starts = [(0, 0)] + cuts
+    ends = [offset - 1 for _, offset in cuts] + [len(markdown_text)]
+    texts = [markdown_text[offset:end] for (_, offset), end in zip(starts, ends)]
+
+    blocks = []
+    block_lines: List[Tuple[int, int]] = []
+    failed_aligns = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(texts))) as executor:
+        for chunk_blocks, chunk_lines, failed_align in executor.map(
+                _parse_chunk, texts, [line for line, _ in starts],
+                [offset for _, offset in starts], repeat(track_spans)):
+            blocks.extend(chunk_blocks)
+            block_lines.extend(chunk_lines)
+            failed_aligns.append(failed_align)
+
+    align_close = _find_align_close(lines, len(lines))
+    position = 0  # Blocks before this line are final
+
+    for (cut, _), failed_align in zip(cuts, failed_aligns):
+        if cut < position:
+            continue
+
+        # Parse again from the first block whose parse could see the cut, as
+        # parsing a block looks at most one line past its end, or from an
+        # <Align> tag whose closing tag is after the cut
+        first = bisect_left(block_lines, cut - 1, key=_end_line)
+        restart = None
+        if first < len(blocks) and block_lines[first][0] < cut:
+            restart, offset = block_lines[first][0], blocks[first].span[0]
+        if (failed_align is not None and align_close >= cut and
+                (restart is None or failed_align[0] < restart)):
+            restart, offset = failed_align
+            first = bisect_left(block_lines, restart, key=_start_line)
+        if restart is None:
+            position = cut
+            continue
+
+        def synced(line: int) -> bool:
+            """Check whether the chunk parse visited line after the cut."""
+            return line >= cut and _is_visited(block_lines, line)
+
+        new_blocks, new_lines, position = _reparse_until(
+            lines, restart, offset, synced, fast_nodes, align_close, track_spans)
+        last = bisect_left(block_lines, position, key=_start_line)
+        blocks[first:last] = new_blocks
+        block_lines[first:last] = new_lines
+
+    document = fast_nodes.Document(blocks=blocks)
+    document._lines = lines
+    document._block_lines = block_lines
+    document._align_close = align_close
+    document._track_spans = track_spans
+    return document
+
+
+def _parse_chunk(text: str, first_line: int, offset: int, track_spans: bool
+                 ) -> Tuple[list, List[Tuple[int, int]], Optional[Tuple[int, int]]]:
+    """Parse one chunk in a worker.
+
+    Returns the blocks, their line ranges in the whole document and the line
+    and source position of the first <Align> tag that did not parse as an
+    Align block, or None.
+    """
+    lines = text.split('\n')
+    blocks = []
+    block_lines = []
+    failed_align = None
+    line_offset = offset  # Source position of lines[start]
+
+    for block, start, end in _iter_blocks(lines, fast_nodes, offset, track_spans=track_spans):
+        if (failed_align is None and not isinstance(block, fast_nodes.Align) and
+                ALIGN_TAG_PATTERN.match(lines[start].strip())):
+            failed_align = (first_line + start, line_offset)
+
+        if block:
+            blocks.append(block)
+            block_lines.append((first_line + start, first_line + end))
+            line_offset = block.span[1] + 1
+        else:
+            line_offset += len(lines[start]) + 1
+
+    return blocks, block_lines, failed_align
@@ -1,8 +1,10 @@
 """Main markdown parser."""
 
 import re
-from typing import List, Optional
-from .models import Document, BlockElement, Paragraph, HorizontalRule
+from types import ModuleType
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from . import models, nodes as fast_nodes
+from .models import Document, BlockElement, Paragraph
 from .elements import (
     parse_heading,
     parse_list,
@@ -12,188 +14,349 @@ from .elements import (
     parse_align,
     parse_inline_elements,
 )
-from .regex_patterns import (
-    is_indented_line, is_list_item, is_custom_tag
+from .elements.table import index_markdown_tables
+from .positions import SourceMap
+from .memo import BlockMemo
+from .mapped import MappedLines
+from .limits import ParseLimits, ParseLimitError, active_budget
+from .line_tags import (
+    LineTags, LINE_BLANK, LINE_ALIGN, LINE_FENCE, LINE_INDENTED, LINE_HEADING,
+    LINE_HR, LINE_PIPE, LINE_LIST, LINE_QUOTE,
+    LINE_PARAGRAPH_BREAK,
 )
 
+if TYPE_CHECKING:
+    from .profiler import ParseProfiler
 
-def parse(markdown_text: str) -> Document:
+
+def parse(markdown_text: str, validate: bool = True,
+          track_spans: bool = False, memo: Optional[BlockMemo] = None,
+          profiler: Optional["ParseProfiler"] = None,
+          limits: Optional[ParseLimits] = None) -> Document:
     """Parse markdown text into a structured document.
     
     Args:
         markdown_text: The markdown text to parse
+        validate: Build validated Pydantic models. With False, the document is
+            built from the lightweight classes in the nodes module, which skip
+            validation; call to_model() on it to get the Pydantic document.
+        track_spans: Record the source span of every node, not only of the
+            top-level blocks: list items, table rows and cells, nested lists
+            and inline elements.
+        memo: Reuse the blocks of earlier parses whose source lines are
+            unchanged, see memo.BlockMemo. Can not be combined with
+            track_spans, as the nodes inside reused blocks are shared.
+        profiler: Record the calls, lines and time of each block parser and
+            inline pattern in this profiler.ParseProfiler.
+        limits: Bound the input size, blocks, inline elements, nesting depth
+            and time of the parse, see limits.ParseLimits.
         
     Returns:
-        A Document object containing the parsed structure
+        A Document object containing the parsed structure. When limits
+        truncated it, its metadata has "truncated" set to True and
+        "truncated_by" to the name of the exceeded limit; it has no source
+        to edit incrementally.
+    
+    Raises:
+        ParseLimitError: If a limit is exceeded and limits do not truncate
     """
+    if memo is not None and track_spans:
+        raise ValueError("A block memo can not be used with track_spans")
+    if profiler is not None:
+        with profiler._profiling(markdown_text):
+            return parse(markdown_text, validate, track_spans, memo, limits=limits)
+    if limits is not None:
+        return _parse_limited(markdown_text, validate, track_spans, memo, limits)
+    
+    nodes = models if validate else fast_nodes
     lines = markdown_text.split('\n')
-    blocks = _parse_blocks(lines)
+    block_lines = []
+    blocks = _parse_blocks(lines, nodes, block_lines, track_spans, memo)
     
-    return Document(blocks=blocks)
+    document = nodes.Document(blocks=blocks)
+    document._lines = lines
+    document._block_lines = block_lines
+    document._track_spans = track_spans
+    return document
+
+
+def parse_file(path: str, validate: bool = True, track_spans: bool = False,
+               encoding: str = 'utf-8') -> Union[models.Document, fast_nodes.Document]:
+    """Parse a markdown file through a memory mapping.
 
+    Gives the blocks of parse(open(path, encoding=encoding).read()) while
+    holding far less memory for large files, see mapped.MappedLines. A
+    file with lone '\r' line ends is read in text mode instead.
 
-def _parse_blocks(lines: List[str]) -> List[BlockElement]:
-    """Parse lines into block elements."""
+    Args:
+        path: Path of the markdown file
+        validate: Build validated Pydantic models, see parse()
+        track_spans: Record the source span of every node, see parse();
+            spans count characters, not bytes
+        encoding: Encoding of the file, ASCII-compatible such as UTF-8
+
+    Returns:
+        The document, without source lines for incremental edits
+    """
+    nodes = models if validate else fast_nodes
+    with open(path, 'rb') as fp:
+        mapped = MappedLines(fp, encoding)
+    try:
+        lines = mapped
+        if mapped.has_lone_cr():
+            # Only text mode translates lone '\r' line ends
+            with open(path, encoding=encoding) as fp:
+                lines = fp.read().split('\n')
+        blocks = _parse_blocks(lines, nodes, track_spans=track_spans)
+    finally:
+        mapped.close()
+
+    document = nodes.Document(blocks=blocks)
+    document._track_spans = track_spans
+    return document
+
+
+def _parse_limited(markdown_text: str, validate: bool, track_spans: bool,
+                   memo: Optional[BlockMemo], limits: ParseLimits) -> Document:
+    """Parse markdown text within limits, see parse()."""
+    markdown_text, truncated_by = limits._check_input(markdown_text)
+    nodes = models if validate else fast_nodes
+    lines = markdown_text.split('\n')
+    block_lines = []
+    with limits._enforcing() as budget:
+        blocks = _parse_blocks(lines, nodes, block_lines, track_spans, memo)
+    truncated_by = budget.exceeded or truncated_by
+    
+    document = nodes.Document(blocks=blocks)
+    if truncated_by is not None:
+        document.metadata["truncated"] = True
+        document.metadata["truncated_by"] = truncated_by
+    else:
+        document._lines = lines
+        document._block_lines = block_lines
+    document._track_spans = track_spans
+    return document
+
+
+def _parse_blocks(lines: List[str], nodes: ModuleType = models,
+                  block_lines: Optional[List[Tuple[int, int]]] = None,
+                  track_spans: bool = False,
+                  memo: Optional[BlockMemo] = None) -> List[BlockElement]:
+    """Parse lines into block elements.
+    
+    When block_lines is given, the [start, end) line range of each block is
+    appended to it. Under ParseLimits that truncate, the blocks parsed before
+    a limit was exceeded are returned, and the budget records the limit.
+    """
     blocks = []
+    budget = active_budget()
+    
+    try:
+        for block, start, end in _iter_blocks(lines, nodes, track_spans=track_spans,
+                                              memo=memo):
+            if block:
+                if budget is not None:
+                    budget.add_block()
+                blocks.append(block)
+                if block_lines is not None:
+                    block_lines.append((start, end))
+    except ParseLimitError as e:
+        if budget is None or not budget.truncate:
+            raise
+        budget.exceeded = e.limit
+    
+    return blocks
+
+
+def _iter_blocks(lines: List[str], nodes: ModuleType = models, offset: int = 0,
+                 at_end: bool = True,
+                 stop_at: Optional[Callable[[int], bool]] = None,
+                 aligns_final: bool = False, track_spans: bool = False,
+                 memo: Optional[BlockMemo] = None
+                 ) -> Iterator[Tuple[Optional[BlockElement], int, int]]:
+    """Parse lines block by block.
+    
+    Yields the block, or None for lines that produce no block, with the index
+    of its first line and of the next line after it. Each block gets its
+    source span, counted from offset, the position of lines[0] in the source.
+    
+    With at_end False more lines may follow lines, and parsing stops before
+    the first block that a following line could still change: block parsers
+    look at most one line past the end of a block, and an <Align> opening tag
+    needs its closing tag, unless aligns_final says that no closing tag
+    follows. stop_at(i) is checked before parsing at line i and ends parsing
+    when it returns True. With track_spans, the nodes inside the blocks get
+    source spans too. With a memo, blocks whose lines were parsed before are
+    taken from it; it needs at_end, as it does not check for following lines.
+    """
+    tags = LineTags(lines)
+    tables = index_markdown_tables(lines)
+    line_offsets = _line_offsets(lines, offset) if track_spans else None
     i = 0
     
     while i < len(lines):
-        # Skip empty lines between blocks
-        if not lines[i].strip():
-            i += 1
-            continue
-        
-        # Try to parse as various block types
-        block = None
-        next_i = i + 1
-        
-        # Custom align tags
-        if not block:
-            align_result = parse_align(lines, i)
-            if align_result:
-                block, next_i = align_result
-        
-        # Code block
-        if not block:
-            code_result = parse_code_block(lines, i)
-            if code_result:
-                block, next_i = code_result
-        
-        # Heading
-        if not block:
-            heading = parse_heading(lines[i])
-            if heading:
-                block = heading
-                next_i = i + 1
-        
-        # Horizontal rule
-        if not block:
-            if _is_horizontal_rule(lines[i]):
-                block = HorizontalRule()
-                next_i = i + 1
-        
-        # Table
-        if not block:
-            table_result = parse_table(lines, i)
-            if table_result:
-                block, next_i = table_result
+        if stop_at is not None and stop_at(i):
+            return
         
-        # List
-        if not block:
-            list_result = parse_list(lines, i)
-            if list_result:
-                block, next_i = list_result
-        
-        # Quote
-        if not block:
-            quote_result = parse_quote(lines, i)
-            if quote_result:
-                block, next_i = quote_result
-        
-        # Paragraph (default)
-        if not block:
-            paragraph, next_i = _parse_paragraph(lines, i)
-            if paragraph:
-                block = paragraph
+        if memo is None or tags.flags[i] & LINE_BLANK:
+            block, next_i = _parse_block(lines, i, tags, tables, nodes, line_offsets)
+        else:
+            hit = memo.lookup(lines, i, nodes is models)
+            if hit is None:
+                block, next_i = _parse_block(lines, i, tags, tables, nodes, line_offsets)
+                if block:
+                    memo.store(lines, i, next_i, block, nodes is models)
             else:
-                # If no paragraph was parsed, advance at least one line to avoid infinite loop
-                next_i = i + 1
+                block, next_i = hit
         
+        if not at_end:
+            if next_i + 1 >= len(lines):
+                return
+            if (tags.flags[i] & LINE_ALIGN and not aligns_final and
+                not isinstance(block, nodes.Align)):
+                return
+        
+        end_offset = offset
+        for k in range(i, next_i):
+            end_offset += len(lines[k]) + 1
         if block:
-            blocks.append(block)
+            block.span = (offset, end_offset - 1)
         
+        yield block, i, next_i
+        offset = end_offset
         i = next_i
+
+
+def _line_offsets(lines: List[str], offset: int = 0) -> List[int]:
+    """Return the source position of each line, starting from offset."""
+    offsets = []
+    for line in lines:
+        offsets.append(offset)
+        offset += len(line) + 1
+    return offsets
+
+
+def _parse_block(lines: List[str], i: int, tags: LineTags,
+                 tables: Dict[int, Tuple[int, int, int]],
+                 nodes: ModuleType = models,
+                 line_offsets: Optional[List[int]] = None) -> Tuple[Optional[BlockElement], int]:
+    """Parse the block starting at line i.
     
-    return blocks
+    When line_offsets, the source position of each line, is given, the nodes
+    inside the block get source spans.
+    Returns the block, or None for lines that produce no block, and the index
+    of the next line after it.
+    """
+    line_flags = tags.flags[i]
+    
+    # Skip empty lines between blocks
+    if line_flags & LINE_BLANK:
+        return None, i + 1
+    
+    # Try to parse as various block types
+    block = None
+    next_i = i + 1
+    
+    # Custom align tags; one with no closing tag after it would scan to the
+    # end of the lines, for each such tag
+    if not block and line_flags & LINE_ALIGN and i <= tags.last_align_close:
+        align_result = parse_align(lines, i, nodes, line_offsets)
+        if align_result:
+            block, next_i = align_result
+    
+    # Code block
+    if not block and line_flags & (LINE_FENCE | LINE_INDENTED):
+        code_result = parse_code_block(lines, i, nodes)
+        if code_result:
+            block, next_i = code_result
+    
+    # Heading
+    if not block and line_flags & LINE_HEADING:
+        heading = parse_heading(lines[i], nodes,
+                                line_offsets[i] if line_offsets is not None else None)
+        if heading:
+            block = heading
+            next_i = i + 1
+    
+    # Horizontal rule
+    if not block and line_flags & LINE_HR:
+        block = nodes.HorizontalRule()
+        next_i = i + 1
+    
+    # Table
+    if not block and line_flags & LINE_PIPE:
+        table_result = parse_table(lines, i, tables, nodes, line_offsets)
+        if table_result:
+            block, next_i = table_result
+    
+    # List
+    if not block and line_flags & LINE_LIST:
+        list_result = parse_list(lines, i, nodes, line_offsets)
+        if list_result:
+            block, next_i = list_result
+    
+    # Quote
+    if not block and line_flags & LINE_QUOTE:
+        quote_result = parse_quote(lines, i, nodes, line_offsets)
+        if quote_result:
+            block, next_i = quote_result
+    
+    # Paragraph (default)
+    if not block:
+        paragraph, next_i = _parse_paragraph(lines, i, tags, tables, nodes, line_offsets)
+        if paragraph:
+            block = paragraph
+        else:
+            # If no paragraph was parsed, advance at least one line to avoid infinite loop
+            next_i = i + 1
+    
+    return block, next_i
 
 
-def _parse_paragraph(lines: List[str], start_idx: int) -> tuple[Optional[Paragraph], int]:
+def _parse_paragraph(lines: List[str], start_idx: int, tags: LineTags,
+                     tables: Dict[int, Tuple[int, int, int]],
+                     nodes: ModuleType = models,
+                     line_offsets: Optional[List[int]] = None) -> tuple[Optional[Paragraph], int]:
     """Parse a paragraph starting from the given line index."""
     if start_idx >= len(lines):
         return None, start_idx
     
+    flags = tags.flags
     paragraph_lines = []
     i = start_idx
     
     while i < len(lines):
-        line = lines[i]
+        line_flags = flags[i]
         
         # Empty line ends paragraph
-        if not line.strip():
+        if line_flags & LINE_BLANK:
             break
         
         # Check if line starts a different block type
-        if (_is_horizontal_rule(line) or
-            parse_heading(line) or
-            line.strip().startswith('>') or
-            line.strip().startswith('```') or
-            is_indented_line(line) or
-            is_custom_tag(line) or
-            is_list_item(line) or
-            _could_be_table_start(lines, i)):
+        if (line_flags & LINE_PARAGRAPH_BREAK or
+            _could_be_table_start(tables, i)):
             break
         
-        paragraph_lines.append(line)
+        paragraph_lines.append(lines[i])
         i += 1
     
     if not paragraph_lines:
         return None, start_idx
     
     # Join lines and parse inline elements
-    text = ' '.join(line.strip() for line in paragraph_lines)
-    content = parse_inline_elements(text)
+    if line_offsets is not None:
+        text, origin = SourceMap.join(' ', [
+            (line.strip(), line_offsets[k] + len(line) - len(line.lstrip()))
+            for k, line in enumerate(paragraph_lines, start_idx)
+        ])
+    else:
+        text, origin = ' '.join(line.strip() for line in paragraph_lines), None
+    content = parse_inline_elements(text, nodes, origin)
     
-    paragraph = Paragraph(content=content)
+    paragraph = nodes.Paragraph(content=content)
     return paragraph, i
 
 
-def _is_horizontal_rule(line: str) -> bool:
-    """Check if a line is a horizontal rule."""
-    line = line.strip()
-    
-    # Return False for empty lines or lines that are too short
-    if len(line) < 3:
-        return False
-    
-    # Simple and fast checks for horizontal rules
-    # Three or more consecutive -, *, or _
-    if line.replace('-', '') == '' and len(line) >= 3:
-        return True
-    if line.replace('*', '') == '' and len(line) >= 3:
-        return True
-    if line.replace('_', '') == '' and len(line) >= 3:
-        return True
-    
-    # Check for spaced patterns (limit complexity)
-    # Remove all spaces and check if remaining chars are all the same
-    no_spaces = line.replace(' ', '')
-    if len(no_spaces) >= 3:
-        if (no_spaces.replace('-', '') == '' or 
-            no_spaces.replace('*', '') == '' or 
-            no_spaces.replace('_', '') == ''):
-            return True
-    
-    return False
-
-
-def _could_be_list_item(line: str) -> bool:
-    """Check if a line could be the start of a list."""
-    return is_list_item(line)
-
-
-def _could_be_table_start(lines: List[str], idx: int) -> bool:
-    """Check if the current position could be the start of a table."""
-    if idx >= len(lines):
-        return False
-    
-    # Check if current line has pipes
-    if '|' not in lines[idx]:
-        return False
-    
-    # Check if next line could be separator
-    if idx + 1 < len(lines):
-        next_line = lines[idx + 1].strip()
-        if '|' in next_line and '-' in next_line:
-            return True
-    
-    return False 
\ No newline at end of file
+def _could_be_table_start(tables: Dict[int, Tuple[int, int, int]], idx: int) -> bool:
+    """Check if a table starts at the current position."""
+    return idx in tables
@@ -0,0 +1,164 @@
+"""Source positions of parsed nodes.
+
+Block parsers strip markers and indentation and join lines before parsing
+inline elements. A SourceMap records where each piece of that derived text
+starts in the source, so parse(text, track_spans=True) can give every node a
+span in the original text. The lookups below bisect those spans: nodes are
+stored in source order, so each level of the tree is searched in O(log n)
+without building any index.
+"""
+
+from bisect import bisect_right
+from typing import Any, List, Optional, Tuple
+from . import models, nodes as fast_nodes
+
+
+class SourceMap:
+    """Maps positions in text derived from source lines to source offsets.
+
+    The text is made of pieces copied from the source; add() records the text
+    position and the source offset where each piece starts. Separators
+    inserted between pieces map to the character after the previous piece.
+    """
+
+    __slots__ = ("positions", "offsets")
+
+    def __init__(self, position: int = 0, offset: Optional[int] = None):
+        self.positions: List[int] = []
+        self.offsets: List[int] = []
+        if offset is not None:
+            self.add(position, offset)
+
+    def add(self, position: int, offset: int) -> None:
+        """Record that the text from position on comes from offset on."""
+        self.positions.append(position)
+        self.offsets.append(offset)
+
+    def offset(self, position: int) -> int:
+        """Return the source offset of a text position."""
+        k = bisect_right(self.positions, position) - 1
+        return self.offsets[k] + position - self.positions[k]
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Return the source span of the text from start to end (exclusive)."""
+        if end <= start:
+            offset = self.offset(start)
+            return offset, offset
+        return self.offset(start), self.offset(end - 1) + 1
+
+    def sliced(self, start: int) -> "SourceMap":
+        """Return the map of text[start:]."""
+        k = bisect_right(self.positions, start) - 1
+        source_map = SourceMap(0, self.offset(start))
+        for position, offset in zip(self.positions[k + 1:], self.offsets[k + 1:]):
+            source_map.add(position - start, offset)
+        return source_map
+
+    @classmethod
+    def join(cls, separator: str,
+             pieces: List[Tuple[str, int]]) -> Tuple[str, "SourceMap"]:
+        """Join (text, source offset) pieces like separator.join().
+
+        Returns the joined text and its map.
+        """
+        source_map = cls()
+        position = 0
+        for text, offset in pieces:
+            source_map.add(position, offset)
+            position += len(text) + len(separator)
+        return separator.join(text for text, _ in pieces), source_map
+
+
+def strip_mapped(text: str, source_map: SourceMap) -> Tuple[str, SourceMap]:
+    """Strip text like str.strip() and return the map of the result."""
+    stripped = text.lstrip()
+    return stripped.rstrip(), source_map.sliced(len(text) - len(stripped))
+
+
+def children(node: Any) -> list:
+    """Return the child nodes of a node in source order."""
+    field = _CHILD_FIELDS.get(type(node), "content")
+    if field is None:
+        return []
+    if field == "header":
+        return [node.header, *node.rows]
+    value = getattr(node, field)
+    return value if isinstance(value, list) else []
+
+
+def node_path(document: Any, offset: int) -> list:
+    """Find the nodes containing a source offset.
+
+    A node contains the offsets from the start of its span up to and including
+    the end, so a cursor just after a node is still inside it. Where two nodes
+    touch, the one starting at offset wins.
+
+    Returns the path from the block down to the innermost node, or an empty
+    list when offset is between blocks. The path stops at nodes without spans.
+    """
+    path = []
+    nodes = document.blocks
+
+    while nodes:
+        k = bisect_right(nodes, offset, key=_span_start) - 1
+        if k < 0 or nodes[k].span is None or offset > nodes[k].span[1]:
+            break
+        node = nodes[k]
+        path.append(node)
+
+        # Search the body rows of a table without copying them
+        if _CHILD_FIELDS.get(type(node)) == "header":
+            header_end = node.header.span[1] if node.header.span else -1
+            nodes = node.rows if offset > header_end else [node.header]
+        else:
+            nodes = children(node)
+
+    return path
+
+
+def block_at_line(document: Any, line: int) -> Any:
+    """Return the block covering a source line, or None between blocks.
+
+    Raises:
+        ValueError: If the document has no source lines
+    """
+    block_lines = document._block_lines
+    if block_lines is None:
+        raise ValueError("Document has no source lines; use a document returned by parse()")
+
+    k = bisect_right(block_lines, line, key=_start_line) - 1
+    if k < 0 or line >= block_lines[k][1]:
+        return None
+    return document.blocks[k]
+
+
+def shift_spans(node: Any, delta: int) -> None:
+    """Move the spans of a node and all its descendants by delta."""
+    # An explicit stack, as nesting can be deeper than the recursion limit
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        start, end = node.span
+        node.span = (start + delta, end + delta)
+        stack.extend(child for child in children(node) if child.span is not None)
+
+
+# Attribute holding the children of each node type, "content" by default
+_CHILD_FIELDS = {}
+for _nodes in (models, fast_nodes):
+    _CHILD_FIELDS.update({
+        _nodes.Document: "blocks",
+        _nodes.ListElement: "items",
+        _nodes.Table: "header",
+        _nodes.TableRow: "cells",
+        _nodes.CodeBlock: None,
+        _nodes.HorizontalRule: None,
+    })
+
+
+def _span_start(node: Any) -> int:
+    return -1 if node.span is None else node.span[0]
+
+
+def _start_line(lines: Tuple[int, int]) -> int:
+    return lines[0]
@@ -0,0 +1,335 @@
+"""Opt-in profiling of parse() by block parser and inline pattern.
+
+parse(text, profiler=profiler) records, in the ParseProfiler:
+
+    block parsers    calls, blocks returned, lines consumed, and total and
+                     self time of each of parse_align, parse_code_block,
+                     parse_heading, parse_table, parse_list, parse_quote and
+                     the paragraph parser
+    inline parsing   the same for parse_inline_elements, whichever block
+                     parser called it
+    inline patterns  match attempts, hits and time of each regex of the
+                     inline scanner, by its name in regex_patterns
+
+Total time includes the nested calls, self time does not: a list's inline
+content counts as inline parsing and its regexes as patterns, so the self
+times add up to the profiled parse time without double counting. What no
+probe covers, line tagging, table indexing, horizontal rules and the block
+loop itself, is reported as parse overhead. A nested list is parsed within
+the parse_list call of the top-level list, and counts only toward it.
+
+The block parsers and patterns are module globals looked up on each call,
+so while a profiled parse runs, probes replace them in every module of the
+package and are removed when the last profiled parse ends. Parses that are
+not profiled never see a probe, and a probe met by a parse running in
+another thread, without a profiler, passes the call straight through.
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel
+from . import regex_patterns
+from .elements.code import parse_code_block
+from .elements.custom import parse_align
+from .elements.heading import parse_heading
+from .elements.list import parse_list
+from .elements.quote import parse_quote
+from .elements.table import parse_table
+from .elements.text import parse_inline_elements
+from .parser import _parse_paragraph
+
+
+class ParserStats(BaseModel):
+    """Counters of a block parser, or of inline parsing."""
+
+    calls: int = 0
+    blocks: int = 0
+    lines: int = 0
+    total_time: float = 0.0
+    self_time: float = 0.0
+
+
+class PatternStats(BaseModel):
+    """Counters of an inline regex."""
+
+    attempts: int = 0
+    hits: int = 0
+    time: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the share of attempts that matched."""
+        return self.hits / self.attempts if self.attempts else 0.0
+
+
+class ParseProfiler:
+    """Collects where parse() spends its time, across the parses it is given to.
+
+    Pass it to parse(text, profiler=profiler), then read report(),
+    dominant_cost() or the stats.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.characters = 0
+        self.lines = 0
+        self.parse_time = 0.0
+        # name -> [calls, blocks, lines, total time, self time]
+        self._parsers: Dict[str, list] = {}
+        # name -> [attempts, hits, time]
+        self._patterns: Dict[str, list] = {}
+        # Time spent in probed calls nested in each probed call running
+        self._nested: List[float] = []
+        # Time the probes spent on their own bookkeeping
+        self._probe_time = 0.0
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        self.__init__()
+
+    def parser_stats(self) -> Dict[str, ParserStats]:
+        """Return a snapshot of the counters of each block parser and of inline parsing."""
+        return {name: ParserStats(calls=calls, blocks=blocks, lines=lines,
+                                  total_time=total_time, self_time=self_time)
+                for name, (calls, blocks, lines, total_time, self_time)
+                in self._parsers.items()}
+
+    def pattern_stats(self) -> Dict[str, PatternStats]:
+        """Return a snapshot of the counters of each inline pattern."""
+        return {name: PatternStats(attempts=attempts, hits=hits, time=elapsed)
+                for name, (attempts, hits, elapsed) in self._patterns.items()}
+
+    @property
+    def overhead_time(self) -> float:
+        """Parse time outside any probed call and the probes themselves."""
+        probed = (sum(counters[4] for counters in self._parsers.values()) +
+                  sum(counters[2] for counters in self._patterns.values()))
+        return max(0.0, self.parse_time - probed - self._probe_time)
+
+    def dominant_cost(self) -> Tuple[str, float]:
+        """Return the cost with the most self time and that time in seconds.
+
+        Costs are the names of the parser functions, such as parse_table or
+        parse_inline_elements, the names of the patterns, and "parse
+        overhead".
+        """
+        costs = {_FUNCTION_NAMES[name]: counters[4] for name, counters in self._parsers.items()}
+        costs.update((name, counters[2]) for name, counters in self._patterns.items())
+        costs["parse overhead"] = self.overhead_time
+        return max(costs.items(), key=lambda item: item[1])
+
+    def report(self) -> str:
+        """Return a table of the counters, naming the dominant cost first."""
+        total = (self.parse_time - self._probe_time) or 1.0
+        name, seconds = self.dominant_cost()
+        rows = [
+            f"Parsed {self.documents} document(s), {self.characters} characters, "
+            f"{self.lines} lines in {total * 1000:.2f} ms, not counting probes",
+            f"Dominant cost: {name}, {seconds * 1000:.2f} ms, "
+            f"{seconds / total:.1%} of parse time",
+            "",
+            f"{'parser':<24}{'calls':>9}{'blocks':>9}{'lines':>9}"
+            f"{'total ms':>11}{'self ms':>10}{'self %':>8}",
+        ]
+        for parser, stats in sorted(self.parser_stats().items(),
+                                    key=lambda item: -item[1].self_time):
+            rows.append(f"{_FUNCTION_NAMES[parser]:<24}{stats.calls:>9}{stats.blocks:>9}"
+                        f"{stats.lines:>9}{stats.total_time * 1000:>11.2f}"
+                        f"{stats.self_time * 1000:>10.2f}{stats.self_time / total:>8.1%}")
+        overhead = self.overhead_time
+        rows.append(f"{'parse overhead':<24}{'':>38}{overhead * 1000:>10.2f}"
+                    f"{overhead / total:>8.1%}")
+
+        rows += ["", f"{'pattern':<34}{'attempts':>10}{'hits':>9}{'hit %':>8}"
+                     f"{'ms':>9}{'%':>8}"]
+        for pattern, stats in sorted(self.pattern_stats().items(),
+                                     key=lambda item: -item[1].time):
+            rows.append(f"{pattern:<34}{stats.attempts:>10}{stats.hits:>9}"
+                        f"{stats.hit_ratio:>8.1%}{stats.time * 1000:>9.2f}"
+                        f"{stats.time / total:>8.1%}")
+        return "\n".join(rows)
+
+    @contextmanager
+    def _profiling(self, markdown_text: str) -> Iterator[None]:
+        """Profile the parse of markdown_text run in the block."""
+        token = _CURRENT.set(self)
+        _install()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.parse_time += time.perf_counter() - start
+            _uninstall()
+            _CURRENT.reset(token)
+            self.documents += 1
+            self.characters += len(markdown_text)
+            self.lines += markdown_text.count('\n') + 1
+
+
+_CURRENT: ContextVar[Optional[ParseProfiler]] = ContextVar("markdown_parser_profiler",
+                                                           default=None)
+
+
+def _block_lines(args: tuple, result: Any) -> Tuple[bool, int]:
+    """Return whether a parser returning (block, next line) found a block, and its lines."""
+    if not result or not result[0]:
+        return False, 0
+    return True, result[1] - args[1]
+
+
+def _heading_lines(args: tuple, result: Any) -> Tuple[bool, int]:
+    return (True, 1) if result else (False, 0)
+
+
+def _inline_lines(args: tuple, result: Any) -> Tuple[bool, int]:
+    return False, 0
+
+
+def _probe(name: str, function: Callable,
+           count_lines: Callable[[tuple, Any], Tuple[bool, int]]) -> Callable:
+    """Wrap a parser function to record its calls in the current profiler."""
+    def probe(*args: Any, **kwargs: Any) -> Any:
+        profiler = _CURRENT.get()
+        if profiler is None:
+            return function(*args, **kwargs)
+
+        nested = profiler._nested
+        nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = nested.pop()
+            counters = profiler._parsers.get(name)
+            if counters is None:
+                counters = profiler._parsers[name] = [0, 0, 0, 0.0, 0.0]
+            counters[0] += 1
+            counters[3] += elapsed
+            counters[4] += elapsed - inner
+
+        found, lines = count_lines(args, result)
+        if found:
+            counters[1] += 1
+            counters[2] += lines
+        _account(profiler, start, elapsed)
+        return result
+
+    probe.__wrapped__ = function
+    return probe
+
+
+def _account(profiler: ParseProfiler, start: float, elapsed: float) -> None:
+    """Charge a probed call to the call around it, and its bookkeeping to the probes."""
+    spent = time.perf_counter() - start
+    if profiler._nested:
+        profiler._nested[-1] += spent
+    profiler._probe_time += spent - elapsed
+
+
+class _PatternProbe:
+    """Stands in for a compiled pattern, recording its match and search calls."""
+
+    __slots__ = ("_pattern", "_name")
+
+    def __init__(self, name: str, pattern: Any):
+        self._pattern = pattern
+        self._name = name
+
+    def match(self, string: str, pos: int = 0, endpos: int = sys.maxsize) -> Any:
+        return self._call(self._pattern.match, string, pos, endpos)
+
+    def search(self, string: str, pos: int = 0, endpos: int = sys.maxsize) -> Any:
+        return self._call(self._pattern.search, string, pos, endpos)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pattern, name)
+
+    def _call(self, method: Callable, string: str, pos: int, endpos: int) -> Any:
+        profiler = _CURRENT.get()
+        if profiler is None:
+            return method(string, pos, endpos)
+
+        start = time.perf_counter()
+        match = method(string, pos, endpos)
+        elapsed = time.perf_counter() - start
+        counters = profiler._patterns.get(self._name)
+        if counters is None:
+            counters = profiler._patterns[self._name] = [0, 0, 0.0]
+        counters[0] += 1
+        counters[2] += elapsed
+        if match is not None:
+            counters[1] += 1
+        _account(profiler, start, elapsed)
+        return match
+
+
+_PARSERS = {
+    "align": (parse_align, _block_lines),
+    "code_block": (parse_code_block, _block_lines),
+    "heading": (parse_heading, _heading_lines),
+    "table": (parse_table, _block_lines),
+    "list": (parse_list, _block_lines),
+    "quote": (parse_quote, _block_lines),
+    "paragraph": (_parse_paragraph, _block_lines),
+    "inline_elements": (parse_inline_elements, _inline_lines),
+}
+
+# Function name of each parser, for reports
+_FUNCTION_NAMES = {name: function.__name__ for name, (function, _) in _PARSERS.items()}
+
+# Patterns of the inline scanner in elements/text.py
+_INLINE_PATTERNS = (
+    "INLINE_TRIGGER_PATTERN", "BOLD_PATTERN", "ITALIC_ASTERISK_PATTERN",
+    "ITALIC_ASTERISK_START_PATTERN", "ITALIC_UNDERSCORE_PATTERN",
+    "ITALIC_UNDERSCORE_START_PATTERN", "INLINE_CODE_PATTERN",
+    "IMAGE_SIZE_ATTR_PATTERN", "IMAGE_CSS_ATTR_PATTERN",
+)
+
+# Probe of each function and pattern, by the id of the original
+_PROBES: Dict[int, Any] = {}
+for _name, (_function, _count_lines) in _PARSERS.items():
+    _PROBES[id(_function)] = _probe(_name, _function, _count_lines)
+for _name in _INLINE_PATTERNS:
+    _pattern = getattr(regex_patterns, _name)
+    _PROBES[id(_pattern)] = _PatternProbe(_name, _pattern)
+
+_install_lock = threading.Lock()
+_active = 0
+# (module, attribute, original) of every reference replaced by a probe
+_replaced: List[Tuple[Any, str, Any]] = []
+
+
+def _install() -> None:
+    """Replace the parsers and patterns with probes, unless already done."""
+    global _active
+    with _install_lock:
+        _active += 1
+        if _active > 1:
+            return
+        package = __name__.rpartition('.')[0]
+        for module_name, module in list(sys.modules.items()):
+            if module is None or not (module_name == package or
+                                      module_name.startswith(package + '.')):
+                continue
+            for attribute, value in list(vars(module).items()):
+                probe = _PROBES.get(id(value))
+                if probe is not None and not attribute.startswith('__'):
+                    _replaced.append((module, attribute, value))
+                    setattr(module, attribute, probe)
+
+
+def _uninstall() -> None:
+    """Put the originals back once no profiled parse is running."""
+    global _active
+    with _install_lock:
+        _active -= 1
+        if _active:
+            return
+        for module, attribute, original in _replaced:
+            setattr(module, attribute, original)
+        _replaced.clear()
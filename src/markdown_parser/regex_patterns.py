@@ -10,19 +10,23 @@ import re
 # ============================================================================
 
 # Images
-IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)(\{[^}]+\})?')
 IMAGE_FULL_PATTERN = re.compile(r'^!\[([^\]]*)\]\(([^)]+)\)(\{[^}]+\})?$')
 
-# Links  
-LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(([^)]+?)(?:\s+"([^"]+)")?\)')
-LINK_FULL_PATTERN = re.compile(r'^\[([^\]]+)\]\(([^)]+?)(?:\s+"([^"]+)")?\)$')
-
 # Text formatting
 BOLD_PATTERN = re.compile(r'(\*\*|__)([^*_]+?)\1')
 ITALIC_ASTERISK_PATTERN = re.compile(r'(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)')
 ITALIC_UNDERSCORE_PATTERN = re.compile(r'(?<!_)_(?!_)([^_]+?)(?<!_)_(?!_)')
 INLINE_CODE_PATTERN = re.compile(r'`([^`]+)`')
 
+# Italic variants for a match that starts exactly where the previous inline
+# element ended: that position is the start of the remaining text, so the
+# opening look-behind must not see the delimiter that was already consumed.
+ITALIC_ASTERISK_START_PATTERN = re.compile(r'\*(?!\*)(.+?)(?<!\*)\*(?!\*)')
+ITALIC_UNDERSCORE_START_PATTERN = re.compile(r'_(?!_)([^_]+?)(?<!_)_(?!_)')
+
+# Characters that can start an inline element
+INLINE_TRIGGER_PATTERN = re.compile(r'[*_`\[!]')
+
 # Image attributes
 IMAGE_SIZE_ATTR_PATTERN = re.compile(r'size\s*=\s*([0-9.]+)')
 IMAGE_CSS_ATTR_PATTERN = re.compile(r'css\s*=\s*"([^"]+)"')
@@ -33,7 +37,6 @@ IMAGE_CSS_ATTR_PATTERN = re.compile(r'css\s*=\s*"([^"]+)"')
 
 # Headings
 HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+)$')
-HEADING_TRAILING_HASH_PATTERN = re.compile(r'\s*#+\s*$')
 
 # Code blocks
 CODE_FENCE_START_PATTERN = re.compile(r'^```(\w+)?\s*(.*)$')
@@ -41,24 +44,34 @@ CODE_FENCE_END_PATTERN = re.compile(r'^```\s*$')
 CODE_INDENT_PATTERN = re.compile(r'^(    |\t)')
 CODE_INDENT_CAPTURE_PATTERN = re.compile(r'^(    |\t)(.*)$')
 
-# Lists
-UNORDERED_LIST_PATTERN = re.compile(r'^(\s*)([-*+])\s+(.*)$')
-ORDERED_LIST_PATTERN = re.compile(r'^(\s*)(\d+)([.)])\s+(.*)$')
-
 # Lists (simple matching)
 UNORDERED_LIST_SIMPLE_PATTERN = re.compile(r'^\s*[-*+]\s+')
 ORDERED_LIST_SIMPLE_PATTERN = re.compile(r'^\s*\d+[.)]\s+')
 
-# Quotes
-QUOTE_PREFIX_PATTERN = re.compile(r'^\s*>\s?')
+# Quotes, matched at the end of the previous prefix
+QUOTE_PREFIX_PATTERN = re.compile(r'\s*>\s?')
 
 # Tables
 TABLE_SEPARATOR_PATTERN = re.compile(r'^:?-{3,}:?$')
 
 # Custom elements
 ALIGN_TAG_PATTERN = re.compile(r'^<Align\s+(left|center|right)>(.*)$', re.IGNORECASE)
+ALIGN_CLOSE_PATTERN = re.compile(r'</Align>', re.IGNORECASE)
 CUSTOM_TAG_PATTERN = re.compile(r'^<(Align|Left|Center|Right)', re.IGNORECASE)
 
+# Line classification: leading whitespace plus the block marker that follows it.
+# One match per line answers the questions the block parsers ask about it.
+LINE_CLASS_PATTERN = re.compile(
+    r'(\s*+)(?:'
+    r'(?P<fence>```)'
+    r'|(?P<heading>#{1,6}\s+\S)'
+    r'|(?P<bullet>[-*+]\s)'
+    r'|(?P<number>\d+[.)]\s)'
+    r'|(?P<quote>>(?:\s*>)*)'
+    r'|(?P<tag><(?i:(?P<align>Align\s+(?:left|center|right)>)|Align|Left|Center|Right))'
+    r')?'
+)
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
@@ -77,5 +90,11 @@ def is_custom_tag(line: str) -> bool:
     return CUSTOM_TAG_PATTERN.match(line) is not None
 
 def remove_quote_prefix(line: str, count: int = 1) -> str:
-    """Remove quote prefix from a line."""
-    return QUOTE_PREFIX_PATTERN.sub('', line, count=count) 
\ No newline at end of file
+    """Remove up to count quote prefixes from the start of a line."""
+    position = 0
+    for _ in range(count):
+        match = QUOTE_PREFIX_PATTERN.match(line, position)
+        if match is None:
+            break
+        position = match.end()
+    return line[position:]
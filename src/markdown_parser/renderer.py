@@ -0,0 +1,93 @@
+"""Type-dispatch table shared by the exporters.
+
+A Renderer maps each node class to a function called as function(renderer,
+node) that returns the node's text. Lookups use the exact type of the node,
+so rendering costs one dict lookup whatever the element is; a subclass
+without an entry of its own is resolved once through its MRO and cached.
+Built-in functions render children through renderer.render() and
+renderer.render_all(), so an override applies wherever its type appears,
+for example to images nested in list items or table cells.
+"""
+
+from typing import Any, Callable, Dict, Optional, Sequence
+
+
+RenderFunction = Callable[["Renderer", Any], str]
+
+
+def _render_nothing(renderer: "Renderer", node: Any) -> str:
+    """Render a node of a type without a renderer."""
+    return ""
+
+
+class Renderer:
+    """Renders nodes with a function looked up by their exact type.
+
+    Subclasses list their built-in functions in RENDERERS; instances start
+    from a copy of it, so registering on one renderer changes no other.
+
+    Args:
+        include_extensions: Whether to render custom extensions
+    """
+
+    RENDERERS: Dict[type, RenderFunction] = {}
+
+    def __init__(self, include_extensions: bool = True):
+        self.include_extensions = include_extensions
+        self._registered: Dict[type, RenderFunction] = dict(self.RENDERERS)
+        self._table: Dict[type, RenderFunction] = dict(self._registered)
+
+    def register(self, node_type: type,
+                 function: Optional[RenderFunction] = None) -> Any:
+        """Render nodes of node_type, and its subclasses, with function.
+
+        Replaces the built-in renderer of the type if there is one. Without
+        a function, returns a decorator that registers the function it wraps.
+
+        Args:
+            node_type: Node class, from models or nodes
+            function: Called as function(renderer, node), returns the text
+        """
+        if function is None:
+            def decorator(function: RenderFunction) -> RenderFunction:
+                self.register(node_type, function)
+                return function
+            return decorator
+
+        self._registered[node_type] = function
+        # Subclasses may have been resolved to the previous function
+        self._table = dict(self._registered)
+        return function
+
+    def renderer_for(self, node_type: type) -> RenderFunction:
+        """Return the function that renders nodes of node_type."""
+        function = self._table.get(node_type)
+        if function is None:
+            function = self._resolve(node_type)
+        return function
+
+    def render(self, node: Any) -> str:
+        """Render a single node."""
+        try:
+            function = self._table[type(node)]
+        except KeyError:
+            function = self._resolve(type(node))
+        return function(self, node)
+
+    def render_all(self, nodes: Sequence[Any]) -> str:
+        """Render nodes and concatenate the results."""
+        table = self._table
+        resolve = self._resolve
+        return ''.join([(table.get(type(node)) or resolve(type(node)))(self, node)
+                        for node in nodes])
+
+    def _resolve(self, node_type: type) -> RenderFunction:
+        """Find the renderer of the nearest registered base class and cache it."""
+        for base in node_type.__mro__[1:]:
+            function = self._registered.get(base)
+            if function is not None:
+                break
+        else:
+            function = _render_nothing
+        self._table[node_type] = function
+        return function
@@ -0,0 +1,525 @@
+"""Local HTTP service rendering markdown, run by python -m markdown_parser serve.
+
+Routes:
+
+    POST /html      the request body, UTF-8 markdown, as an HTML page from
+                    export_html(). Query: title, extensions=0 to leave out
+                    extended syntax
+    POST /json      the body as the JSON of the parsed Document, from
+                    export_json(). Query: spans=1 to record source spans,
+                    exclude_defaults=1
+    GET  /metrics   request latency histograms, queue depth and busy
+                    workers, in the Prometheus text format
+
+Rendering runs in a pool of worker processes started, and warmed, before
+the first request: forked from a process that has imported the package,
+so regex_patterns is compiled, each has then rendered a document using
+every element. The HTTP side is threads that read requests, hash them and
+wait for a worker; at most one render per worker is submitted, and
+requests waiting for a worker are the queue depth.
+
+Each response carries a strong ETag, a digest of the body, route, options
+and package version. A request whose If-None-Match holds it gets 304 Not
+Modified without reaching the pool, so clients revalidating unchanged
+documents cost one hash each.
+
+Bodies over max_bytes get 413, bodies that are not UTF-8 get 400, and
+documents nesting lists or quotes deeper than max_depth, or with a timeout
+taking longer to render, get 422 from ParseLimits. The exporters recurse
+once per level, so max_depth also keeps renders within the stack. A render
+that fails otherwise gets 500. A worker that dies is replaced with the
+whole pool, and the requests it was serving get 503.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from pydantic import BaseModel
+from . import __version__
+from .exporter import export_html, export_html_bytes
+from .json_export import export_json
+from .limits import ParseLimitError, ParseLimits
+from .parser import parse
+
+DEFAULT_PORT = 8000
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_DEPTH = 64
+
+# Upper bounds, in seconds, of the latency histogram buckets
+_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+            2.5, 5.0, 10.0)
+
+# Request path -> route label of the metrics
+_ROUTES = {"/html": "html", "/json": "json", "/metrics": "metrics"}
+_RENDER_ROUTES = ("html", "json")
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+# Document rendered by each worker before it takes requests
+_WARM_UP = """# Heading
+
+Text with **bold**, *italic*, _italic_, `code`, a [link](http://example.com "title")
+and an ![image](image.png){size=0.5 css="border: 0"}.
+
+- Item
+  - Nested item
+1. First
+2. Second
+
+> Quote
+> > Nested quote
+
+```python
+print("code")
+```
+
+| Left | Center |
+|:-----|:------:|
+| a    | b      |
+
+---
+
+<Align center>
+Centered
+</Align>
+"""
+
+
+class ServerStats(BaseModel):
+    """Counters of a RenderServer."""
+
+    workers: int
+    busy: int = 0
+    queue_depth: int = 0
+    requests: int = 0
+    not_modified: int = 0
+    errors: int = 0
+
+
+class _Histogram:
+    """Cumulative counts of observed durations over _BUCKETS."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        # The last count is for durations over every bucket
+        self.counts = [0] * (len(_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def lines(self, name: str, labels: str = "") -> List[str]:
+        """Return the sample lines of the histogram in the Prometheus text format."""
+        prefix = labels + "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(_BUCKETS + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        suffix = "{" + labels + "}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total:.6f}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class _Metrics:
+    """Request counts, latencies and the state of the pool, shared by handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {route: _Histogram() for route in _ROUTES.values()}
+        self.queue_wait = _Histogram()
+        # (route, status) -> requests answered
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self.waiting = 0
+        self.busy = 0
+
+    def observe(self, route: str, status: int, seconds: float) -> None:
+        with self.lock:
+            if route in self.latency:
+                self.latency[route].observe(seconds)
+            self.responses[route, status] = self.responses.get((route, status), 0) + 1
+
+    def render(self, workers: int) -> str:
+        """Return the metrics in the Prometheus text format."""
+        with self.lock:
+            lines = [
+                "# HELP markdown_parser_request_duration_seconds Time to answer a request.",
+                "# TYPE markdown_parser_request_duration_seconds histogram",
+            ]
+            for route, histogram in self.latency.items():
+                lines += histogram.lines("markdown_parser_request_duration_seconds",
+                                         f'route="{route}"')
+            lines += [
+                "# HELP markdown_parser_queue_wait_seconds Time a render waited for a worker.",
+                "# TYPE markdown_parser_queue_wait_seconds histogram",
+            ]
+            lines += self.queue_wait.lines("markdown_parser_queue_wait_seconds")
+            lines += [
+                "# HELP markdown_parser_requests_total Requests answered.",
+                "# TYPE markdown_parser_requests_total counter",
+            ]
+            for (route, status), count in sorted(self.responses.items()):
+                lines.append(f'markdown_parser_requests_total{{route="{route}",'
+                             f'status="{status}"}} {count}')
+            lines += [
+                "# HELP markdown_parser_queue_depth Renders waiting for a worker.",
+                "# TYPE markdown_parser_queue_depth gauge",
+                f"markdown_parser_queue_depth {self.waiting}",
+                "# HELP markdown_parser_workers_busy Workers rendering.",
+                "# TYPE markdown_parser_workers_busy gauge",
+                f"markdown_parser_workers_busy {self.busy}",
+                "# HELP markdown_parser_workers Worker processes.",
+                "# TYPE markdown_parser_workers gauge",
+                f"markdown_parser_workers {workers}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _context():
+    """Return the multiprocessing context of the workers.
+
+    Workers are forked from a fork server that has imported this module, so
+    each starts with the package loaded, and a pool started again while
+    handler threads run is not forked from a threaded process. None, for
+    the default context, where there is no fork server.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _warm() -> None:
+    """Initialize a worker process: leave Ctrl-C to the server, run every parser once."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    export_html(parse(_WARM_UP))
+    export_json(parse(_WARM_UP, False, True))
+
+
+def _ready() -> int:
+    """Return the process id of the worker, once it is warmed."""
+    return os.getpid()
+
+
+def _render_html(data: bytes, include_extensions: bool, title: str,
+                 limits: Optional[ParseLimits]) -> Tuple[int, bytes]:
+    """Render a request body to HTML, in a worker; return the status and body."""
+    try:
+        document = parse(data.decode("utf-8"), False, limits=limits)
+    except UnicodeDecodeError:
+        return 400, b"Body is not valid UTF-8\n"
+    except ParseLimitError as e:
+        return 422, f"{e}\n".encode("utf-8")
+    return 200, export_html_bytes(document, include_extensions, title)
+
+
+def _render_json(data: bytes, track_spans: bool, exclude_defaults: bool,
+                 limits: Optional[ParseLimits]) -> Tuple[int, bytes]:
+    """Render a request body to JSON, in a worker; return the status and body."""
+    try:
+        document = parse(data.decode("utf-8"), False, track_spans, limits=limits)
+    except UnicodeDecodeError:
+        return 400, b"Body is not valid UTF-8\n"
+    except ParseLimitError as e:
+        return 422, f"{e}\n".encode("utf-8")
+    return 200, export_json(document, exclude_defaults).encode("utf-8")
+
+
+def _etag(route: str, options: Tuple[Any, ...], data: bytes) -> str:
+    """Return the strong ETag of the response to a request."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{__version__}\0{route}\0{options!r}\0".encode("utf-8"))
+    digest.update(data)
+    return f'"{digest.hexdigest()}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Return whether an If-None-Match header matches an ETag, weakly as RFC 9110 says."""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _flag(query: Dict[str, List[str]], name: str, default: bool) -> bool:
+    """Return a boolean query parameter.
+
+    Raises:
+        ValueError: If the value is not one of _TRUE or _FALSE
+    """
+    if name not in query:
+        return default
+    value = query[name][-1].lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"Invalid value of {name}: {value!r}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers one connection, keeping it alive between requests."""
+
+    server: "RenderServer"
+    protocol_version = "HTTP/1.1"
+
+    def version_string(self) -> str:
+        return f"markdown_parser/{__version__}"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        self._handle(self._get)
+
+    def do_POST(self) -> None:
+        self._handle(self._post)
+
+    def _handle(self, method: Callable[[str], Any]) -> None:
+        """Answer the request with method, timed from now."""
+        self._start = time.perf_counter()
+        self._route = _ROUTES.get(urlsplit(self.path).path, "other")
+        method(self._route)
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "text/plain; charset=utf-8",
+              etag: Optional[str] = None, headers: Tuple[Tuple[str, str], ...] = ()) -> int:
+        """Send a response and return its status.
+
+        The response is counted before it is written, so that a client
+        reading the metrics after it sees it counted.
+        """
+        self.server._metrics.observe(self._route, status, time.perf_counter() - self._start)
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        for name, value in headers:
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+        return status
+
+    def _error(self, status: int, message: str, **kwargs: Any) -> int:
+        return self._send(status, f"{message}\n".encode("utf-8"), **kwargs)
+
+    def _get(self, route: str) -> int:
+        if route == "metrics":
+            body = self.server._metrics.render(self.server.workers).encode("utf-8")
+            return self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+        if route in _RENDER_ROUTES:
+            return self._error(405, "Method not allowed", headers=(("Allow", "POST"),))
+        return self._error(404, "Not found")
+
+    def _post(self, route: str) -> int:
+        if route not in _RENDER_ROUTES:
+            # The body is left unread, so the connection can not be reused
+            self.close_connection = True
+            if route == "metrics":
+                return self._error(405, "Method not allowed", headers=(("Allow", "GET"),))
+            return self._error(404, "Not found")
+
+        data = self._read_body()
+        if isinstance(data, int):
+            return data
+        try:
+            query = parse_qs(urlsplit(self.path).query)
+            if route == "html":
+                options = (_flag(query, "extensions", True),
+                           query.get("title", ["Document"])[-1])
+            else:
+                options = (_flag(query, "spans", False),
+                           _flag(query, "exclude_defaults", False))
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        etag = _etag(route, options, data)
+        if _etag_matches(self.headers.get("If-None-Match", ""), etag):
+            return self._send(304, etag=etag)
+
+        function = _render_html if route == "html" else _render_json
+        try:
+            status, body = self.server.render(function, data, *options)
+        except BrokenProcessPool:
+            return self._error(503, "Worker failed, try again")
+        except Exception as e:
+            return self._error(500, f"Rendering failed: {type(e).__name__}")
+        if status != 200:
+            return self._send(status, body)
+        content_type = ("text/html; charset=utf-8" if route == "html"
+                        else "application/json")
+        return self._send(200, body, content_type, etag)
+
+    def _read_body(self):
+        """Return the request body, or the status of the error sent instead."""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            self.close_connection = True
+            return self._error(411, "Content-Length required, chunked bodies are not supported")
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            return self._error(411, "Content-Length required")
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            return self._error(400, "Invalid Content-Length")
+        if length > self.server.max_bytes:
+            # The body is left unread, so the connection can not be reused
+            self.close_connection = True
+            return self._error(413, f"Body exceeds the limit of {self.server.max_bytes} bytes")
+        return self.rfile.read(length)
+
+
+class RenderServer(ThreadingHTTPServer):
+    """HTTP server rendering markdown in a pool of warmed worker processes.
+
+    The workers are started and warmed by the constructor; see the module
+    docstring for the routes. Use serve_forever() to serve, and shutdown()
+    from another thread then server_close() to stop, which also stops the
+    workers.
+
+    Args:
+        address: (host, port) to listen on; port 0 picks a free port, see
+            server_address
+        workers: Worker processes, os.cpu_count() by default
+        max_bytes: Largest request body accepted
+        timeout: Most seconds a render may take, enforced by ParseLimits;
+            None for no limit
+        access_log: Log each request to stderr
+        max_depth: Deepest list nesting and quote level of a document,
+            enforced by ParseLimits; None for no limit
+    """
+
+    daemon_threads = True
+    # Connections the system queues before they are accepted, for load tests
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", DEFAULT_PORT),
+                 workers: Optional[int] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 timeout: Optional[float] = None, access_log: bool = False,
+                 max_depth: Optional[int] = DEFAULT_MAX_DEPTH):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.limits = (ParseLimits(max_depth=max_depth, timeout=timeout)
+                       if max_depth is not None or timeout is not None else None)
+        self.access_log = access_log
+        self._metrics = _Metrics()
+        # At most one render submitted per worker, so that waiting is counted here
+        self._slots = threading.BoundedSemaphore(workers)
+        self._pool_lock = threading.Lock()
+        super().__init__(address, _Handler)
+        try:
+            self._executor = self._start_pool()
+        except BaseException:
+            super().server_close()
+            raise
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Start the worker processes and wait until every one is warmed."""
+        executor = ProcessPoolExecutor(self.workers, _context(), initializer=_warm)
+        try:
+            # One task per worker, submitted together, starts them all
+            for future in [executor.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+        return executor
+
+    def render(self, function: Callable[..., Tuple[int, bytes]], data: bytes,
+               *options: Any) -> Tuple[int, bytes]:
+        """Run function(data, *options, limits) on a worker once one is free.
+
+        Raises:
+            BrokenProcessPool: If a worker died; the pool is started again
+            Exception: What function raised, such as RecursionError
+        """
+        metrics = self._metrics
+        queued = time.perf_counter()
+        with metrics.lock:
+            metrics.waiting += 1
+        self._slots.acquire()
+        with metrics.lock:
+            metrics.waiting -= 1
+            metrics.busy += 1
+            metrics.queue_wait.observe(time.perf_counter() - queued)
+        try:
+            executor = self._executor
+            try:
+                return executor.submit(function, data, *options, self.limits).result()
+            except BrokenProcessPool:
+                self._restart_pool(executor)
+                raise
+        finally:
+            with metrics.lock:
+                metrics.busy -= 1
+            self._slots.release()
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a broken pool, once for all the requests that found it broken."""
+        with self._pool_lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._start_pool()
+
+    def stats(self) -> ServerStats:
+        """Return a snapshot of the counters."""
+        metrics = self._metrics
+        with metrics.lock:
+            responses = metrics.responses
+            return ServerStats(
+                workers=self.workers, busy=metrics.busy, queue_depth=metrics.waiting,
+                requests=sum(responses.values()),
+                not_modified=sum(count for (_, status), count in responses.items()
+                                 if status == 304),
+                errors=sum(count for (_, status), count in responses.items()
+                           if status >= 400))
+
+    def server_close(self) -> None:
+        """Close the socket and stop the workers."""
+        super().server_close()
+        self._executor.shutdown(cancel_futures=True)
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: Optional[int] = None,
+          max_bytes: int = DEFAULT_MAX_BYTES, timeout: Optional[float] = None,
+          access_log: bool = False, max_depth: Optional[int] = DEFAULT_MAX_DEPTH) -> None:
+    """Serve until interrupted with Ctrl-C; see RenderServer for the arguments."""
+    server = RenderServer((host, port), workers, max_bytes, timeout, access_log, max_depth)
+    try:
+        host, port = server.server_address[:2]
+        print(f"Serving markdown on http://{host}:{port} with {server.workers} workers "
+              f"(POST /html, POST /json, GET /metrics)", file=sys.stderr, flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,79 @@
+"""Streaming block parser.
+
+Parses markdown from an iterable of lines and yields each block as soon as it
+is complete, holding only the unfinished block plus a bounded read-ahead window
+in memory.
+"""
+
+from typing import IO, Iterable, Iterator, List
+from . import models, nodes as fast_nodes
+from .models import BlockElement
+from .parser import _iter_blocks
+
+# Lines read ahead per refill
+DEFAULT_WINDOW = 256
+
+
+def parse_stream(lines: Iterable[str], validate: bool = True,
+                 window: int = DEFAULT_WINDOW) -> Iterator[BlockElement]:
+    """Parse markdown lines into blocks, yielding each block when it is complete.
+
+    A trailing newline on each line is removed. When the last line ends with a
+    newline an empty line follows it, as with str.split('\\n'), so the blocks are
+    the same as parse('\\n'.join(...)) of the same text.
+
+    Args:
+        lines: Iterable of lines, such as an open text file
+        validate: Build validated Pydantic models, see parse()
+        window: Number of lines to read ahead per refill
+
+    Yields:
+        The block elements of the document in order
+    """
+    nodes = models if validate else fast_nodes
+    source = iter(lines)
+    buffer: List[str] = []
+    offset = 0  # Source position of buffer[0]
+    exhausted = False
+    ends_with_newline = False
+
+    while not exhausted or buffer:
+        # Read ahead, growing with the buffer so a long block is re-scanned
+        # only a logarithmic number of times
+        target = len(buffer) + max(window, len(buffer))
+        while not exhausted and len(buffer) < target:
+            line = next(source, None)
+            if line is None:
+                exhausted = True
+                if ends_with_newline:
+                    buffer.append('')
+            else:
+                ends_with_newline = line.endswith('\n')
+                buffer.append(line[:-1] if ends_with_newline else line)
+
+        consumed = 0
+        for block, _, consumed in _iter_blocks(buffer, nodes, offset, at_end=exhausted):
+            if block:
+                yield block
+
+        for line in buffer[:consumed]:
+            offset += len(line) + 1
+        del buffer[:consumed]
+
+        if exhausted:
+            break
+
+
+def parse_file_stream(fp: IO[str], validate: bool = True,
+                      window: int = DEFAULT_WINDOW) -> Iterator[BlockElement]:
+    """Parse an open text file into blocks, yielding each block when it is complete.
+
+    Args:
+        fp: File object opened in text mode
+        validate: Build validated Pydantic models, see parse()
+        window: Number of lines to read ahead per refill
+
+    Yields:
+        The block elements of the document in order
+    """
+    return parse_stream(fp, validate=validate, window=window)
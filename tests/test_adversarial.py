@@ -0,0 +1,143 @@
+"""Tests that parsing stays linear on adversarial input.
+
+Each input repeats what makes one pattern of regex_patterns fail late, or
+try again at every position: an opener with no closer, a run of whitespace,
+a tag that is never closed. The scanners written out in place of a pattern
+get the input that pattern failed on, and nested lists one level more per
+line. Parsing each input at two sizes must take time growing with the size,
+not with its square.
+"""
+
+import sys
+import time
+
+from markdown_parser import parse, regex_patterns
+from markdown_parser.elements.link import parse_image, parse_link
+
+SMALL = 4000
+LARGE = 8 * SMALL
+# Allowed growth of the parse time from SMALL to LARGE: linear is 8, quadratic 64
+MAX_GROWTH = 14
+# Allowed absolute slack, for inputs that parse too fast to time reliably
+SLACK = 0.002
+
+
+def _repeat(unit: str, size: int, head: str = "", tail: str = "") -> str:
+    return head + unit * max(1, (size - len(head) - len(tail)) // len(unit)) + tail
+
+
+def _nested(marker: str, indent: str, size: int) -> str:
+    """List items each indented one more level, size characters in total."""
+    items = []
+    total = depth = 0
+    while total < size:
+        item = indent * depth + marker + " a\n"
+        items.append(item)
+        total += len(item)
+        depth += 1
+    return "".join(items)
+
+
+# Adversarial input of each pattern, by its name in regex_patterns, as
+# (parsing function, generator of an input of about the given size)
+CORPUS = {
+    "IMAGE_FULL_PATTERN": (parse_image, lambda n: _repeat("![", n)),
+    "BOLD_PATTERN": (parse, lambda n: _repeat("**a_", n)),
+    "ITALIC_ASTERISK_PATTERN": (parse, lambda n: _repeat("*a**", n)),
+    "ITALIC_UNDERSCORE_PATTERN": (parse, lambda n: _repeat("_a__", n)),
+    "INLINE_CODE_PATTERN": (parse, lambda n: _repeat("`", n, "", "a")),
+    "ITALIC_ASTERISK_START_PATTERN": (parse, lambda n: _repeat("`c`*", n)),
+    "ITALIC_UNDERSCORE_START_PATTERN": (parse, lambda n: _repeat("`c`_", n)),
+    "INLINE_TRIGGER_PATTERN": (parse, lambda n: _repeat("!", n)),
+    "IMAGE_SIZE_ATTR_PATTERN": (parse, lambda n: _repeat("size= ", n, "![a](b){", "}")),
+    "IMAGE_CSS_ATTR_PATTERN": (parse, lambda n: _repeat('css="', n, "![a](b){", "}")),
+    "HEADING_PATTERN": (parse, lambda n: _repeat("# ", n, "# ")),
+    "CODE_FENCE_START_PATTERN": (parse, lambda n: _repeat("```a\n", n)),
+    "CODE_FENCE_END_PATTERN": (parse, lambda n: _repeat("``` x\n", n, "```\n")),
+    "CODE_INDENT_PATTERN": (parse, lambda n: _repeat("    a\n", n)),
+    "CODE_INDENT_CAPTURE_PATTERN": (parse, lambda n: _repeat("\ta\n", n)),
+    "UNORDERED_LIST_SIMPLE_PATTERN": (parse, lambda n: _repeat("- a\n", n)),
+    "ORDERED_LIST_SIMPLE_PATTERN": (parse, lambda n: _repeat("1) a\n", n)),
+    "QUOTE_PREFIX_PATTERN": (parse, lambda n: _repeat(">", n, "", " a\n")),
+    "TABLE_SEPARATOR_PATTERN": (parse, lambda n: _repeat("|a|\n", n)),
+    "ALIGN_TAG_PATTERN": (parse, lambda n: _repeat("<Align left>\n", n)),
+    "ALIGN_CLOSE_PATTERN": (parse, lambda n: _repeat("<Align left>\na\n", n, "", "</Align>\n")),
+    "CUSTOM_TAG_PATTERN": (parse, lambda n: _repeat("<Left\n", n)),
+    "LINE_CLASS_PATTERN": (parse, lambda n: _repeat(" ", n, "", "-")),
+}
+
+# Adversarial input of the parsing written out instead of a pattern
+SCANNERS = {
+    "image": (parse, lambda n: _repeat("![a](", n)),
+    "link": (parse, lambda n: _repeat("[a](", n)),
+    "parse_link": (parse_link, lambda n: _repeat(" ", n, "[a](b", "x)")),
+    "heading trailing hashes": (parse, lambda n: _repeat(" ", n, "# a", "#x")),
+    "nested unordered list": (parse, lambda n: _nested("-", "  ", n)),
+    "nested ordered list": (parse, lambda n: _nested("1.", "   ", n)),
+}
+
+
+def _best_time(function, text: str, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class TestAdversarialInput:
+    """Test the parse time of adversarial input."""
+
+    def test_corpus_covers_patterns(self):
+        """Test that the corpus has an input for every pattern."""
+        patterns = {name for name in vars(regex_patterns) if name.endswith("_PATTERN")}
+        assert patterns == set(CORPUS)
+
+    def test_linear_growth(self):
+        """Test that parse time grows linearly with each adversarial input."""
+        too_slow = []
+        for name, (function, generate) in [*CORPUS.items(), *SCANNERS.items()]:
+            small = _best_time(function, generate(SMALL))
+            large = _best_time(function, generate(LARGE))
+            if large > small * MAX_GROWTH + SLACK:
+                too_slow.append(f"{name}: {small * 1000:.2f} ms -> {large * 1000:.2f} ms")
+        assert not too_slow, too_slow
+
+    def test_deep_nesting(self):
+        """Test that a list nested deeper than the recursion limit parses."""
+        depth = sys.getrecursionlimit()
+        document = parse("".join("  " * level + "- a\n" for level in range(depth)))
+        levels = 0
+        element = document.blocks[0]
+        while element is not None:
+            levels += 1
+            element = next((child for child in element.items[0].content
+                            if type(child).__name__ == "ListElement"), None)
+        assert levels == depth
+
+    def test_results_unchanged(self):
+        """Test what adversarial inputs parse to, against the patterns they replace."""
+        assert parse_link('[a](b  "t")').title == "t"
+        assert parse_link('[a](b  "t")').url == "b"
+        assert parse_link('[a](u "t ")x")').url == 'u "t'
+        assert parse_link('[a](b "t") x') is None
+
+        document = parse('[a](b "t" ")  [c](d "e")')
+        assert [(link.url, link.title) for link in document.blocks[0].content
+                if type(link).__name__ == "Link"] == [('b "t" "', None), ("d", "e")]
+
+        document = parse("*a** *b*")
+        assert [(type(element).__name__, element.content)
+                for element in document.blocks[0].content] == \
+            [("Italic", "a** "), ("Text", "b*")]
+
+        document = parse("# Title   ##")
+        assert document.blocks[0].content[0].content == "Title"
+
+        document = parse("<Align left>\na\n<Align right>\nb\n</Align>")
+        assert [type(element).__name__ for element in document.blocks] == ["Align"]
+
+        document = parse("<Align left>\na\n</Align>\n<Align right>\nb")
+        assert [type(element).__name__ for element in document.blocks] == \
+            ["Align", "Paragraph"]
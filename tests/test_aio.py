@@ -0,0 +1,229 @@
+"""Tests for the asyncio API."""
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+import pytest
+from markdown_parser import (parse, export_html, AsyncParser, parse_async,
+                             export_html_async)
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+class _GatedExecutor(ThreadPoolExecutor):
+    """Thread pool whose work waits for a gate, and counts what it runs."""
+
+    def __init__(self):
+        super().__init__(max_workers=8)
+        self.gate = threading.Event()
+        self.submitted = 0
+        self.active = 0
+        self.most_active = 0
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args, **kwargs):
+        with self._lock:
+            self.submitted += 1
+        return super().submit(self._gated, function, *args, **kwargs)
+
+    def _gated(self, function, *args, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+        try:
+            self.gate.wait(10)
+            return function(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class TestAsyncResults:
+    """Test that async results equal the synchronous ones."""
+
+    def test_parse(self):
+        """Test parse_async against parse on the test files."""
+        async def main():
+            for path in sorted(TEST_FILES_DIR.glob("*.md")):
+                markdown = path.read_text(encoding="utf-8")
+                assert await parse_async(markdown) == parse(markdown)
+                assert await parse_async(markdown, False, True) == parse(markdown, False, True)
+
+        asyncio.run(main())
+
+    def test_export_html(self):
+        """Test export_html_async against export_html."""
+        markdown = (TEST_FILES_DIR / "extended_syntax.md").read_text(encoding="utf-8")
+
+        async def main():
+            return await export_html_async(markdown, title="Async")
+
+        assert asyncio.run(main()) == export_html(parse(markdown), title="Async")
+
+    def test_process_pool(self):
+        """Test parsing and exporting in worker processes."""
+        markdown = "# Title\n\nSome **bold** and a [link](http://example.com)."
+
+        async def main(parser):
+            return await asyncio.gather(parser.parse(markdown, False),
+                                        parser.export_html(markdown))
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            document, html = asyncio.run(main(AsyncParser(executor)))
+        assert document == parse(markdown, False)
+        assert html == export_html(parse(markdown))
+
+    def test_errors(self):
+        """Test that an error of the computation reaches every request."""
+        async def main(parser):
+            return await asyncio.gather(parser.parse(None), parser.parse(None),
+                                        return_exceptions=True)
+
+        errors = asyncio.run(main(AsyncParser()))
+        assert all(isinstance(error, Exception) for error in errors)
+
+    def test_invalid_concurrency(self):
+        """Test that max_concurrency must be positive."""
+        with pytest.raises(ValueError):
+            AsyncParser(max_concurrency=0)
+
+
+class TestCoalescing:
+    """Test sharing one computation between identical requests."""
+
+    def test_identical_requests(self):
+        """Test that concurrent identical requests run one computation."""
+        executor = _GatedExecutor()
+        parser = AsyncParser(executor)
+
+        async def main():
+            requests = [asyncio.ensure_future(parser.export_html("# Same"))
+                        for _ in range(10)]
+            other = asyncio.ensure_future(parser.export_html("# Other"))
+            await asyncio.sleep(0.05)
+            executor.gate.set()
+            return await asyncio.gather(*requests), await other
+
+        with executor:
+            results, other = asyncio.run(main())
+        assert len(set(results)) == 1
+        assert other != results[0]
+        assert executor.submitted == 2
+        stats = parser.stats()
+        assert (stats.computations, stats.coalesced) == (2, 9)
+
+        # Finished computations are not joined
+        async def again():
+            return await parser.export_html("# Same")
+
+        parser.executor = None
+        assert asyncio.run(again()) == results[0]
+        assert parser.stats().computations == 3
+
+    def test_options_not_coalesced(self):
+        """Test that requests with other options compute their own result."""
+        executor = _GatedExecutor()
+        parser = AsyncParser(executor)
+
+        async def main():
+            requests = [parser.parse("# a"), parser.parse("# a", False),
+                        parser.parse("# a", True, True), parser.export_html("# a")]
+            requests = [asyncio.ensure_future(request) for request in requests]
+            await asyncio.sleep(0.05)
+            executor.gate.set()
+            return await asyncio.gather(*requests)
+
+        with executor:
+            asyncio.run(main())
+        assert parser.stats().computations == 4
+
+    def test_disabled(self):
+        """Test that coalesce=False computes every request."""
+        executor = _GatedExecutor()
+        parser = AsyncParser(executor, coalesce=False)
+
+        async def main():
+            requests = [asyncio.ensure_future(parser.parse("# a")) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            executor.gate.set()
+            return await asyncio.gather(*requests)
+
+        with executor:
+            documents = asyncio.run(main())
+        assert executor.submitted == 3
+        assert documents[0] == documents[1] and documents[0] is not documents[1]
+
+    def test_cancel_one_request(self):
+        """Test that cancelling a request leaves the computation to the others."""
+        executor = _GatedExecutor()
+        parser = AsyncParser(executor)
+
+        async def main():
+            first = asyncio.ensure_future(parser.parse("# a"))
+            second = asyncio.ensure_future(parser.parse("# a"))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            await asyncio.sleep(0)
+            executor.gate.set()
+            return first, await second
+
+        with executor:
+            first, document = asyncio.run(main())
+        assert first.cancelled()
+        assert document == parse("# a")
+        assert executor.submitted == 1
+
+
+class TestConcurrency:
+    """Test the concurrency limit."""
+
+    def test_limit(self):
+        """Test that at most max_concurrency computations are submitted."""
+        executor = _GatedExecutor()
+        parser = AsyncParser(executor, max_concurrency=2)
+
+        async def main():
+            requests = [asyncio.ensure_future(parser.parse(f"# {i}")) for i in range(6)]
+            await asyncio.sleep(0.05)
+            stats = parser.stats()
+            executor.gate.set()
+            documents = await asyncio.gather(*requests)
+            return stats, documents
+
+        with executor:
+            stats, documents = asyncio.run(main())
+        assert (stats.running, stats.waiting) == (2, 4)
+        assert executor.most_active == 2
+        assert documents == [parse(f"# {i}") for i in range(6)]
+        assert parser.stats().running == parser.stats().waiting == 0
+
+    def test_cancel_waiting(self):
+        """Test that a cancelled waiting request is never submitted."""
+        executor = _GatedExecutor()
+        parser = AsyncParser(executor, max_concurrency=1)
+
+        async def main():
+            running = asyncio.ensure_future(parser.parse("# a"))
+            waiting = asyncio.ensure_future(parser.parse("# b"))
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            await asyncio.sleep(0)
+            executor.gate.set()
+            await running
+
+        with executor:
+            asyncio.run(main())
+        assert executor.submitted == 1
+        assert parser.stats().waiting == 0
+
+    def test_several_loops(self):
+        """Test that one AsyncParser serves event loops in turn."""
+        parser = AsyncParser(max_concurrency=1)
+
+        async def main():
+            return await asyncio.gather(*(parser.parse(f"# {i}") for i in range(3)))
+
+        assert asyncio.run(main()) == asyncio.run(main())
+        assert parser.stats().computations == 6
@@ -0,0 +1,91 @@
+"""Tests for batch parsing across a process pool."""
+
+from pathlib import Path
+import pytest
+from markdown_parser import parse, parse_many, export_html, export_html_many
+from markdown_parser import Document, nodes
+from markdown_parser.batch import _largest_first, _map_largest_first
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _texts():
+    texts = [path.read_text(encoding="utf-8") for path in sorted(TEST_FILES_DIR.glob("*.md"))]
+    texts += ["# Title", "", "- a\n- b\n\n1. one\n2. two", "```\nunterminated"]
+    return texts
+
+
+class TestParseMany:
+    """Test that parse_many matches parse() for every text."""
+
+    def test_matches_parse(self):
+        """Test results in input order, in a pool and in this process."""
+        texts = _texts()
+        expected = [parse(text) for text in texts]
+
+        for workers in (1, 2):
+            documents = parse_many(texts, workers=workers)
+            assert documents == expected, workers
+            assert all(isinstance(document, Document) for document in documents)
+
+    def test_fast_nodes(self):
+        """Test validate=False returns lightweight documents."""
+        texts = _texts()
+        documents = parse_many(texts, workers=2, validate=False)
+
+        assert all(isinstance(document, nodes.Document) for document in documents)
+        assert [document.to_model() for document in documents] == [parse(text) for text in texts]
+
+    def test_chunksize(self):
+        """Test that any chunk size keeps the input order."""
+        texts = [f"# Heading {i}\n\n" + "text " * i for i in range(30)]
+        expected = [parse(text) for text in texts]
+
+        for chunksize in (1, 4, 100):
+            assert parse_many(texts, workers=2, chunksize=chunksize) == expected
+
+    def test_documents_keep_source(self):
+        """Test that documents support edits and lookups like parse() results."""
+        text = "# Title\n\nSome *text*.\n\n- item"
+        document = parse_many([text, "other"], workers=2, track_spans=True)[0]
+
+        assert document.node_path(15)[-1].content == "text"
+        document.apply_edit(2, 7, "Changed")
+        assert document == parse("# Changed\n\nSome *text*.\n\n- item", track_spans=True)
+
+    def test_empty_input(self):
+        """Test that no texts give no documents."""
+        assert parse_many([], workers=2) == []
+        assert parse_many(iter([]), workers=1) == []
+
+    def test_invalid_workers(self):
+        """Test that a worker count below 1 is rejected."""
+        with pytest.raises(ValueError):
+            parse_many(["a", "b"], workers=0)
+
+
+class TestExportHtmlMany:
+    """Test parallel HTML export."""
+
+    def test_matches_export_html(self):
+        """Test that each result equals export_html(parse(text))."""
+        texts = _texts()
+        for include_extensions in (True, False):
+            expected = [export_html(parse(text), include_extensions, "Batch") for text in texts]
+            assert export_html_many(texts, workers=2, include_extensions=include_extensions,
+                                    title="Batch") == expected
+
+
+class TestScheduling:
+    """Test the order texts are handed to the workers."""
+
+    def test_largest_first(self):
+        """Test that the longest texts are scheduled first."""
+        texts = ["a" * n for n in (3, 10, 1, 7)]
+        assert _largest_first(texts) == [1, 3, 0, 2]
+
+    def test_results_in_input_order(self):
+        """Test that results are put back in the order of texts."""
+        texts = ["a" * n for n in (3, 10, 1, 7)]
+        assert _map_largest_first(len, texts, workers=2, chunksize=1) == [3, 10, 1, 7]
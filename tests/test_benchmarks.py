@@ -0,0 +1,136 @@
+"""Tests for the benchmark suite."""
+
+import json
+import os
+import pytest
+from benchmarks import features
+from benchmarks.__main__ import main
+from benchmarks.runner import compare, parse_size, percentile, run_case, run_suite
+from benchmarks.workloads import PROFILES, generate
+from markdown_parser import parse, CodeBlock, Image, ListElement, Table
+
+
+class TestWorkloads:
+    """Test the generated inputs."""
+
+    def test_sizes(self):
+        """Test that texts are close to the size asked for."""
+        for profile in PROFILES:
+            assert len(generate(profile, 1024).encode("utf-8")) <= 1024
+            size = 64 * 1024
+            assert size * 0.98 < len(generate(profile, size).encode("utf-8")) <= size
+            assert generate(profile, 1) == generate(profile, 2)
+
+    def test_profiles(self):
+        """Test that each profile produces the elements it is named for."""
+        blocks = {profile: parse(generate(profile, 8 * 1024)).blocks for profile in PROFILES}
+
+        assert any(isinstance(block, Table) for block in blocks["tables"])
+        assert any(isinstance(block, CodeBlock) for block in blocks["code"])
+        nested = [item for block in blocks["nested_lists"] if isinstance(block, ListElement)
+                  for item in block.items if any(isinstance(c, ListElement) for c in item.content)]
+        assert nested
+        assert any(isinstance(element, Image) for block in blocks["links"]
+                   for element in block.content)
+
+
+class TestRunner:
+    """Test measuring cases and comparing results."""
+
+    def test_parse_size(self):
+        """Test size strings."""
+        assert parse_size("1KB") == 1024
+        assert parse_size("100mb") == 100 * 1024 * 1024
+        with pytest.raises(ValueError):
+            parse_size("1 GB")
+
+    def test_percentile(self):
+        """Test interpolated percentiles."""
+        assert percentile([3.0], 0.99) == 3.0
+        assert percentile([4.0, 1.0, 3.0, 2.0], 0.5) == 2.5
+        assert percentile(list(range(101)), 0.95) == 95
+
+    def test_run_case(self):
+        """Test the fields of a case result."""
+        case = run_case("prose", "2KB", "export_html", min_runs=3, max_runs=3)
+
+        assert case["runs"] == 3
+        assert case["bytes"] <= 2048
+        assert 0 < case["p50_ms"] <= case["p95_ms"] <= case["p99_ms"]
+        assert case["mb_per_s"] > 0
+        assert case["peak_memory_mb"] > 0
+        assert case["peak_rss_mb"] is None
+        assert run_case("code", "1KB", "parse", max_runs=1,
+                        measure_memory=False)["peak_memory_mb"] is None
+
+    def test_peak_rss(self):
+        """Test that the parse operations measure the RSS of a new process."""
+        for operation in ("parse", "parse_file"):
+            case = run_case("code", "4KB", operation, max_runs=1)
+            assert case["runs"] == 1
+            if hasattr(os, "wait4"):
+                assert case["peak_rss_mb"] > 1
+
+    def test_compare(self):
+        """Test that only increases over the tolerance are regressions."""
+        baseline = run_suite(["links"], ["1KB"], ["parse", "export_markdown"],
+                             min_runs=1, max_runs=1, measure_memory=False)
+        results = json.loads(json.dumps(baseline))
+        results["cases"][0]["p50_ms"] *= 1.05
+        results["cases"][1]["p50_ms"] *= 1.5
+
+        regressions = compare(results, baseline, tolerance=0.1)
+        assert [(r["operation"], r["metric"]) for r in regressions] == [
+            ("export_markdown", "p50_ms")]
+        assert regressions[0]["ratio"] == pytest.approx(1.5)
+        assert compare(results, baseline, tolerance=0.6) == []
+
+
+class TestMain:
+    """Test the command line runner."""
+
+    def test_output_and_baseline(self, tmp_path, capsys):
+        """Test writing results and failing on a regression."""
+        output = tmp_path / "results.json"
+        arguments = ["--profiles", "prose", "--sizes", "1KB", "--operations", "parse",
+                     "--max-runs", "2", "--no-memory"]
+
+        assert main(arguments + ["--output", str(output)]) == 0
+        results = json.loads(output.read_text())
+        assert [case["operation"] for case in results["cases"]] == ["parse"]
+
+        results["cases"][0]["p50_ms"] /= 1000
+        output.write_text(json.dumps(results))
+        assert main(arguments + ["--baseline", str(output)]) == 1
+        assert "REGRESSION prose 1KB parse p50_ms" in capsys.readouterr().out
+
+    def test_invalid_arguments(self):
+        """Test that unknown profiles and sizes are rejected."""
+        with pytest.raises(SystemExit):
+            main(["--profiles", "poetry"])
+        with pytest.raises(SystemExit):
+            main(["--sizes", "big"])
+
+
+class TestFeatures:
+    """Test the runner of python -m benchmarks.features."""
+
+    def test_failed_check(self, monkeypatch, capsys):
+        """Test that a failing check is reported and sets the exit status."""
+        def passing():
+            print("measured")
+
+        def failing():
+            assert 2 < 1
+
+        monkeypatch.setattr(features, "BENCHMARKS", {"passing": passing, "failing": failing})
+        assert features.main(["passing"]) == 0
+        assert features.main([]) == 1
+        out = capsys.readouterr().out
+        assert out.count("measured") == 2
+        assert "FAILED failing: assert 2 < 1" in out
+
+    def test_invalid_name(self):
+        """Test that unknown benchmarks are rejected."""
+        with pytest.raises(SystemExit):
+            features.main(["parse_everything"])
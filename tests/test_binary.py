@@ -0,0 +1,115 @@
+"""Tests for the binary document encoding."""
+
+import pickle
+import sys
+from pathlib import Path
+import pytest
+from markdown_parser import parse, binary, nodes
+from markdown_parser import Document, Heading
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _samples():
+    return [path.read_text(encoding="utf-8") for path in sorted(TEST_FILES_DIR.glob("*.md"))]
+
+
+class TestRoundTrip:
+    """Test that loads(dumps(document)) equals the document."""
+
+    def test_sample_documents(self):
+        """Test models and nodes, with and without spans."""
+        for text in _samples():
+            for validate in (True, False):
+                for track_spans in (False, True):
+                    document = parse(text, validate=validate, track_spans=track_spans)
+                    data = binary.dumps(document)
+                    assert binary.loads(data, validate) == document
+                    assert binary.loads(data, not validate) == parse(
+                        text, validate=not validate, track_spans=track_spans)
+
+    def test_loaded_types(self):
+        """Test that loads() builds models or lightweight nodes."""
+        data = binary.dumps(parse("# Title"))
+
+        document = binary.loads(data)
+        assert isinstance(document, Document)
+        assert isinstance(document.blocks[0], Heading)
+        assert isinstance(binary.loads(data, validate=False).blocks[0], nodes.Heading)
+
+        # Loaded models behave like validated ones
+        expected = parse("# Title")
+        for heading in (document.blocks[0], expected.blocks[0]):
+            heading.content[0].content = "Other"
+        assert document.model_copy(deep=True) == expected
+
+    def test_fields(self):
+        """Test optional fields, large numbers and metadata."""
+        text = ("![a](a.png){size=0.25, css=\"x\"} [l](u \"t\")\n\n"
+                "70000. big\n\n<Align right>r</Align>\n\n```\n```")
+        document = parse(text)
+        document.metadata = {"author": "我", "tags": [1, 2]}
+
+        assert binary.loads(binary.dumps(document)) == document
+        assert binary.loads(binary.dumps(parse(""))) == parse("")
+
+    def test_deep_nesting(self):
+        """Test lists nested deeper than the recursion limit."""
+        depth = sys.getrecursionlimit()
+        text = "".join("  " * level + f"- {level}\n" for level in range(depth))
+        for validate in (True, False):
+            data = binary.dumps(parse(text, validate=validate, track_spans=True))
+            loaded = binary.loads(data, validate)
+
+            # Walk the levels, as comparing the documents would recurse
+            level = 0
+            list_element = loaded.blocks[0]
+            while True:
+                item = list_element.items[0]
+                assert item.content[0].content == str(level)
+                assert item.span[0] == text.index(f"- {level}\n")
+                if len(item.content) == 1:
+                    break
+                list_element = item.content[1]
+                level += 1
+            assert level == depth - 1
+            assert binary.load_block(data, 0, validate).items[0].content[0].content == "0"
+
+    def test_compact(self):
+        """Test that repeated strings are stored once."""
+        document = parse("[link](http://example.com/a/long/url) " * 500)
+        data = binary.dumps(document)
+
+        assert data.count(b"http://example.com/a/long/url") == 1
+        assert len(data) < len(pickle.dumps(document)) / 5
+
+
+class TestLoadBlock:
+    """Test decoding single blocks."""
+
+    def test_every_block(self):
+        """Test that load_block() equals the block of the document."""
+        for text in _samples():
+            document = parse(text, track_spans=True)
+            data = binary.dumps(document)
+
+            assert binary.block_count(data) == len(document.blocks)
+            for index, block in enumerate(document.blocks):
+                assert binary.load_block(data, index) == block
+                assert binary.load_block(data, index, validate=False).to_model() == block
+            assert binary.load_block(data, -1) == document.blocks[-1]
+
+    def test_out_of_range(self):
+        """Test that a missing block raises IndexError."""
+        data = binary.dumps(parse("one\n\ntwo"))
+        with pytest.raises(IndexError):
+            binary.load_block(data, 2)
+
+    def test_bad_data(self):
+        """Test that other data and other versions are rejected."""
+        data = binary.dumps(parse("text"))
+        with pytest.raises(ValueError):
+            binary.loads(b"not a document")
+        with pytest.raises(ValueError):
+            binary.loads(data[:4] + bytes([binary.VERSION + 1]) + data[5:])
@@ -0,0 +1,121 @@
+"""Tests for the parse and export cache."""
+
+from pathlib import Path
+import pytest
+from markdown_parser import parse, export_html, export_markdown, nodes
+from markdown_parser import Document, ParseCache, Text
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _sample():
+    return (TEST_FILES_DIR / "complex_document.md").read_text(encoding="utf-8")
+
+
+class TestParseCache:
+    """Test cached parsing."""
+
+    def test_hit_equals_parse(self):
+        """Test that hits and misses both equal parse()."""
+        cache = ParseCache()
+        text = _sample()
+
+        for validate in (True, False):
+            expected = parse(text, validate=validate)
+            assert cache.parse(text, validate=validate) == expected
+            assert cache.parse(text, validate=validate) == expected
+
+        # Models and nodes are kept apart, so model hits are not validated again
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries) == (2, 2, 2)
+        assert isinstance(cache.parse(text), Document)
+        assert isinstance(cache.parse(text, validate=False), nodes.Document)
+
+    def test_documents_are_copies(self):
+        """Test that mutating a returned document does not change the cache."""
+        cache = ParseCache()
+        text = "# Title\n\nSome *text*."
+
+        first = cache.parse(text)
+        first.blocks[0].content[0] = Text(content="Changed")
+        first.blocks.pop()
+        second = cache.parse(text)
+        second.apply_edit(2, 7, "Edited")
+
+        assert cache.parse(text) == parse(text)
+        assert second == parse("# Edited\n\nSome *text*.")
+
+    def test_options_in_key(self):
+        """Test that options changing the result are cached separately."""
+        cache = ParseCache()
+        text = "Some *text*."
+
+        assert cache.parse(text).blocks[0].content[1].span is None
+        assert cache.parse(text, track_spans=True).blocks[0].content[1].span == (5, 11)
+        assert cache.export_html(text, title="A") != cache.export_html(text, title="B")
+        assert cache.stats().misses == 4
+
+
+class TestExportCache:
+    """Test cached exports."""
+
+    def test_matches_export(self):
+        """Test that cached exports equal exporting parse() results."""
+        cache = ParseCache()
+        text = _sample()
+
+        for include_extensions in (True, False):
+            html = export_html(parse(text), include_extensions, "Doc")
+            markdown = export_markdown(parse(text), include_extensions)
+            for _ in range(2):
+                assert cache.export_html(text, include_extensions, "Doc") == html
+                assert cache.export_markdown(text, include_extensions) == markdown
+
+        assert cache.stats().hits == 4
+
+
+class TestEviction:
+    """Test the entry and byte limits."""
+
+    def test_least_recently_used_first(self):
+        """Test that the entry limit evicts the least recently used entry."""
+        cache = ParseCache(max_entries=2)
+        cache.export_markdown("a")
+        cache.export_markdown("b")
+        cache.export_markdown("a")
+        cache.export_markdown("c")
+
+        assert len(cache) == 2
+        assert cache.stats().evictions == 1
+        cache.export_markdown("a")
+        assert cache.stats().hits == 2
+        cache.export_markdown("b")
+        assert cache.stats().misses == 4
+
+    def test_byte_limit(self):
+        """Test that the byte limit is kept and large results are not cached."""
+        cache = ParseCache(max_bytes=4000)
+        for i in range(20):
+            cache.export_markdown(f"paragraph {i} " * 20)
+
+        stats = cache.stats()
+        assert 0 < stats.bytes <= 4000
+        assert stats.evictions == 20 - stats.entries
+
+        cache.export_markdown("x" * 5000)
+        assert cache.stats().entries == stats.entries
+
+    def test_clear(self):
+        """Test that clear() empties the cache and keeps the counters."""
+        cache = ParseCache()
+        cache.parse("text")
+        cache.clear()
+
+        stats = cache.stats()
+        assert (stats.entries, stats.bytes, stats.misses) == (0, 0, 1)
+
+    def test_invalid_limits(self):
+        """Test that limits below 1 are rejected."""
+        with pytest.raises(ValueError):
+            ParseCache(max_entries=0)
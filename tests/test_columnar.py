@@ -0,0 +1,132 @@
+"""Tests for columnar documents."""
+
+import sys
+from pathlib import Path
+from markdown_parser import parse, parse_columnar, AlignType, ElementType
+from markdown_parser import columnar as columnar_module
+from markdown_parser.columnar import TableView, TextView
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _samples():
+    return [path.read_text(encoding="utf-8") for path in sorted(TEST_FILES_DIR.glob("*.md"))]
+
+
+def _assert_same(view, node):
+    """Check that a view has the attributes and children of a node."""
+    assert view.span == node.span
+    for name in ("type", "raw_text", "url", "title", "size", "css", "level", "ordered",
+                 "start_number", "indent_level", "language", "filename", "code",
+                 "alignment", "alignments"):
+        if hasattr(node, name):
+            assert getattr(view, name) == getattr(node, name), name
+    for name in ("content", "items", "cells", "rows"):
+        value = getattr(node, name, None)
+        if isinstance(value, str):
+            assert view.content == value
+        elif value is not None:
+            views = getattr(view, name)
+            assert len(views) == len(value)
+            for child_view, child in zip(views, value):
+                assert child_view.parent.index == view.index or name == "rows"
+                _assert_same(child_view, child)
+    if hasattr(node, "header"):
+        _assert_same(view.header, node.header)
+
+
+class TestParseColumnar:
+    """Test parsing into columnar documents."""
+
+    def test_to_document(self):
+        """Test that to_document() gives the document of parse() with spans."""
+        for text in _samples():
+            columnar = parse_columnar(text)
+            for validate in (True, False):
+                assert columnar.to_document(validate) == parse(text, validate, track_spans=True)
+
+    def test_flush_between_blocks(self, monkeypatch):
+        """Test moving the collected rows into the arrays after each block."""
+        monkeypatch.setattr(columnar_module, "_FLUSH_ROWS", 1)
+        for text in _samples():
+            assert parse_columnar(text).to_document(False) == parse(text, False, track_spans=True)
+
+    def test_views(self):
+        """Test that views have the attributes of the nodes."""
+        for text in _samples():
+            columnar = parse_columnar(text)
+            document = parse(text, track_spans=True)
+            assert len(columnar.blocks) == len(document.blocks)
+            for view, block in zip(columnar.blocks, document.blocks):
+                assert view.parent is None
+                _assert_same(view, block)
+                assert view.to_node() == block
+
+    def test_text_slices(self):
+        """Test that text is sliced from the source unless it is not in it."""
+        columnar = parse_columnar("a **b**\nc\n\n```\nx\n```")
+        paragraph, code_block = columnar.blocks
+        text, bold, joined = paragraph.content
+
+        assert isinstance(text, TextView)
+        assert (bold.content, joined.content, code_block.code) == ("b", " c", "x")
+        assert columnar.strings == [" c"]
+        assert columnar.source[columnar.text_starts[bold.index]:
+                               columnar.text_ends[bold.index]] == "b"
+
+    def test_tree_links(self):
+        """Test the parent, first child and next sibling columns."""
+        columnar = parse_columnar("| a | b |\n|:---|---:|\n| 1 | 2 |\n\n<Align center>\nx\n</Align>")
+        table, align = columnar.blocks
+
+        assert isinstance(table, TableView)
+        assert table.alignments == ["left", "right"]
+        assert [cell.alignment for cell in table.rows[0].cells] == ["left", "right"]
+        assert columnar.next_siblings[table.index] == align.index
+        assert columnar.first_children[table.index] == table.header.index
+        assert table.rows[0].parent == table
+        assert align.alignment is AlignType.CENTER
+        assert align.content[0].type is ElementType.TEXT
+        assert len(columnar) == align.index + 2
+
+    def test_incremental_edit(self):
+        """Test that the built document can be edited like a parsed one."""
+        text = "# A\n\nb\n\n- c"
+        document = parse_columnar(text).to_document()
+        document.apply_edit(0, 3, "# Z")
+
+        assert document == parse("# Z\n\nb\n\n- c", track_spans=True)
+
+    def test_deep_nesting(self):
+        """Test lists nested deeper than the recursion limit."""
+        depth = sys.getrecursionlimit()
+        text = "".join("  " * level + f"- {level}\n" for level in range(depth))
+        columnar = parse_columnar(text)
+        document = columnar.to_document(validate=False)
+
+        # Walk the levels, as comparing the documents would recurse
+        level = 0
+        view = columnar.blocks[0]
+        list_element = document.blocks[0]
+        while True:
+            item_view = view.items[0]
+            item = list_element.items[0]
+            assert item_view.content[0].content == item.content[0].content == str(level)
+            assert item_view.span == item.span
+            assert item.span[0] == text.index(f"- {level}\n")
+            if len(item.content) == 1:
+                break
+            view = item_view.content[1]
+            list_element = item.content[1]
+            level += 1
+        assert level == depth - 1
+        assert len(columnar) == 3 * depth
+
+    def test_empty(self):
+        """Test an empty document."""
+        columnar = parse_columnar("")
+
+        assert len(columnar) == 0
+        assert columnar.blocks == []
+        assert columnar.to_document() == parse("")
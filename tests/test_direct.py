@@ -0,0 +1,49 @@
+"""Tests for direct markdown-to-HTML rendering."""
+
+from pathlib import Path
+from markdown_parser import parse, export_html, render_html
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _assert_same(text, **kwargs):
+    assert render_html(text, **kwargs) == export_html(parse(text), **kwargs)
+
+
+class TestRenderHtml:
+    """Test that render_html() matches export_html(parse())."""
+
+    def test_sample_documents(self):
+        """Test the sample documents with and without extensions."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            text = path.read_text(encoding="utf-8")
+            for include_extensions in (True, False):
+                _assert_same(text, include_extensions=include_extensions, title=path.name)
+
+    def test_nested_lists(self):
+        """Test ordered, unordered and nested lists."""
+        _assert_same("3. three\n4. four\n   - nested *a*\n   - nested `b`\n\n- x\n  1. y")
+
+    def test_tables(self):
+        """Test alignments, padded cells and a table without rows."""
+        _assert_same("| a | b | c |\n|:--|:-:|--:|\n| 1 |\n| **2** | 3 | 4 | 5 |")
+        _assert_same("| a | b |\n|---|---|")
+
+    def test_escaping(self):
+        """Test escaping in text, links, images, code and the title."""
+        _assert_same('a & <b> "c"\n\n[x&y](/?a=1&b=2 "t\'") ![<i>](i.png){size=0.5, css="x"}'
+                     '\n\n```py a&b.py\nif a < b:\n```', title="A & B")
+        _assert_same("```py a&b.py\nx\n```", include_extensions=False)
+
+    def test_align(self):
+        """Test align blocks, including empty ones without extensions."""
+        for include_extensions in (True, False):
+            _assert_same("<Align center>**a**</Align>\n\n<Align center>\nb\n</Align>\n\n"
+                         "<Align left></Align>\n\n<Align right>\n</Align>\n\ntext",
+                         include_extensions=include_extensions)
+
+    def test_empty(self):
+        """Test empty and blank input."""
+        _assert_same("")
+        _assert_same("\n\n  \n")
@@ -136,4 +136,23 @@ class TestTextParsing:
         elements = parse_inline_elements("*italic with **bold** inside*")
         assert len(elements) == 1
         assert isinstance(elements[0], Italic)
-        assert elements[0].content == "italic with **bold** inside" 
\ No newline at end of file
+        assert elements[0].content == "italic with **bold** inside"
+
+    def test_adjacent_elements(self):
+        """Test elements that start right where the previous one ended."""
+        # The italic after bold starts the remaining text, so its opening
+        # look-behind does not see the consumed '*'
+        elements = parse_inline_elements("**a***b*")
+        assert [type(e) for e in elements] == [Bold, Italic]
+        assert elements[1].content == "b"
+
+        elements = parse_inline_elements("`a``b`[c](d)")
+        assert [type(e) for e in elements] == [Code, Code, Link]
+
+    def test_unmatched_triggers(self):
+        """Test trigger characters that do not start any element."""
+        text = "a * b _ c ` d [ e ! f ![g] **"
+        elements = parse_inline_elements(text)
+        assert len(elements) == 1
+        assert isinstance(elements[0], Text)
+        assert elements[0].content == text
@@ -0,0 +1,109 @@
+"""Tests for streaming HTML export."""
+
+import io
+from pathlib import Path
+from markdown_parser import (parse, export_html, iter_export_html, export_html_to,
+                             export_html_bytes)
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+class _Sink:
+    """Text sink recording the size of every write."""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return len(text)
+
+
+class TestIterExportHtml:
+    """Test the HTML export generator."""
+
+    def test_sample_documents(self):
+        """Test that the pieces joined equal export_html()."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            document = parse(path.read_text(encoding="utf-8"))
+            for include_extensions in (True, False):
+                expected = export_html(document, include_extensions, "Doc")
+                pieces = iter_export_html(document, include_extensions, "Doc")
+                assert ''.join(pieces) == expected
+
+    def test_order(self):
+        """Test that the head comes first and the tail last."""
+        pieces = list(iter_export_html(parse("# Title"), title="A & B"))
+
+        assert pieces[0].startswith("<!DOCTYPE html>")
+        assert "<title>A &amp; B</title>" in pieces[0]
+        assert pieces[1] == "\n<h1>Title</h1>"
+        assert pieces[-1] == "\n</body>\n</html>"
+
+    def test_tables_and_lists_split(self):
+        """Test that tables are yielded per row and lists per item."""
+        rows = "\n".join(f"| {i} | x |" for i in range(5))
+        items = "\n".join(f"- item {i}" for i in range(5))
+        pieces = list(iter_export_html(parse(f"| a | b |\n|---|---|\n{rows}\n\n{items}")))
+
+        assert sum(piece.startswith("<tr>") for piece in pieces) == 5
+        assert sum(piece.startswith("<li>") for piece in pieces) == 5
+
+
+class TestExportHtmlTo:
+    """Test writing HTML to a file object."""
+
+    def test_string_io(self):
+        """Test that the written text equals export_html()."""
+        document = parse((TEST_FILES_DIR / "complex_document.md").read_text(encoding="utf-8"))
+        fp = io.StringIO()
+
+        written = export_html_to(document, fp, title="Doc")
+        assert fp.getvalue() == export_html(document, title="Doc")
+        assert written == len(fp.getvalue())
+
+    def test_file(self, tmp_path):
+        """Test writing to a file opened in text mode."""
+        document = parse("# Title\n\n中文 *text*")
+        path = tmp_path / "out.html"
+        with open(path, "w", encoding="utf-8") as fp:
+            export_html_to(document, fp)
+
+        assert path.read_text(encoding="utf-8") == export_html(document)
+
+    def test_bounded_writes(self):
+        """Test that writes are buffered up to buffer_size plus one piece."""
+        document = parse("\n\n".join(f"Paragraph {i} with *text*." for i in range(500)))
+        sink = _Sink()
+
+        export_html_to(document, sink, buffer_size=1000)
+        assert ''.join(sink.writes) == export_html(document)
+        assert len(sink.writes) > 10
+        largest_piece = max(len(piece) for piece in iter_export_html(document))
+        assert all(len(text) < 1000 + largest_piece for text in sink.writes)
+
+
+class TestExportHtmlBytes:
+    """Test exporting HTML as UTF-8 bytes."""
+
+    def test_sample_documents(self):
+        """Test that the bytes equal export_html() encoded."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            document = parse(path.read_text(encoding="utf-8"))
+            for include_extensions in (True, False):
+                expected = export_html(document, include_extensions, "Doc").encode("utf-8")
+                assert export_html_bytes(document, include_extensions, "Doc") == expected
+
+
+class TestEscaping:
+    """Test escaping special characters in HTML."""
+
+    def test_escaping(self):
+        """Test that special characters are escaped in text, URLs and titles."""
+        document = parse("中文 & <b> \"q\" 'a'\n\n[x&y](http://a.io/?a=1&b=2 \"t<\")")
+        html = export_html(document, title="A & B")
+
+        assert "<title>A &amp; B</title>" in html
+        assert "<p>中文 &amp; &lt;b&gt; &quot;q&quot; &#x27;a&#x27;</p>" in html
+        assert '<a href="http://a.io/?a=1&amp;b=2" title="t&lt;">x&amp;y</a>' in html
@@ -0,0 +1,167 @@
+"""Tests for incremental re-parsing of edited documents."""
+
+import random
+import sys
+from pathlib import Path
+import pytest
+from markdown_parser import parse, Document, Paragraph
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+# Fragments that open or close blocks across line boundaries
+EDIT_PIECES = [
+    "\n", "\n\n", "```", "```py\n", "| a | b |\n", "|---|---|\n", "- ", "1. ",
+    "> ", "<Align center>\n", "</Align>\n", "# ", "---\n", "    ", "*", "`",
+    "text ", "[l](u)",
+]
+
+
+def assert_same_as_parse(document, text, validate=True):
+    expected = parse(text, validate)
+    assert document == expected
+    assert document._lines == expected._lines
+    assert document._block_lines == expected._block_lines
+
+
+class TestSpans:
+    """Test source spans recorded on blocks."""
+    
+    def test_block_spans(self):
+        """Test that each block span covers its source lines."""
+        text = "# Title\n\nFirst line\nsecond line\n\n```\ncode\n```\n"
+        document = parse(text)
+        
+        assert [block.span for block in document.blocks] == [(0, 7), (9, 31), (33, 45)]
+        assert text[slice(*document.blocks[1].span)] == "First line\nsecond line"
+    
+    def test_spans_fast_nodes(self):
+        """Test that lightweight nodes carry the same spans."""
+        text = (TEST_FILES_DIR / "complex_document.md").read_text(encoding="utf-8")
+        assert parse(text, validate=False).to_model() == parse(text)
+
+
+class TestApplyEdit:
+    """Test Document.apply_edit against parsing the edited text."""
+    
+    def test_edit_inside_paragraph(self):
+        """Test that a local edit keeps the blocks after it."""
+        text = "# Title\n\nSome text\n\nMore text"
+        document = parse(text)
+        second = document.blocks[2]
+        
+        assert document.apply_edit(9, 13, "Other") == (0, 2, 2)
+        assert_same_as_parse(document, "# Title\n\nOther text\n\nMore text")
+        assert document.blocks[2] is second
+    
+    def test_open_fence_swallows_following_blocks(self):
+        """Test that opening a code fence re-parses up to the end of the document."""
+        text = "Intro\n\n# Heading\n\nParagraph\n\n- item"
+        document = parse(text)
+        
+        document.apply_edit(7, 7, "```\n")
+        assert_same_as_parse(document, "Intro\n\n```\n# Heading\n\nParagraph\n\n- item")
+        
+        document.apply_edit(7, 11, "")
+        assert_same_as_parse(document, text)
+    
+    def test_closing_earlier_align_tag(self):
+        """Test that a new </Align> closes an unclosed tag before the edit."""
+        text = "<Align center>\ncentered\n\nParagraph\n\nlast"
+        document = parse(text)
+        
+        document.apply_edit(len(text), len(text), "\n</Align>")
+        assert_same_as_parse(document, text + "\n</Align>")
+        assert len(document.blocks) == 1
+    
+    def test_table_rows(self):
+        """Test that editing a separator row turns paragraphs into a table."""
+        text = "| a | b |\n|--x|---|\n| 1 | 2 |\n\nafter"
+        document = parse(text)
+        assert isinstance(document.blocks[0], Paragraph)
+        
+        document.apply_edit(13, 14, "-")
+        assert_same_as_parse(document, text.replace("--x", "---"))
+    
+    def test_random_edits(self):
+        """Test sequences of random edits on the sample documents."""
+        rng = random.Random(0)
+        texts = [path.read_text(encoding="utf-8")
+                 for path in sorted(TEST_FILES_DIR.glob("*.md"))]
+        
+        for validate in (True, False):
+            for text in texts:
+                document = parse(text, validate)
+                for _ in range(30):
+                    start = rng.randint(0, len(text))
+                    end = min(len(text), start + rng.choice([0, 1, 5, 40]))
+                    new_text = "".join(rng.choice(EDIT_PIECES)
+                                       for _ in range(rng.randint(0, 3)))
+                    
+                    document.apply_edit(start, end, new_text)
+                    text = text[:start] + new_text + text[end:]
+                    assert_same_as_parse(document, text, validate)
+    
+    def test_edited_fast_nodes_to_model(self):
+        """Test that an edited lightweight document converts and stays editable."""
+        document = parse("one\n\ntwo", validate=False)
+        document.apply_edit(0, 3, "# one")
+        
+        model = document.to_model()
+        assert model == parse("# one\n\ntwo")
+        model.apply_edit(7, 10, "three")
+        assert_same_as_parse(model, "# one\n\nthree")
+    
+    def test_edits_between_reads(self):
+        """Test that blocks moved by several edits are moved when read."""
+        rng = random.Random(1)
+        text = (TEST_FILES_DIR / "complex_document.md").read_text(encoding="utf-8")
+        
+        for validate in (True, False):
+            document = parse(text, validate, track_spans=True)
+            edited = text
+            for _ in range(10):
+                start = rng.randint(0, len(edited))
+                new_text = rng.choice(EDIT_PIECES)
+                document.apply_edit(start, start, new_text)
+                edited = edited[:start] + new_text + edited[start:]
+        
+            assert document._span_shifts is not None
+            expected = parse(edited, validate, track_spans=True)
+            if validate:
+                # Serializing reads the blocks through __dict__
+                assert document.model_dump_json() == expected.model_dump_json()
+            assert document == expected
+            assert document._block_lines == expected._block_lines
+            assert document._span_shifts is None
+    
+    def test_deep_nesting(self):
+        """Test moving a list nested deeper than the recursion limit."""
+        depth = sys.getrecursionlimit()
+        nested = "".join("  " * level + f"- {level}\n" for level in range(depth))
+        document = parse("a\n\n" + nested, validate=False, track_spans=True)
+        document.apply_edit(0, 1, "edited")
+        text = "edited\n\n" + nested
+        
+        # Walk the levels, as comparing the documents would recurse
+        level = 0
+        list_element = document.blocks[1]
+        while True:
+            item = list_element.items[0]
+            assert item.span[0] == text.index(f"- {level}\n")
+            assert item.content[0].span[0] == item.span[0] + 2
+            if len(item.content) == 1:
+                break
+            list_element = item.content[1]
+            level += 1
+        assert level == depth - 1
+    
+    def test_invalid_edits(self):
+        """Test errors for bad offsets and documents without a source."""
+        document = parse("text")
+        with pytest.raises(ValueError):
+            document.apply_edit(3, 2, "")
+        with pytest.raises(ValueError):
+            document.apply_edit(0, 5, "")
+        with pytest.raises(ValueError):
+            Document(blocks=[]).apply_edit(0, 0, "x")
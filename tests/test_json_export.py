@@ -0,0 +1,90 @@
+"""Tests for JSON export."""
+
+import json
+from pathlib import Path
+from markdown_parser import parse, export_json, iter_export_json
+from markdown_parser import Document, Heading, ListElement, Text
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _samples():
+    return [path.read_text(encoding="utf-8") for path in sorted(TEST_FILES_DIR.glob("*.md"))]
+
+
+class TestExportJson:
+    """Test the JSON text and reading it back."""
+
+    def test_round_trip(self):
+        """Test that model_validate_json() reads back the document."""
+        for text in _samples():
+            for track_spans in (False, True):
+                document = parse(text, track_spans=track_spans)
+                for exclude_defaults in (False, True):
+                    data = export_json(document, exclude_defaults)
+                    assert Document.model_validate_json(data) == document
+                    assert Document.model_validate(json.loads(data)) == document
+
+    def test_fast_nodes(self):
+        """Test that lightweight nodes give the same text as models."""
+        for text in _samples():
+            assert (export_json(parse(text, validate=False, track_spans=True))
+                    == export_json(parse(text, track_spans=True)))
+
+    def test_matches_pydantic(self):
+        """Test that the fields are those Pydantic serializes."""
+        for text in _samples():
+            document = parse(text, track_spans=True)
+            expected = document.model_dump_json(serialize_as_any=True)
+            assert json.loads(export_json(document)) == json.loads(expected)
+
+    def test_exclude_defaults(self):
+        """Test that defaults and nulls are left out."""
+        document = parse("- *a*\n\n> q")
+        data = json.loads(export_json(document, exclude_defaults=True))
+
+        assert data == {"blocks": [
+            {"type": "list", "span": [0, 5], "ordered": False, "items": [
+                {"content": [{"type": "italic", "content": "a"}]}]},
+            {"type": "quote", "span": [7, 10], "content": [{"type": "text", "content": "q"}]},
+        ]}
+
+    def test_escaping_and_metadata(self):
+        """Test strings that need escaping and metadata."""
+        document = parse('# "中文" \\\\ \t\n\n[a](u "t\\"")')
+        document.metadata = {"author": "我"}
+        data = export_json(document)
+
+        assert json.loads(data)["metadata"] == {"author": "我"}
+        assert "我" in data
+        assert Document.model_validate_json(data) == document
+
+
+class TestIterExportJson:
+    """Test the JSON export generator."""
+
+    def test_pieces(self):
+        """Test that there is one piece per block and they join to export_json()."""
+        document = parse("# A\n\nb\n\n---")
+        pieces = list(iter_export_json(document))
+
+        assert len(pieces) == len(document.blocks) + 2
+        assert ''.join(pieces) == export_json(document)
+        assert ''.join(iter_export_json(parse(""))) == export_json(parse(""))
+
+
+class TestModelValidate:
+    """Test building documents from dicts."""
+
+    def test_element_classes(self):
+        """Test that elements get the class their type names."""
+        document = Document.model_validate({"blocks": [
+            {"type": "heading", "level": 2, "content": [{"type": "text", "content": "T"}]},
+            {"type": "list", "ordered": True, "items": [
+                {"content": [{"type": "list", "ordered": False, "items": []}]}]},
+        ]})
+
+        assert isinstance(document.blocks[0], Heading)
+        assert isinstance(document.blocks[0].content[0], Text)
+        assert isinstance(document.blocks[1].items[0].content[0], ListElement)
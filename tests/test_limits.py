@@ -0,0 +1,128 @@
+"""Tests for parse limits."""
+
+import time
+import pytest
+from pathlib import Path
+from pydantic import ValidationError
+from markdown_parser import parse, ParseLimits, ParseLimitError
+from markdown_parser.incremental import apply_edit
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+class TestParseLimits:
+    """Test raising on exceeded limits."""
+
+    def test_within_limits(self):
+        """Test that a parse within its limits gives the same document."""
+        limits = ParseLimits(max_bytes=1 << 20, max_blocks=1000, max_inline_nodes=10000,
+                             max_depth=10, timeout=60)
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            markdown = path.read_text(encoding="utf-8")
+            assert parse(markdown, limits=limits) == parse(markdown)
+            assert parse(markdown, False, True, limits=limits) == parse(markdown, False, True)
+
+    def test_max_bytes(self):
+        """Test that the size is counted in UTF-8 bytes."""
+        assert parse("héllo", limits=ParseLimits(max_bytes=6)).blocks
+        with pytest.raises(ParseLimitError) as error:
+            parse("héllo", limits=ParseLimits(max_bytes=5))
+        assert (error.value.limit, error.value.value) == ("max_bytes", 5)
+
+    def test_max_blocks(self):
+        """Test the limit on top-level blocks."""
+        markdown = "# a\n\npara\n\n- item\n\n> quote"
+        assert len(parse(markdown, limits=ParseLimits(max_blocks=4)).blocks) == 4
+        with pytest.raises(ParseLimitError) as error:
+            parse(markdown, limits=ParseLimits(max_blocks=3))
+        assert error.value.limit == "max_blocks"
+
+    def test_max_inline_nodes(self):
+        """Test the limit on inline elements of all blocks."""
+        markdown = "a **b** c\n\n| *x* | y |\n|---|---|\n| 1 | 2 |"
+        assert parse(markdown, limits=ParseLimits(max_inline_nodes=7)).blocks
+        with pytest.raises(ParseLimitError) as error:
+            parse(markdown, limits=ParseLimits(max_inline_nodes=6))
+        assert error.value.limit == "max_inline_nodes"
+
+        # Checked within a long inline text too
+        with pytest.raises(ParseLimitError):
+            parse("*a* " * 100000, limits=ParseLimits(max_inline_nodes=1000))
+
+    def test_max_depth(self):
+        """Test the limit on list nesting and quote levels."""
+        markdown = "- a\n  - b\n    - c"
+        assert parse(markdown, limits=ParseLimits(max_depth=3)).blocks
+        with pytest.raises(ParseLimitError) as error:
+            parse(markdown, limits=ParseLimits(max_depth=2))
+        assert error.value.limit == "max_depth"
+
+        assert parse("> > a", limits=ParseLimits(max_depth=2)).blocks
+        with pytest.raises(ParseLimitError):
+            parse("> > > a", limits=ParseLimits(max_depth=2))
+
+        # Sibling lists do not add up
+        assert parse("- a\n  - b\n- c\n  - d", limits=ParseLimits(max_depth=2)).blocks
+
+    def test_timeout(self):
+        """Test the wall-clock limit, within a single paragraph too."""
+        with pytest.raises(ParseLimitError) as error:
+            parse("para *a* b\n\n" * 20000, limits=ParseLimits(timeout=0.001))
+        assert error.value.limit == "timeout"
+        with pytest.raises(ParseLimitError):
+            parse("word *a* " * 200000, limits=ParseLimits(timeout=0.001))
+
+    def test_timeout_before_blocks(self):
+        """Test that the timeout cuts the passes over all lines short."""
+        # A 2 MB table takes over a second to index
+        markdown = "| a | b |\n|---|---|\n" + "| 1 | 2 |\n" * 200000
+        start = time.perf_counter()
+        with pytest.raises(ParseLimitError) as error:
+            parse(markdown, limits=ParseLimits(timeout=0.05))
+        assert error.value.limit == "timeout"
+        assert time.perf_counter() - start < 0.5
+
+    def test_invalid_limits(self):
+        """Test that limits must be positive."""
+        with pytest.raises(ValidationError):
+            ParseLimits(max_blocks=0)
+        with pytest.raises(ValidationError):
+            ParseLimits(timeout=-1)
+
+
+class TestTruncate:
+    """Test truncating on exceeded limits."""
+
+    def test_truncated_blocks(self):
+        """Test that the blocks before the limit are kept and flagged."""
+        markdown = "# a\n\npara\n\n- item\n\n> quote"
+        document = parse(markdown, limits=ParseLimits(max_blocks=2, truncate=True))
+        assert document.blocks == parse("# a\n\npara").blocks
+        assert document.metadata == {"truncated": True, "truncated_by": "max_blocks"}
+
+        # A block cut short by a limit is dropped
+        document = parse("para\n\n- a\n  - b\n    - c",
+                         limits=ParseLimits(max_depth=2, truncate=True))
+        assert document.blocks == parse("para").blocks
+        assert document.metadata["truncated_by"] == "max_depth"
+
+    def test_truncated_input(self):
+        """Test that input over max_bytes is cut to whole lines."""
+        document = parse("line one\nline two\nline three",
+                         False, limits=ParseLimits(max_bytes=20, truncate=True))
+        assert document.to_model().blocks == parse("line one\nline two").blocks
+        assert document.metadata["truncated_by"] == "max_bytes"
+
+    def test_not_truncated(self):
+        """Test that a document within the limits is not flagged and can be edited."""
+        document = parse("para", limits=ParseLimits(max_blocks=1, truncate=True))
+        assert document.metadata == {}
+        apply_edit(document, 0, 4, "text")
+        assert document.blocks == parse("text").blocks
+
+    def test_truncated_not_editable(self):
+        """Test that a truncated document has no source to edit."""
+        document = parse("a\n\nb", limits=ParseLimits(max_blocks=1, truncate=True))
+        with pytest.raises(ValueError):
+            apply_edit(document, 0, 1, "c")
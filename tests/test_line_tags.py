@@ -0,0 +1,63 @@
+"""Tests for per-line block classification."""
+
+from markdown_parser import parse
+from markdown_parser.line_tags import (
+    LineTags, classify_line,
+    LINE_BLANK, LINE_FENCE, LINE_FENCE_LIKE, LINE_INDENTED, LINE_HEADING,
+    LINE_HR, LINE_LIST, LINE_ORDERED, LINE_QUOTE, LINE_CUSTOM_TAG, LINE_ALIGN,
+    LINE_PIPE, LINE_TABLE_RULE,
+)
+
+
+class TestLineTags:
+    """Test line classification."""
+    
+    def test_blank_lines(self):
+        """Test empty and whitespace-only lines."""
+        assert classify_line("")[0] == LINE_BLANK
+        assert classify_line("  \t ")[0] == LINE_BLANK
+    
+    def test_block_markers(self):
+        """Test the marker flag of each block type."""
+        assert classify_line("```python")[0] & LINE_FENCE
+        assert not classify_line("  ```")[0] & LINE_FENCE
+        assert classify_line("  ```")[0] & LINE_FENCE_LIKE
+        assert classify_line("    code")[0] & LINE_INDENTED
+        assert classify_line("## Title")[0] & LINE_HEADING
+        assert not classify_line("####### Title")[0] & LINE_HEADING
+        assert classify_line("- - -")[0] & LINE_HR
+        assert classify_line("<Align center>text")[0] & LINE_ALIGN
+        assert classify_line("<Center>text</Center>")[0] == LINE_CUSTOM_TAG
+    
+    def test_list_items(self):
+        """Test list markers and their indent."""
+        flags, indent, _ = classify_line("  - item")
+        assert flags & LINE_LIST and not flags & LINE_ORDERED
+        assert indent == 2
+        
+        flags, indent, _ = classify_line("12) item")
+        assert flags & LINE_LIST and flags & LINE_ORDERED
+        assert indent == 0
+        
+        assert not classify_line("-item")[0] & LINE_LIST
+    
+    def test_quote_depth(self):
+        """Test quote markers and nesting depth."""
+        flags, _, depth = classify_line("> > > deep")
+        assert flags & LINE_QUOTE
+        assert depth == 3
+    
+    def test_long_quote_marker_line(self):
+        """Test a quote depth too large for 16 bits."""
+        line = ">" * 70000 + " a"
+        tags = LineTags([line])
+        assert tags.quote_depths[0] == 70000
+        assert parse(line).blocks[0].content[0].content == "a"
+    
+    def test_pipes(self):
+        """Test pipe-bearing and separator candidate lines."""
+        tags = LineTags(["| a | b |", "|---|---|", "text"])
+        assert tags.flags[0] & LINE_PIPE and not tags.flags[0] & LINE_TABLE_RULE
+        assert tags.flags[1] & LINE_TABLE_RULE
+        assert tags.flags[2] == 0
+        assert len(tags) == 3
@@ -0,0 +1,83 @@
+"""Tests for parsing memory-mapped files."""
+
+import pytest
+from pathlib import Path
+from markdown_parser import parse, parse_file, CodeBlock
+from markdown_parser.mapped import MappedLines
+from markdown_parser.incremental import apply_edit
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+class TestMappedLines:
+    """Test the lazy line sequence."""
+
+    def test_lines(self, tmp_path):
+        """Test that lines are those of the decoded text split at newlines."""
+        text = "first\r\nsécond\n\n" + "".join(f"line {i}\n" for i in range(3000)) + "last"
+        path = tmp_path / "lines.md"
+        path.write_bytes(text.encode("utf-8"))
+        expected = text.replace("\r\n", "\n").split("\n")
+
+        with open(path, "rb") as fp:
+            lines = MappedLines(fp)
+        assert len(lines) == len(expected)
+        assert list(lines) == expected
+        assert [lines[i] for i in (0, 1, 2, 2500, 1023, 1024, -1)] == \
+            [expected[i] for i in (0, 1, 2, 2500, 1023, 1024, -1)]
+        assert lines[1020:1030] == expected[1020:1030]
+        assert lines.text(0, 3) == "first\nsécond\n"
+        with pytest.raises(IndexError):
+            lines[len(expected)]
+        lines.close()
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file has one empty line."""
+        path = tmp_path / "empty.md"
+        path.write_bytes(b"")
+        with open(path, "rb") as fp:
+            assert list(MappedLines(fp)) == [""]
+
+
+class TestParseFile:
+    """Test parse_file against parse."""
+
+    def test_test_files(self):
+        """Test that parse_file gives the document of parse."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            markdown = path.read_text(encoding="utf-8")
+            assert parse_file(str(path)) == parse(markdown)
+            assert (parse_file(str(path), False, True).to_model() ==
+                    parse(markdown, False, True).to_model())
+
+    def test_crlf(self, tmp_path):
+        """Test that \\r\\n line ends parse as in a text-mode file."""
+        markdown = "# Title\n\n```python\nx = 1  \n\ny = 2\n```\n\n- a\n  - b\n\n| a | b |\n|---|---|"
+        path = tmp_path / "crlf.md"
+        path.write_bytes(markdown.replace("\n", "\r\n").encode("utf-8"))
+
+        document = parse_file(str(path))
+        assert document == parse(markdown)
+        assert isinstance(document.blocks[1], CodeBlock)
+        assert document.blocks[1].code == "x = 1\n\ny = 2"
+
+    def test_lone_cr(self, tmp_path):
+        """Test that lone \\r line ends parse as in a text-mode file."""
+        path = tmp_path / "cr.md"
+        path.write_bytes(b"# a\rtext\r- x")
+        document = parse_file(str(path))
+        assert len(document.blocks) == 3
+        assert document == parse(path.read_text(encoding="utf-8"))
+
+        path.write_bytes(b"# a\r\ntext\r\n- x\r")
+        with open(path, "rb") as fp:
+            assert MappedLines(fp).has_lone_cr()
+        assert parse_file(str(path)) == parse(path.read_text(encoding="utf-8"))
+
+    def test_not_editable(self, tmp_path):
+        """Test that the document keeps no source lines."""
+        path = tmp_path / "doc.md"
+        path.write_text("para", encoding="utf-8")
+        with pytest.raises(ValueError):
+            apply_edit(parse_file(str(path)), 0, 1, "x")
@@ -0,0 +1,100 @@
+"""Tests for block memoization across parses."""
+
+from pathlib import Path
+import pytest
+from markdown_parser import parse, BlockMemo, Paragraph
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _assert_same(document, text, validate=True):
+    expected = parse(text, validate=validate)
+    assert document == expected
+    assert document._block_lines == expected._block_lines
+
+
+class TestBlockMemo:
+    """Test that parsing with a memo matches parse()."""
+
+    def test_sample_documents(self):
+        """Test every sample document parsed twice with one memo."""
+        memo = BlockMemo()
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            text = path.read_text(encoding="utf-8")
+            for validate in (True, False):
+                for _ in range(2):
+                    _assert_same(parse(text, validate, memo=memo), text, validate)
+
+    def test_reuses_unchanged_blocks(self):
+        """Test that only the edited block and the block before it are parsed again."""
+        text = "# Title\n\nFirst *paragraph*.\n\n- a\n- b\n\n| x | y |\n|---|---|\n| 1 | 2 |"
+        edited = text.replace("First", "Edited")
+        memo = BlockMemo()
+        parse(text, memo=memo)
+        before = memo.stats()
+
+        document = parse(edited, memo=memo)
+        stats = memo.stats()
+
+        # The heading is parsed again too, as its key includes the line after
+        # the blank line that follows it
+        _assert_same(document, edited)
+        assert stats.hits - before.hits == 2
+        assert stats.misses - before.misses == 2
+        assert stats.reuse_ratio == stats.hits / (stats.hits + stats.misses)
+
+    def test_spans_of_moved_blocks(self):
+        """Test that reused blocks get the span of their new position."""
+        memo = BlockMemo()
+        parse("# Title\n\ntext", memo=memo)
+        document = parse("Intro\n\n# Title\n\ntext", memo=memo)
+
+        assert memo.stats().hits == 2
+        assert [block.span for block in document.blocks] == [(0, 5), (7, 14), (16, 20)]
+
+    def test_lookahead_is_part_of_key(self):
+        """Test that a block is not reused when the line after it changed."""
+        memo = BlockMemo()
+        parse("a\n| x | y |\nb", memo=memo)
+        text = "a\n| x | y |\n|---|---|"
+
+        _assert_same(parse(text, memo=memo), text)
+        text = "a\n| x | y |"
+        _assert_same(parse(text, memo=memo), text)
+
+    def test_unclosed_align(self):
+        """Test that an <Align> tag is parsed again once a closing tag follows."""
+        memo = BlockMemo()
+        parse("<Align center>\n\ntext\n\nmore", memo=memo)
+        text = "<Align center>\n\ntext\n\nmore\n</Align>"
+
+        _assert_same(parse(text, memo=memo), text)
+
+    def test_reused_blocks_are_copies(self):
+        """Test that a reused block is a separate top-level object."""
+        memo = BlockMemo()
+        first = parse("text", memo=memo)
+        second = parse("text", memo=memo)
+
+        assert second.blocks[0] is not first.blocks[0]
+        second.blocks[0].span = (5, 9)
+        assert first.blocks[0].span == (0, 4)
+        assert isinstance(second.blocks[0], Paragraph)
+
+    def test_max_blocks(self):
+        """Test that the least recently used blocks are evicted."""
+        memo = BlockMemo(max_blocks=2)
+        parse("a\n\nb\n\nc", memo=memo)
+
+        assert len(memo) == 2
+        assert memo.stats().evictions == 1
+        parse("c", memo=memo)
+        assert memo.stats().hits == 1
+        parse("a", memo=memo)
+        assert memo.stats().hits == 1
+
+    def test_track_spans_rejected(self):
+        """Test that a memo can not be combined with track_spans."""
+        with pytest.raises(ValueError):
+            parse("text", track_spans=True, memo=BlockMemo())
@@ -0,0 +1,43 @@
+"""Tests for the validation-free node classes."""
+
+from pathlib import Path
+from markdown_parser import parse, Document, Image
+from markdown_parser import nodes
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+class TestFastNodes:
+    """Test parse(validate=False) and conversion to the Pydantic models."""
+    
+    def test_builds_lightweight_nodes(self):
+        """Test that the fast mode builds slotted node classes."""
+        doc = parse("# Title\n\nSome **bold** text", validate=False)
+        assert isinstance(doc, nodes.Document)
+        assert isinstance(doc.blocks[0], nodes.Heading)
+        assert isinstance(doc.blocks[1].content[1], nodes.Bold)
+        assert not hasattr(doc.blocks[1].content[1], "__dict__")
+    
+    def test_to_model_matches_validated_parse(self):
+        """Test that conversion gives the same document as a validated parse."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            markdown = path.read_text(encoding="utf-8")
+            
+            fast_doc = parse(markdown, validate=False)
+            model_doc = fast_doc.to_model()
+            
+            assert isinstance(model_doc, Document)
+            assert model_doc == parse(markdown), path.name
+    
+    def test_image_attributes(self):
+        """Test image alt and clamped size on the fast nodes."""
+        doc = parse('![alt](a.png){size=2, css="x"}', validate=False)
+        image = doc.blocks[0].content[0]
+        assert image.alt == "alt"
+        assert image.size == 1.0
+        
+        model = image.to_model()
+        assert isinstance(model, Image)
+        assert model.size == 1.0
+        assert model.css == "x"
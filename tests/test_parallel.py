@@ -0,0 +1,133 @@
+"""Tests for parallel parsing of a single document."""
+
+from pathlib import Path
+import pytest
+from markdown_parser import parse, nodes
+from markdown_parser.parallel import parse_parallel, split_points, _parse_chunks
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _cut_at(text, cut_lines):
+    """Return the (line, source position) of each line in cut_lines."""
+    lines = text.split('\n')
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    return lines, [(line, offsets[line]) for line in cut_lines]
+
+
+def _parse_cut(text, cut_lines, track_spans=False):
+    """Parse text cut at the given lines, safe or not."""
+    lines, cuts = _cut_at(text, cut_lines)
+    return _parse_chunks(text, lines, cuts, 2, track_spans)
+
+
+def _assert_same(document, text, track_spans=False):
+    expected = parse(text, validate=False, track_spans=track_spans)
+    assert document == expected
+    assert document._block_lines == expected._block_lines
+
+
+class TestSplitPoints:
+    """Test where a document is cut into chunks."""
+
+    def test_cuts_after_blank_lines(self):
+        """Test that cuts follow a blank line and keep chunks apart."""
+        text = "\n\n".join(f"Paragraph {i}" for i in range(10))
+        lines = text.split('\n')
+        cuts = split_points(lines, chunk_lines=4)
+
+        assert [line for line, _ in cuts] == [4, 8, 12, 16]
+        for line, offset in cuts:
+            assert lines[line - 1] == ""
+            assert text[offset:].startswith(lines[line])
+
+    def test_no_cut_in_fence_or_align(self):
+        """Test that fenced code and <Align> regions are not cut."""
+        text = "a\n\n```\nb\n\nc\n```\n\n<Align center>\nd\n\ne\n</Align>\n\nf"
+        cuts = split_points(text.split('\n'), chunk_lines=1)
+
+        assert [line for line, _ in cuts] == [2, 8, 14]
+
+    def test_no_cut_before_continuation(self):
+        """Test that lines continuing a list, quote or code are not cut before."""
+        text = "- a\n\n- b\n\n  c\n\n> d\n\n> e\n\n    f\n\n g\n\nh"
+        cuts = split_points(text.split('\n'), chunk_lines=1)
+
+        assert [line for line, _ in cuts] == [14]
+
+
+class TestParseParallel:
+    """Test that parse_parallel matches parse()."""
+
+    def test_sample_documents(self):
+        """Test every sample document with many small chunks."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            text = path.read_text(encoding="utf-8")
+            for validate in (True, False):
+                document = parse_parallel(text, workers=2, validate=validate, chunk_lines=3)
+                assert document == parse(text, validate=validate), path.name
+
+    def test_track_spans(self):
+        """Test node spans across chunks."""
+        text = (TEST_FILES_DIR / "complex_document.md").read_text(encoding="utf-8") * 3
+        document = parse_parallel(text, workers=2, validate=False, track_spans=True,
+                                  chunk_lines=20)
+        _assert_same(document, text, track_spans=True)
+
+    def test_document_keeps_source(self):
+        """Test that the result supports edits like a parse() result."""
+        text = "\n\n".join(f"Paragraph {i}" for i in range(20))
+        document = parse_parallel(text, workers=2, chunk_lines=5)
+
+        assert isinstance(document, type(parse(text)))
+        document.apply_edit(0, 9, "Changed")
+        assert document == parse("Changed" + text[9:])
+
+    def test_single_worker(self):
+        """Test that one worker parses in this process."""
+        text = "# Title\n\ntext"
+        assert parse_parallel(text, workers=1) == parse(text)
+        with pytest.raises(ValueError):
+            parse_parallel(text, workers=0)
+
+
+class TestUnsafeCuts:
+    """Test that seams are repaired where a cut splits a block."""
+
+    def test_every_line_cut(self):
+        """Test cutting before every line of the sample documents."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            text = path.read_text(encoding="utf-8")
+            cut_lines = range(1, len(text.split('\n')))
+            _assert_same(_parse_cut(text, cut_lines), text)
+            _assert_same(_parse_cut(text, cut_lines, track_spans=True), text, track_spans=True)
+
+    def test_ordered_list(self):
+        """Test an ordered list and its nested list split across chunks."""
+        text = "intro\n\n3. three\n4. four\n   - nested\n\n   - more\n5. five\n\nend"
+        document = _parse_cut(text, [3, 5, 6, 7])
+
+        _assert_same(document, text)
+        assert document.blocks[1].start_number == 3
+        assert len(document.blocks[1].items) == 3
+
+    def test_fence_over_chunks(self):
+        """Test a code fence that spans several chunks."""
+        text = "a\n\n```\n# not a heading\n\n- not a list\n```\n\nb"
+        _assert_same(_parse_cut(text, [3, 4, 5, 8]), text)
+
+    def test_align_closed_in_later_chunk(self):
+        """Test an <Align> tag whose closing tag is two chunks later."""
+        text = "a\n\n<Align center>\nx\n\ny\n\nz\n</Align>\n\nb"
+        document = _parse_cut(text, [3, 5, 7])
+
+        _assert_same(document, text)
+        assert isinstance(document.blocks[1], nodes.Align)
+
+    def test_table_over_chunks(self):
+        """Test a table split between its header and its rows."""
+        text = "| a | b |\n|---|---|\n| 1 | 2 |\n| 3 | 4 |\n\ntext"
+        _assert_same(_parse_cut(text, [1, 2, 3]), text)
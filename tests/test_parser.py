@@ -154,4 +154,28 @@ End of document."""
         assert isinstance(doc.blocks[4], CodeBlock)
         assert isinstance(doc.blocks[5], Quote)
         assert isinstance(doc.blocks[6], HorizontalRule)
-        assert isinstance(doc.blocks[7], Paragraph) 
\ No newline at end of file
+        assert isinstance(doc.blocks[7], Paragraph)
+    
+    def test_pipe_line_without_table(self):
+        """Test that a pipe line not followed by a separator stays in the paragraph."""
+        markdown = """Intro text
+a | b
+c-d | e"""
+        
+        doc = parse(markdown)
+        assert len(doc.blocks) == 1
+        assert isinstance(doc.blocks[0], Paragraph)
+        assert doc.blocks[0].content[0].content == "Intro text a | b c-d | e"
+    
+    def test_table_after_paragraph(self):
+        """Test that a table directly after a paragraph line ends the paragraph."""
+        markdown = """Intro text
+| a | b |
+|---|---|
+| 1 | 2 |"""
+        
+        doc = parse(markdown)
+        assert len(doc.blocks) == 2
+        assert isinstance(doc.blocks[0], Paragraph)
+        assert isinstance(doc.blocks[1], Table)
+        assert len(doc.blocks[1].rows) == 1
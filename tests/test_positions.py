@@ -0,0 +1,175 @@
+"""Tests for source spans and offset lookups."""
+
+from pathlib import Path
+import pytest
+from markdown_parser import parse, Document
+from markdown_parser import (
+    Bold, Heading, Link, ListElement, ListItem, Paragraph, Quote, Table,
+    TableCell, TableRow, Text,
+)
+from markdown_parser.positions import SourceMap, children
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def source_of(text, node):
+    return text[node.span[0]:node.span[1]]
+
+
+class TestSourceMap:
+    """Test mapping derived text back to the source."""
+    
+    def test_join(self):
+        """Test that joined pieces map to their source positions."""
+        text, source_map = SourceMap.join(' ', [("first", 2), ("second", 12)])
+        
+        assert text == "first second"
+        assert source_map.offset(0) == 2
+        assert source_map.offset(6) == 12
+        assert source_map.span(0, 12) == (2, 18)
+    
+    def test_sliced(self):
+        """Test the map of a suffix of the text."""
+        _, source_map = SourceMap.join('\n', [("  ab", 0), ("cd", 10)])
+        
+        sliced = source_map.sliced(2)
+        assert sliced.offset(0) == 2
+        assert sliced.offset(3) == 10
+
+
+class TestTrackSpans:
+    """Test spans recorded with parse(track_spans=True)."""
+    
+    def test_inline_spans(self):
+        """Test spans of inline elements in a heading and a paragraph."""
+        text = "#  Title **bold**\n\n  Some [link](http://x.io)\n  continued"
+        document = parse(text, track_spans=True)
+        heading, paragraph = document.blocks
+        
+        assert [source_of(text, node) for node in heading.content] == ["Title ", "**bold**"]
+        assert [source_of(text, node) for node in paragraph.content] == [
+            "Some ", "[link](http://x.io)", "\n  continued"
+        ]
+    
+    def test_list_spans(self):
+        """Test spans of list items and nested lists."""
+        text = "- one *a*\n- two\n  - nested\n- three"
+        document = parse(text, track_spans=True)
+        items = document.blocks[0].items
+        
+        assert [source_of(text, item) for item in items] == [
+            "- one *a*", "- two\n  - nested", "- three"
+        ]
+        assert source_of(text, items[0].content[1]) == "*a*"
+        nested = items[1].content[1]
+        assert isinstance(nested, ListElement)
+        assert source_of(text, nested) == "- nested"
+        assert source_of(text, nested.items[0].content[0]) == "nested"
+    
+    def test_table_spans(self):
+        """Test spans of table rows and cells, including empty cells."""
+        text = "| a | **b** |\n|---|---|\n| 1 |  |"
+        table = parse(text, track_spans=True).blocks[0]
+        
+        assert source_of(text, table.header) == "| a | **b** |"
+        assert [source_of(text, cell) for cell in table.header.cells] == ["a", "**b**"]
+        assert source_of(text, table.header.cells[1].content[0]) == "**b**"
+        assert [cell.span for cell in table.rows[0].cells] == [(26, 27), (31, 31)]
+    
+    def test_quote_and_align_spans(self):
+        """Test spans of inline elements inside quotes and align regions."""
+        text = "> quoted **x**\n> more\n\n<Align center>\n  centered\n</Align>"
+        quote, align = parse(text, track_spans=True).blocks
+        
+        assert source_of(text, quote.content[1]) == "**x**"
+        assert source_of(text, quote.content[2]) == "\n> more"
+        assert source_of(text, align.content[0]) == "centered"
+    
+    def test_untracked_spans(self):
+        """Test that only block spans are recorded by default."""
+        document = parse("- item\n\n| a |\n|---|\n| 1 |")
+        
+        assert all(block.span is not None for block in document.blocks)
+        assert document.blocks[0].items[0].span is None
+        assert document.blocks[1].header.span is None
+    
+    def test_sample_documents(self):
+        """Test fast node spans and span nesting on the sample documents."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            text = path.read_text(encoding="utf-8")
+            tracked = parse(text, track_spans=True)
+            
+            assert parse(text, validate=False, track_spans=True).to_model() == tracked
+            _assert_nested(tracked.blocks, (0, len(text)))
+
+
+def _assert_nested(nodes, parent_span):
+    """Assert that spans are ordered and inside their parent's span."""
+    previous_end = parent_span[0]
+    for node in nodes:
+        assert parent_span[0] <= node.span[0] <= node.span[1] <= parent_span[1]
+        assert node.span[0] >= previous_end
+        previous_end = node.span[1]
+        _assert_nested(children(node), node.span)
+
+
+class TestLookups:
+    """Test Document.node_path and Document.block_at_line."""
+    
+    TEXT = "# Title\n\nSome **bold** [link](u)\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\n- x\n- y"
+    
+    def test_node_path(self):
+        """Test paths from a block down to the innermost node."""
+        document = parse(self.TEXT, track_spans=True)
+        
+        path = document.node_path(self.TEXT.index("bold"))
+        assert [type(node) for node in path] == [Paragraph, Bold]
+        
+        path = document.node_path(self.TEXT.index("[link]"))
+        assert [type(node) for node in path] == [Paragraph, Link]
+        
+        path = document.node_path(self.TEXT.index("2 |"))
+        assert [type(node) for node in path] == [Table, TableRow, TableCell, Text]
+        assert path[-1].content == "2"
+        
+        path = document.node_path(self.TEXT.index("y"))
+        assert [type(node) for node in path] == [ListElement, ListItem, Text]
+    
+    def test_node_path_boundaries(self):
+        """Test offsets at node edges and between blocks."""
+        document = parse(self.TEXT, track_spans=True)
+        
+        assert [type(node) for node in document.node_path(0)] == [Heading]
+        assert [type(node) for node in document.node_path(2)] == [Heading, Text]
+        assert [type(node) for node in document.node_path(7)] == [Heading, Text]
+        assert document.node_path(8) == []
+    
+    def test_node_path_untracked(self):
+        """Test that the path stops at the block without inline spans."""
+        document = parse(self.TEXT)
+        assert [type(node) for node in document.node_path(12)] == [Paragraph]
+    
+    def test_block_at_line(self):
+        """Test line to block lookups."""
+        document = parse(self.TEXT, validate=False)
+        
+        assert isinstance(document.block_at_line(0), type(document.blocks[0]))
+        assert document.block_at_line(1) is None
+        assert document.block_at_line(5) is document.blocks[2]
+        assert document.block_at_line(9) is document.blocks[3]
+        assert document.block_at_line(20) is None
+        
+        with pytest.raises(ValueError):
+            Document(blocks=[]).block_at_line(0)
+    
+    def test_lookups_after_edit(self):
+        """Test that lookups follow incremental edits."""
+        document = parse(self.TEXT, track_spans=True)
+        document.apply_edit(0, 0, "Intro\n\n")
+        text = "Intro\n\n" + self.TEXT
+        
+        assert document == parse(text, track_spans=True)
+        path = document.node_path(text.index("bold"))
+        assert [type(node) for node in path] == [Paragraph, Bold]
+        assert isinstance(document.block_at_line(2), Heading)
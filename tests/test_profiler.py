@@ -0,0 +1,97 @@
+"""Tests for the parse profiler."""
+
+import threading
+from pathlib import Path
+from markdown_parser import parse, ParseProfiler
+from markdown_parser import regex_patterns
+from markdown_parser.elements import list as list_module, text
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+class TestParseProfiler:
+    """Test recording a parse."""
+
+    def test_same_document(self):
+        """Test that a profiled parse gives the same document."""
+        profiler = ParseProfiler()
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            markdown = path.read_text(encoding="utf-8")
+            assert parse(markdown, profiler=profiler) == parse(markdown)
+            assert (parse(markdown, False, True, profiler=profiler) ==
+                    parse(markdown, False, True))
+        assert profiler.documents == 2 * len(list(TEST_FILES_DIR.glob("*.md")))
+
+    def test_block_parsers(self):
+        """Test calls, blocks and lines of the block parsers."""
+        profiler = ParseProfiler()
+        parse("# T\n\n| a | b |\n|---|---|\n| 1 | 2 |\n| 3 | 4 |\n\npara\ngraph", profiler=profiler)
+        stats = profiler.parser_stats()
+
+        assert (stats["table"].calls, stats["table"].blocks, stats["table"].lines) == (1, 1, 4)
+        assert (stats["heading"].blocks, stats["heading"].lines) == (1, 1)
+        assert (stats["paragraph"].blocks, stats["paragraph"].lines) == (1, 2)
+        assert stats["inline_elements"].calls == 1 + 6 + 1
+        assert "list" not in stats
+        for parser in stats.values():
+            assert 0 <= parser.self_time <= parser.total_time
+
+        # Inline parsing of the cells counts in the table's total time
+        profiler = ParseProfiler()
+        parse("| a | b |\n|---|---|\n| 1 | 2 |", profiler=profiler)
+        stats = profiler.parser_stats()
+        assert stats["table"].total_time >= stats["inline_elements"].total_time
+
+    def test_patterns(self):
+        """Test attempts and hits of the inline patterns."""
+        profiler = ParseProfiler()
+        parse("**b** and *c and `d`", profiler=profiler)
+        patterns = profiler.pattern_stats()
+
+        assert (patterns["BOLD_PATTERN"].attempts, patterns["BOLD_PATTERN"].hits) == (2, 1)
+        assert (patterns["INLINE_CODE_PATTERN"].hits, patterns["INLINE_CODE_PATTERN"].attempts) == (1, 1)
+        assert patterns["BOLD_PATTERN"].hit_ratio == 0.5
+        assert "LINK_PATTERN" not in patterns
+
+    def test_report(self):
+        """Test that the report names the dominant cost."""
+        profiler = ParseProfiler()
+        parse("- a *b*\n  - c `d`\n" * 200, profiler=profiler)
+        name, seconds = profiler.dominant_cost()
+        report = profiler.report()
+
+        assert name in ("parse_list", "parse_inline_elements")
+        assert f"Dominant cost: {name}" in report.splitlines()[1]
+        assert "ITALIC_ASTERISK_PATTERN" in report
+        assert 0 < seconds <= profiler.parse_time
+        assert profiler.parser_stats()["list"].calls == 1
+
+        profiler.reset()
+        assert profiler.documents == 0 and profiler.parser_stats() == {}
+
+
+class TestProbes:
+    """Test that probes are only in place while profiling."""
+
+    def test_removed_after_parse(self):
+        """Test that the parsers and patterns are restored."""
+        parse("- *a*", profiler=ParseProfiler())
+
+        assert text.BOLD_PATTERN is regex_patterns.BOLD_PATTERN
+        assert not hasattr(list_module.parse_list, "__wrapped__")
+        assert not hasattr(text.parse_inline_elements, "__wrapped__")
+
+    def test_other_threads(self):
+        """Test that parses in other threads are not recorded."""
+        profiler = ParseProfiler()
+        results = []
+        with profiler._profiling(""):
+            assert hasattr(list_module.parse_list, "__wrapped__")
+            thread = threading.Thread(target=lambda: results.append(parse("- *a*")))
+            thread.start()
+            thread.join()
+
+        assert results == [parse("- *a*")]
+        assert profiler.parser_stats() == {}
+        assert profiler.pattern_stats() == {}
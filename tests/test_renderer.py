@@ -0,0 +1,125 @@
+"""Tests for the per-type renderer registry."""
+
+from pathlib import Path
+import pytest
+from markdown_parser import parse, export_html, export_markdown, iter_export_html
+from markdown_parser import HtmlRenderer, MarkdownRenderer, CodeBlock, Image, ListElement, Table, Text, nodes
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+def _render_image(renderer, image):
+    return f"[image {image.url}]"
+
+
+class TestBuiltinRenderers:
+    """Test that the built-in renderers match the export functions."""
+
+    def test_default_renderer(self):
+        """Test that passing a new renderer gives the default output."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            document = parse(path.read_text(encoding="utf-8"))
+            for include_extensions in (True, False):
+                assert (export_html(document, renderer=HtmlRenderer(include_extensions))
+                        == export_html(document, include_extensions))
+                assert (export_markdown(document, renderer=MarkdownRenderer(include_extensions))
+                        == export_markdown(document, include_extensions))
+
+    def test_fast_nodes(self):
+        """Test that lightweight nodes export the same as models."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            text = path.read_text(encoding="utf-8")
+            assert export_html(parse(text, validate=False)) == export_html(parse(text))
+            assert export_markdown(parse(text, validate=False)) == export_markdown(parse(text))
+
+
+class TestRegister:
+    """Test overriding renderers per type."""
+
+    def test_override_nested(self):
+        """Test that an override applies in paragraphs, list items and table cells."""
+        renderer = HtmlRenderer()
+        renderer.register(Image, _render_image)
+        text = "![a](1.png)\n\n- ![b](2.png)\n\n| x |\n|---|\n| ![c](3.png) |"
+        html = export_html(parse(text), renderer=renderer)
+
+        assert "<img" not in html
+        assert "<p>[image 1.png]</p>" in html
+        assert "<li>[image 2.png]</li>" in html
+        assert "<td>[image 3.png]</td>" in html
+
+    def test_override_nested_list(self):
+        """Test that a ListElement override applies to nested lists."""
+        renderer = MarkdownRenderer()
+        builtin = renderer.renderer_for(ListElement)
+        sizes = []
+
+        @renderer.register(ListElement)
+        def render_list(renderer, list_elem):
+            sizes.append(len(list_elem.items))
+            return builtin(renderer, list_elem).upper()
+
+        markdown = export_markdown(parse("- a\n- b\n  1. c\n  2. d\n     - e"),
+                                   renderer=renderer)
+        assert sizes == [2, 2, 1]
+        assert markdown == "- A\n- B\n    1. C\n    2. D\n        - E"
+
+    def test_decorator_and_fast_nodes(self):
+        """Test registering with a decorator and for lightweight nodes."""
+        renderer = MarkdownRenderer()
+
+        @renderer.register(nodes.CodeBlock)
+        def render_code(renderer, code_block):
+            return f"<code {code_block.language}>"
+
+        text = "```py\nprint(1)\n```"
+        assert export_markdown(parse(text, validate=False), renderer=renderer) == "<code py>"
+        assert export_markdown(parse(text), renderer=renderer) == export_markdown(parse(text))
+        assert renderer.renderer_for(nodes.CodeBlock) is render_code
+
+    def test_override_is_per_instance(self):
+        """Test that registering on one renderer leaves others unchanged."""
+        renderer = HtmlRenderer()
+        renderer.register(CodeBlock, lambda renderer, block: "code")
+        document = parse("```py\nprint(1)\n```")
+
+        assert export_html(document, renderer=renderer).endswith("\ncode\n</body>\n</html>")
+        assert "<pre>" in export_html(document)
+        assert "<pre>" in export_html(document, renderer=HtmlRenderer())
+
+    def test_override_streamed_block(self):
+        """Test that overriding a table also replaces its row by row rendering."""
+        renderer = HtmlRenderer()
+        renderer.register(Table, lambda renderer, table: "<table/>")
+        pieces = list(iter_export_html(parse("| a |\n|---|\n| 1 |"), renderer=renderer))
+
+        assert pieces[1] == "\n<table/>"
+
+    def test_subclass(self):
+        """Test that a subclass uses the renderer of its nearest base class."""
+        class Emoji(Text):
+            pass
+
+        renderer = HtmlRenderer()
+        assert renderer.render(Emoji(content="<3")) == "&lt;3"
+        renderer.register(Emoji, lambda renderer, emoji: "♥")
+        assert renderer.render_all([Text(content="a"), Emoji(content="<3")]) == "a♥"
+
+    def test_unknown_type(self):
+        """Test that nodes without a renderer render as nothing."""
+        assert HtmlRenderer().render(object()) == ""
+
+    def test_renderer_error(self):
+        """Test that a KeyError of a render function propagates after one call."""
+        calls = []
+
+        def render_text(renderer, text):
+            calls.append(text)
+            raise KeyError("missing")
+
+        renderer = HtmlRenderer()
+        renderer.register(Text, render_text)
+        with pytest.raises(KeyError):
+            renderer.render_all([Text(content="a")])
+        assert len(calls) == 1
@@ -0,0 +1,214 @@
+"""Tests for the HTTP rendering service."""
+
+import http.client
+import json
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+import pytest
+from benchmarks.load import fetch_metrics, run_load
+from markdown_parser import parse, export_html, export_json, Document
+from markdown_parser.__main__ import main
+from markdown_parser.server import RenderServer
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+@contextmanager
+def _serving(**kwargs):
+    """Run a RenderServer on a free local port, yielding it."""
+    server = RenderServer(("127.0.0.1", 0), kwargs.pop("workers", 1), **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def _die(data, limits):
+    """Render function killing its worker."""
+    os._exit(1)
+
+
+def _request(server, method, path, body=None, headers=None):
+    """Return (status, headers, body) of one request."""
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+class TestRendering:
+    """Test the rendering routes."""
+
+    def test_html(self):
+        """Test that /html answers export_html() of the body."""
+        markdown = (TEST_FILES_DIR / "extended_syntax.md").read_text(encoding="utf-8")
+        with _serving() as server:
+            status, headers, body = _request(server, "POST", "/html", markdown.encode())
+            assert status == 200
+            assert headers["Content-Type"] == "text/html; charset=utf-8"
+            assert body.decode() == export_html(parse(markdown))
+
+            status, _, body = _request(server, "POST", "/html?title=Notes&extensions=0",
+                                       markdown.encode())
+            assert body.decode() == export_html(parse(markdown), False, "Notes")
+
+    def test_json(self):
+        """Test that /json answers the serialized document."""
+        markdown = "# Title\n\nSome **bold** text.\n\n- a\n- b"
+        with _serving() as server:
+            status, headers, body = _request(server, "POST", "/json", markdown.encode())
+            assert status == 200
+            assert headers["Content-Type"] == "application/json"
+            assert Document.model_validate_json(body) == parse(markdown)
+
+            _, _, body = _request(server, "POST", "/json?spans=1&exclude_defaults=1",
+                                  markdown.encode())
+            assert body.decode() == export_json(parse(markdown, False, True), True)
+
+    def test_keep_alive(self):
+        """Test several requests on one connection."""
+        with _serving() as server:
+            connection = http.client.HTTPConnection(*server.server_address[:2])
+            for i in range(3):
+                connection.request("POST", "/json", f"# {i}".encode())
+                response = connection.getresponse()
+                assert json.loads(response.read())["blocks"][0]["content"][0]["content"] \
+                    == str(i)
+            connection.close()
+
+    def test_errors(self):
+        """Test the statuses of requests that can not be rendered."""
+        with _serving(max_bytes=100, timeout=0.001) as server:
+            assert _request(server, "POST", "/html", b"\xff\xfe")[0] == 400
+            assert _request(server, "POST", "/html?extensions=maybe", b"a")[0] == 400
+            assert _request(server, "POST", "/html", b"a" * 101)[0] == 413
+            assert _request(server, "GET", "/html")[0] == 405
+            assert _request(server, "POST", "/metrics", b"")[0] == 405
+            assert _request(server, "POST", "/other", b"")[0] == 404
+
+            server.max_bytes = 10 * 1024 * 1024
+            status, _, body = _request(server, "POST", "/html", b"para *a* b\n\n" * 50000)
+            assert status == 422
+            assert b"seconds" in body
+            assert server.stats().errors == 7
+
+    def test_deep_nesting(self):
+        """Test that deep nesting gets 422, or 500 when rendering it fails."""
+        markdown = "".join("  " * level + "- a\n" for level in range(400)).encode()
+        with _serving() as server:
+            status, _, body = _request(server, "POST", "/json", markdown)
+            assert status == 422
+            assert b"64 levels" in body
+
+        with _serving(max_depth=None) as server:
+            # export_json recurses once per level
+            status, _, body = _request(server, "POST", "/json", markdown)
+            assert status == 500
+            assert body == b"Rendering failed: RecursionError\n"
+            assert server.stats().errors == 1
+            assert _request(server, "POST", "/json", b"- a")[0] == 200
+
+    def test_worker_failure(self):
+        """Test that a pool with a dead worker is replaced."""
+        with _serving() as server:
+            with pytest.raises(BrokenProcessPool):
+                server.render(_die, b"")
+            assert _request(server, "POST", "/html", b"# a")[0] == 200
+
+    def test_invalid_workers(self):
+        """Test that the pool needs a worker."""
+        with pytest.raises(ValueError):
+            RenderServer(("127.0.0.1", 0), workers=0)
+
+
+class TestETag:
+    """Test revalidation with ETag and If-None-Match."""
+
+    def test_not_modified(self):
+        """Test that a matching If-None-Match gets 304 without rendering."""
+        with _serving() as server:
+            _, headers, _ = _request(server, "POST", "/html", b"# a")
+            etag = headers["ETag"]
+            assert etag.startswith('"') and etag.endswith('"')
+
+            status, headers, body = _request(server, "POST", "/html", b"# a",
+                                             {"If-None-Match": etag})
+            assert (status, headers["ETag"], body) == (304, etag, b"")
+            for header in (f'"x", W/{etag}', "*"):
+                assert _request(server, "POST", "/html", b"# a",
+                                {"If-None-Match": header})[0] == 304
+            assert server.stats().not_modified == 3
+            assert fetch_metrics(f"http://127.0.0.1:{server.server_address[1]}")[
+                "markdown_parser_queue_wait_seconds_count"] == 1
+
+    def test_etag_covers_request(self):
+        """Test that the ETag changes with the body, route and options."""
+        with _serving() as server:
+            etags = {_request(server, "POST", path, body)[1]["ETag"]
+                     for path, body in [("/html", b"# a"), ("/html", b"# b"),
+                                        ("/json", b"# a"), ("/html?title=T", b"# a")]}
+            assert len(etags) == 4
+            assert _request(server, "POST", "/html", b"# a")[1]["ETag"] in etags
+            assert _request(server, "POST", "/html", b"# b",
+                            {"If-None-Match": _request(server, "POST", "/html", b"# a")
+                             [1]["ETag"]})[0] == 200
+
+
+class TestMetrics:
+    """Test the metrics endpoint under load."""
+
+    def test_metrics(self):
+        """Test latency histograms, request counts and queue depth."""
+        with _serving(workers=2) as server:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            result = run_load(url, ["# a\n\ntext", "# b\n\n*more*"], concurrency=4, requests=40)
+            assert result["statuses"] == {200: 40}
+
+            _, headers, body = _request(server, "GET", "/metrics")
+            text = body.decode()
+            assert headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert 'markdown_parser_request_duration_seconds_count{route="html"} 40' in text
+            assert 'markdown_parser_request_duration_seconds_bucket{route="html",le="+Inf"} 40' \
+                in text
+            assert 'markdown_parser_requests_total{route="html",status="200"} 40' in text
+
+            samples = fetch_metrics(url)
+            assert samples["markdown_parser_queue_depth"] == 0
+            assert samples["markdown_parser_workers_busy"] == 0
+            assert samples["markdown_parser_workers"] == 2
+            assert samples["markdown_parser_queue_wait_seconds_count"] == 40
+            assert server.stats().requests == 42
+
+    def test_buckets_cumulative(self):
+        """Test that bucket counts never decrease."""
+        with _serving() as server:
+            for i in range(5):
+                _request(server, "POST", "/html", f"# {i}".encode())
+            text = _request(server, "GET", "/metrics")[2].decode()
+        counts = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+                  if line.startswith('markdown_parser_request_duration_seconds_bucket{route="html"')]
+        assert counts == sorted(counts) and counts[-1] == 5
+
+
+class TestCommandLine:
+    """Test python -m markdown_parser."""
+
+    def test_requires_command(self):
+        """Test that a command must be given."""
+        with pytest.raises(SystemExit):
+            main([])
+        with pytest.raises(SystemExit):
+            main(["serve", "--workers", "0"])
+        with pytest.raises(SystemExit):
+            main(["serve", "--max-depth", "0"])
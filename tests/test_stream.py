@@ -0,0 +1,68 @@
+"""Tests for the streaming block parser."""
+
+import io
+from itertools import count, islice
+from pathlib import Path
+from markdown_parser import parse, parse_stream, parse_file_stream
+from markdown_parser import Align, CodeBlock, Paragraph
+from markdown_parser import nodes
+
+
+TEST_FILES_DIR = Path(__file__).parent / "test_files"
+
+
+class TestParseStream:
+    """Test streaming parsing against whole-document parsing."""
+    
+    def test_matches_parse(self):
+        """Test that streamed blocks equal parse() for every window size."""
+        for path in sorted(TEST_FILES_DIR.glob("*.md")):
+            markdown = path.read_text(encoding="utf-8")
+            expected = parse(markdown).blocks
+            
+            for window in (1, 2, 5, 256):
+                blocks = list(parse_file_stream(io.StringIO(markdown), window=window))
+                assert blocks == expected, (path.name, window)
+    
+    def test_lines_without_newlines(self):
+        """Test an iterable of lines that have no line terminators."""
+        markdown = "# Title\n\n```\ncode\n```\n\n    indented\n\n    more"
+        assert list(parse_stream(markdown.split('\n'))) == parse(markdown).blocks
+    
+    def test_trailing_newline(self):
+        """Test that a final newline behaves like str.split('\\n')."""
+        markdown = "```\nunterminated\n"
+        blocks = list(parse_file_stream(io.StringIO(markdown)))
+        assert blocks == parse(markdown).blocks
+        assert blocks[0].code == "unterminated\n"
+    
+    def test_first_block_before_end_of_input(self):
+        """Test that blocks are yielded while the input is still being read."""
+        lines_read = []
+        
+        def source():
+            for i in count():
+                lines_read.append(i)
+                yield f"Paragraph {i}\n"
+                yield "\n"
+        
+        blocks = list(islice(parse_stream(source(), window=8), 3))
+        assert [block.content[0].content for block in blocks] == [
+            "Paragraph 0", "Paragraph 1", "Paragraph 2"
+        ]
+        assert len(lines_read) < 20
+    
+    def test_block_longer_than_window(self):
+        """Test code blocks and align regions that span many windows."""
+        code = "\n".join(f"line {i}" for i in range(100))
+        markdown = f"```\n{code}\n```\n<Align center>\n{code}\n</Align>\nafter"
+        
+        blocks = list(parse_stream(io.StringIO(markdown), window=4))
+        assert [type(block) for block in blocks] == [CodeBlock, Align, Paragraph]
+        assert blocks == parse(markdown).blocks
+    
+    def test_fast_nodes(self):
+        """Test streaming with validate=False."""
+        blocks = list(parse_stream(["# Title", "", "text"], validate=False))
+        assert isinstance(blocks[0], nodes.Heading)
+        assert [block.to_model() for block in blocks] == parse("# Title\n\ntext").blocks